@@ -0,0 +1 @@
+"""Offline benchmarks for the Powerhaus - Steirische Öffis integration."""
@@ -0,0 +1,175 @@
+"""Connection pool benchmark: shared keep-alive pool vs a session per poll.
+
+    python -m benchmarks.connection_pool --polls 200 --concurrency 4
+
+Posts stop event requests to the local mock TRIAS server in two ways:
+
+- session_per_poll: every poll opens its own aiohttp session and closes it
+  afterwards, like the integration did before the shared pool
+- shared_pool: every poll goes through api.async_post and the shared
+  connection pool of the API URL, with the limit of two config entries
+  asking for different limits (the higher one applies)
+
+For each it reports per-poll latency percentiles, the connections the
+server saw and the connection limit of the pool. With more polls in flight
+than the limit, shared_pool latencies include waiting for a pooled
+connection. The mock server speaks plain HTTP on localhost, so the
+handshake a real HTTPS endpoint costs per new connection is not included.
+Needs the homeassistant package; results are printed as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Import the integration as custom_components.steirische_linien
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.steirische_linien.api import (  # noqa: E402
+    async_close_sessions,
+    async_get_session,
+    async_post,
+    async_set_connection_limit,
+)
+from custom_components.steirische_linien.const import DOMAIN  # noqa: E402
+from custom_components.steirische_linien.request_builder import (  # noqa: E402
+    stop_event_request,
+)
+from custom_components.steirische_linien.trias_time import (  # noqa: E402
+    format_trias_time,
+    utcnow,
+)
+
+from .mock_server import MockTriasServer  # noqa: E402
+
+HEADERS = {"Content-Type": "text/xml"}
+
+
+def _request(index: int) -> bytes:
+    """Return the stop event request of the index-th poll."""
+    now = format_trias_time(utcnow())
+    template = stop_event_request(f"at:46:{4000 + index % 50}", 20)
+    return template.render(request_timestamp=now, dep_arr_time=now)
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    """Return latency percentiles of samples in milliseconds."""
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p90_ms": round(quantiles[89] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+    }
+
+
+async def _async_run(poll, options: argparse.Namespace) -> list[float]:
+    """Run --polls polls, --concurrency at a time, and return their latencies."""
+    semaphore = asyncio.Semaphore(options.concurrency)
+    latencies: list[float] = []
+
+    async def _timed(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await poll(index)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(_timed(index) for index in range(options.polls)))
+    return latencies
+
+
+async def session_per_poll(options: argparse.Namespace, server: MockTriasServer) -> dict:
+    """Open a new session for every poll."""
+
+    async def _poll(index: int) -> None:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(server.url, data=_request(index), headers=HEADERS) as response:
+                response.raise_for_status()
+                await response.read()
+
+    connections = server.connections
+    latencies = await _async_run(_poll, options)
+    return {
+        "scenario": "session_per_poll",
+        "connection_limit": None,
+        "connections": server.connections - connections,
+        **_percentiles(latencies),
+    }
+
+
+async def shared_pool(options: argparse.Namespace, server: MockTriasServer) -> dict:
+    """Post every poll through async_post and the shared pool."""
+    hass = HomeAssistant(tempfile.mkdtemp())
+    hass.data.setdefault(DOMAIN, {})
+    async_set_connection_limit(hass, "entry_low", server.url, 1)
+    async_set_connection_limit(hass, "entry_high", server.url, options.connection_limit)
+
+    async def _poll(index: int) -> None:
+        await async_post(hass, server.url, _request(index), HEADERS)
+
+    connections = server.connections
+    latencies = await _async_run(_poll, options)
+    result = {
+        "scenario": "shared_pool",
+        "connection_limit": async_get_session(hass, server.url).connector.limit,
+        "connections": server.connections - connections,
+        **_percentiles(latencies),
+    }
+
+    await async_close_sessions(hass)
+    await hass.async_stop(force=True)
+    return result
+
+
+async def main_async(options: argparse.Namespace) -> dict:
+    """Run both scenarios against one mock server."""
+    async with MockTriasServer(
+        events=options.events, latency=options.latency, jitter=options.jitter
+    ) as server:
+        scenarios = [
+            await session_per_poll(options, server),
+            await shared_pool(options, server),
+        ]
+
+    return {
+        "settings": {
+            "polls": options.polls,
+            "concurrency": options.concurrency,
+            "events": options.events,
+            "latency_s": options.latency,
+            "jitter_s": options.jitter,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    """Run the connection pool benchmark."""
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument("--polls", type=int, default=200, help="polls per scenario")
+    arguments.add_argument("--concurrency", type=int, default=4, help="polls in flight")
+    arguments.add_argument("--events", type=int, default=40, help="results per mock response")
+    arguments.add_argument("--latency", type=float, default=0.02, help="mock response latency (s)")
+    arguments.add_argument("--jitter", type=float, default=0.01, help="extra random latency (s)")
+    arguments.add_argument(
+        "--connection-limit", type=int, default=4, help="limit of the second entry"
+    )
+    arguments.add_argument("--output", help="write the JSON results to this file")
+    options = arguments.parse_args()
+
+    output = json.dumps(asyncio.run(main_async(options)), indent=2)
+    if options.output:
+        Path(options.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""TRIAS response fixtures of configurable size.
+
+The documents follow the element structure, namespaces and filler of real
+responses of the Styrian TRIAS endpoint (EFA), with departure times
+relative to the moment they are built so the parsers keep them.
+"""
+from __future__ import annotations
+
+import random
+import re
+import zlib
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import escape
+
+STOP_POINT_REF = re.compile(rb"<StopPointRef>([^<]*)</StopPointRef>")
+
+LINES = (
+    ("1", "tram", "Eggenberg/UKH"),
+    ("4", "tram", "Andritz"),
+    ("6", "tram", "St. Peter"),
+    ("7", "tram", "LKH Med Uni/Klinikum Nord"),
+    ("31", "bus", "Weinitzen"),
+    ("34E", "bus", "Mariatrost"),
+    ("63", "bus", "Eggenberg Baiernstraße"),
+    ("S5", "rail", "Spielfeld-Straß Bahnhof"),
+)
+STOPS = (
+    "Graz Jakominiplatz",
+    "Graz Hauptbahnhof",
+    "Graz Lendplatz",
+    "Graz Südtiroler Platz/Kunsthaus",
+    "Graz Schlossbergplatz/Murinsel",
+    "Graz Dietrichsteinplatz",
+    "Graz Finanzamt",
+    "Graz Mariatrost Kirche",
+)
+
+# Parts of the synthetic stop names of stop_names(); town names are put
+# together from these like Styrian ones (Gleisdorf, Unterpremstätten, ...)
+TOWN_PREFIXES = ("", "", "", "", "Ober", "Unter", "Neu", "Alt", "Groß", "Klein", "Sankt ", "Bad ", "Maria ")
+TOWN_STEMS = (
+    "Gleis", "Kalch", "Lieb", "Stall", "Pisch", "Fehr", "Gnas", "Strad", "Kirch",
+    "Weinz", "Söch", "Frauen", "Mett", "Hitz", "Leut", "Gleich", "Dobl", "Zwar",
+    "Stift", "Wund", "Kumm", "Semmer", "Ligist", "Pass", "Eggers", "Rotten", "Tobel",
+    "Prem", "Haus", "Frohn", "Lann", "Wild", "Preding", "Fernitz", "Hengs", "Mell",
+    "Gratt", "Trautt", "Kainach", "Feist", "Stubal", "Thal", "Werndorf", "Wagna",
+    "Kitz", "Straß", "Ehren", "Hart", "Gams", "Mühl", "Pöls", "Zeiring", "Kobenz",
+)
+TOWN_SUFFIXES = (
+    "dorf", "berg", "feld", "au", "bach", "burg", "stein", "wald", "hof", "egg",
+    "leiten", "tal", "brunn", "graben", "kirchen", "stätten", "ach", "ing",
+)
+PLACES = (
+    "Hauptplatz", "Bahnhof", "Jakominiplatz", "Hauptbahnhof", "Stadtpark", "Rathaus",
+    "Kirche", "Friedhof", "Schule", "Volksschule", "Gemeindeamt", "Ortsmitte",
+    "Feuerwehr", "Sportplatz", "Freibad", "Krankenhaus", "Post", "Marktplatz",
+    "Kreisverkehr", "Gewerbepark", "Industriegebiet", "Siedlung", "Schloss",
+    "Brücke", "Lendplatz", "Griesplatz", "Annenstraße", "Grazer Straße",
+    "Wiener Straße", "Bahnhofstraße", "Schulgasse", "Kirchplatz", "Mühlgasse",
+    "Am Anger", "Dorfplatz", "Wirtshaus", "Kaserne", "Universität", "Technikum",
+    "Einkaufszentrum", "Messe", "Stadion", "Busbahnhof", "Stadtwerke",
+    "Landeskrankenhaus", "Pflegeheim", "Kindergarten", "Gasthof Post", "Lagerhaus",
+    "Sägewerk", "Waldfriedhof", "Kurhaus", "Therme", "Seniorenheim", "Zentrum",
+    "Südtiroler Platz", "Dietrichsteinplatz", "Finanzamt", "Schlossbergplatz", "Murinsel",
+    "Raiffeisenbank", "Sparkasse", "Apotheke", "Ärztezentrum", "Bauhof", "Kläranlage",
+    "Tankstelle", "Autobahnauffahrt", "Park & Ride", "Mittelschule", "Gymnasium",
+    "Musikschule", "Pfarrhof", "Kapelle", "Wegkreuz", "Bildstock", "Mühle", "Teich",
+    "Badesee", "Golfplatz", "Reitstall", "Weinstraße", "Kellergasse", "Buschenschank",
+    "Hofer", "Billa", "Spar", "Sportzentrum", "Eishalle", "Stadthalle", "Kulturhaus",
+)
+SUFFIXES = ("", "", "", "", " Nord", " Süd", " Ost", " West", " Abzw.", " Ortsende", " Mitte")
+TOWNS = 300
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<trias:Trias xmlns:siri="http://www.siri.org.uk/siri" xmlns:trias="http://www.vdv.de/trias" xmlns:acsb="http://www.ifopt.org.uk/acsb" xmlns:ifopt="http://www.ifopt.org.uk/ifopt" xmlns:datex2="http://datex2.eu/schema/1_0/1_0" version="1.2">
+<trias:ServiceDelivery>
+<siri:ResponseTimestamp>{now}</siri:ResponseTimestamp>
+<siri:ProducerRef>EFAController10.6.21.17-EFA02</siri:ProducerRef>
+<siri:Status>true</siri:Status>
+<trias:Language>de</trias:Language>
+<trias:CalcTime>{calc_time}</trias:CalcTime>
+<trias:DeliveryPayload>
+"""
+FOOTER = """</trias:DeliveryPayload>
+</trias:ServiceDelivery>
+</trias:Trias>
+"""
+
+
+def _time(value: datetime) -> str:
+    """Format a time the way TRIAS does."""
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _text(tag: str, value: str) -> str:
+    """Return a TRIAS internationalized text element."""
+    return (
+        f"<trias:{tag}><trias:Text>{escape(value)}</trias:Text>"
+        f"<trias:Language>de</trias:Language></trias:{tag}>"
+    )
+
+
+def _call(stop: int, seq: int, times: str) -> str:
+    """Return the inner elements of a call at a stop."""
+    return (
+        f"<trias:StopPointRef>at:46:{4000 + stop}:0:{1 + seq % 4}</trias:StopPointRef>"
+        f"{_text('StopPointName', STOPS[stop % len(STOPS)])}"
+        f"{_text('PlannedBay', str(1 + seq % 4))}"
+        f"{times}"
+        f"<trias:StopSeqNumber>{seq}</trias:StopSeqNumber>"
+    )
+
+
+def _service_times(tag: str, scheduled: datetime, delay: int) -> str:
+    """Return a ServiceDeparture/ServiceArrival with timetabled and live time."""
+    estimated = ""
+    if delay >= 0:
+        estimated = f"<trias:EstimatedTime>{_time(scheduled + timedelta(seconds=delay))}</trias:EstimatedTime>"
+    return (
+        f"<trias:{tag}><trias:TimetabledTime>{_time(scheduled)}</trias:TimetabledTime>"
+        f"{estimated}</trias:{tag}>"
+    )
+
+
+def _service(index: int, day: str) -> str:
+    """Return the Service element of a journey."""
+    line, mode, destination = LINES[index % len(LINES)]
+    return (
+        "<trias:Service>"
+        f"<trias:OperatingDayRef>{day}</trias:OperatingDayRef>"
+        f"<trias:JourneyRef>stv:{line}:H:j26:{100 + index}</trias:JourneyRef>"
+        f"<trias:LineRef>stv:{line}:H:j26</trias:LineRef>"
+        "<trias:DirectionRef>outward</trias:DirectionRef>"
+        f"<trias:Mode><trias:PtMode>{mode}</trias:PtMode>{_text('Name', mode.title())}</trias:Mode>"
+        f"{_text('PublishedLineName', line)}"
+        "<trias:OperatorRef>stv:01</trias:OperatorRef>"
+        f"<trias:OriginStopPointRef>at:46:4100</trias:OriginStopPointRef>"
+        f"{_text('OriginText', STOPS[(index + 3) % len(STOPS)])}"
+        f"<trias:DestinationStopPointRef>at:46:4200</trias:DestinationStopPointRef>"
+        f"{_text('DestinationText', destination)}"
+        "</trias:Service>"
+    )
+
+
+def _delay(index: int) -> int:
+    """Return a delay in seconds, or -1 for departures without live data."""
+    if index % 5 == 4:
+        return -1
+    return (index * 37) % 240
+
+
+def stop_event_response(events: int, now: datetime | None = None, stop: int = 0) -> bytes:
+    """Build a StopEventResponse with the given number of departures.
+
+    Different `stop` numbers give the departures of different stop points,
+    with their own lines and times.
+    """
+    now = now or datetime.now(timezone.utc)
+    day = now.strftime("%Y-%m-%d")
+    parts = [HEADER.format(now=_time(now), calc_time=40 + events), "<trias:StopEventResponse>\n"]
+
+    for index in range(events):
+        scheduled = now + timedelta(minutes=1 + index * 2, seconds=stop * 41)
+        times = _service_times("ServiceDeparture", scheduled, _delay(index))
+        parts.append(
+            "<trias:StopEventResult>"
+            f"<trias:ResultId>ID-{index}</trias:ResultId>"
+            "<trias:StopEvent>"
+            f"<trias:ThisCall><trias:CallAtStop>{_call(stop, 5, times)}</trias:CallAtStop></trias:ThisCall>"
+            f"{_service(index + stop, day)}"
+            "</trias:StopEvent>"
+            "</trias:StopEventResult>\n"
+        )
+
+    parts.append("</trias:StopEventResponse>\n")
+    parts.append(FOOTER)
+    return "".join(parts).encode("utf-8")
+
+
+def trip_response(trips: int, now: datetime | None = None, intermediates: int = 6) -> bytes:
+    """Build a TripResponse with the given number of trips."""
+    now = now or datetime.now(timezone.utc)
+    day = now.strftime("%Y-%m-%d")
+    parts = [HEADER.format(now=_time(now), calc_time=120 + trips), "<trias:TripResponse>\n"]
+
+    for index in range(trips):
+        start = now + timedelta(minutes=2 + index * 4)
+        board = start + timedelta(minutes=3)
+        calls = "".join(
+            f"<trias:LegIntermediates>"
+            f"{_call(seq, seq + 6, _service_times('ServiceArrival', board + timedelta(minutes=2 * seq), -1) + _service_times('ServiceDeparture', board + timedelta(minutes=2 * seq), -1))}"
+            f"</trias:LegIntermediates>"
+            for seq in range(1, intermediates + 1)
+        )
+        alight = board + timedelta(minutes=2 * intermediates + 2)
+        parts.append(
+            "<trias:TripResult>"
+            f"<trias:ResultId>ID-{index}</trias:ResultId>"
+            "<trias:Trip>"
+            f"<trias:TripId>ID-{index}</trias:TripId>"
+            "<trias:Duration>PT24M</trias:Duration>"
+            f"<trias:StartTime>{_time(start)}</trias:StartTime>"
+            f"<trias:EndTime>{_time(alight)}</trias:EndTime>"
+            "<trias:Interchanges>0</trias:Interchanges>"
+            "<trias:Distance>4200</trias:Distance>"
+            "<trias:TripLeg><trias:LegId>1</trias:LegId><trias:ContinuousLeg>"
+            "<trias:LegStart><trias:GeoPosition><trias:Longitude>15.43</trias:Longitude>"
+            "<trias:Latitude>47.07</trias:Latitude></trias:GeoPosition>"
+            f"{_text('LocationName', 'Origin')}</trias:LegStart>"
+            f"<trias:LegEnd><trias:StopPointRef>at:46:4000</trias:StopPointRef>{_text('LocationName', STOPS[0])}</trias:LegEnd>"
+            "<trias:Service><trias:IndividualMode>walk</trias:IndividualMode></trias:Service>"
+            f"<trias:TimeWindowStart>{_time(start)}</trias:TimeWindowStart>"
+            f"<trias:TimeWindowEnd>{_time(board)}</trias:TimeWindowEnd>"
+            "<trias:Duration>PT3M</trias:Duration><trias:Length>210</trias:Length>"
+            "</trias:ContinuousLeg></trias:TripLeg>"
+            "<trias:TripLeg><trias:LegId>2</trias:LegId><trias:TimedLeg>"
+            f"<trias:LegBoard>{_call(0, 5, _service_times('ServiceDeparture', board, _delay(index)))}</trias:LegBoard>"
+            f"{calls}"
+            f"<trias:LegAlight>{_call(intermediates + 1, intermediates + 6, _service_times('ServiceArrival', alight, -1))}</trias:LegAlight>"
+            f"{_service(index, day)}"
+            "</trias:TimedLeg></trias:TripLeg>"
+            "</trias:Trip>"
+            "</trias:TripResult>\n"
+        )
+
+    parts.append("</trias:TripResponse>\n")
+    parts.append(FOOTER)
+    return "".join(parts).encode("utf-8")
+
+
+def location_response(locations: int, now: datetime | None = None) -> bytes:
+    """Build a LocationInformationResponse with the given number of stops."""
+    now = now or datetime.now(timezone.utc)
+    parts = [HEADER.format(now=_time(now), calc_time=15), "<trias:LocationInformationResponse>\n"]
+
+    for index in range(locations):
+        name = STOPS[index % len(STOPS)]
+        parts.append(
+            "<trias:LocationResult><trias:Location>"
+            "<trias:StopPoint>"
+            f"<trias:StopPointRef>at:46:{4000 + index}</trias:StopPointRef>"
+            f"{_text('StopPointName', name)}"
+            "<trias:LocalityRef>60101000:1</trias:LocalityRef>"
+            "</trias:StopPoint>"
+            f"{_text('LocationName', 'Graz')}"
+            f"<trias:GeoPosition><trias:Longitude>{15.40 + index / 1000:.5f}</trias:Longitude>"
+            f"<trias:Latitude>{47.05 + index / 1000:.5f}</trias:Latitude></trias:GeoPosition>"
+            "</trias:Location>"
+            "<trias:Complete>true</trias:Complete>"
+            f"<trias:Probability>{max(0.1, 1 - index / 50):.3f}</trias:Probability>"
+            "</trias:LocationResult>\n"
+        )
+
+    parts.append("</trias:LocationInformationResponse>\n")
+    parts.append(FOOTER)
+    return "".join(parts).encode("utf-8")
+
+
+def stop_names(count: int) -> list[str]:
+    """Return `count` distinct stop names in the style of the Styrian stop list."""
+    generator = random.Random(0)
+    towns = ["Graz"]
+    while len(towns) < TOWNS:
+        prefix = generator.choice(TOWN_PREFIXES)
+        stem = generator.choice(TOWN_STEMS)
+        if prefix and not prefix.endswith(" "):
+            stem = stem.lower()
+        town = prefix + stem + generator.choice(TOWN_SUFFIXES)
+        if town not in towns:
+            towns.append(town)
+
+    names: dict[str, None] = {}
+    while len(names) < count:
+        # A tenth of all stops are in Graz
+        town = "Graz" if generator.random() < 0.1 else generator.choice(towns)
+        names[f"{town} {generator.choice(PLACES)}{generator.choice(SUFFIXES)}"] = None
+    return list(names)
+
+
+def response_for_request(body: bytes, events: int, now: datetime | None = None) -> bytes:
+    """Answer a TRIAS request with a fixture of the matching type."""
+    if b"StopEventRequest" in body:
+        match = STOP_POINT_REF.search(body)
+        stop = zlib.crc32(match.group(1)) % 97 if match else 0
+        return stop_event_response(events, now, stop)
+    if b"TripRequest" in body:
+        intermediates = 6 if b"<IncludeIntermediateStops>true" in body else 0
+        return trip_response(events, now, intermediates)
+    return location_response(min(events, 10), now)
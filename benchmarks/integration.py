@@ -0,0 +1,25 @@
+"""Import the integration's Home Assistant independent modules.
+
+The package __init__ sets up Home Assistant platforms, so the modules are
+loaded through a bare package entry pointing at the integration directory.
+This gives the benchmarks the real parser, request builder and time code
+without a Home Assistant installation.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PACKAGE = "steirische_linien"
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / PACKAGE
+
+
+def load(module: str) -> types.ModuleType:
+    """Return a module of the integration, e.g. load('parser')."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{module}")
@@ -0,0 +1,252 @@
+"""Load test: many coordinators refreshing in one event loop.
+
+    python -m benchmarks.load_test --coordinators 10,100,500 --duration 30
+
+Runs real coordinators (SteirischeLinienDataUpdateCoordinator) on a bare
+Home Assistant core object, without starting Home Assistant, against the
+local mock TRIAS server. For each coordinator count it reports the event
+loop lag, refresh latency percentiles, CPU and memory use, and every parse
+that took longer than --block-threshold. Needs the
+homeassistant package; results are printed as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Import the integration as custom_components.steirische_linien
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.steirische_linien.api import (  # noqa: E402
+    async_close_sessions,
+    async_set_connection_limit,
+)
+from custom_components.steirische_linien.const import (  # noqa: E402
+    CONF_API_URL,
+    CONF_MODE,
+    CONF_PARSER_MODE,
+    CONF_STOP_POINT_REF,
+    DEFAULT_CONNECTION_LIMIT,
+    DOMAIN,
+    PARSE_EXECUTOR_THRESHOLD,
+    MODE_STATION,
+    PARSER_AUTO,
+    PARSER_STREAMING,
+    PARSER_TREE,
+)
+from custom_components.steirische_linien.parse_backend import (  # noqa: E402
+    DATA_PARSE_BACKEND,
+    ParseBackend,
+)
+from custom_components.steirische_linien.parser import (  # noqa: E402
+    BACKEND_LXML,
+    BACKEND_STDLIB,
+    DEFAULT_BACKEND,
+)
+from custom_components.steirische_linien.scheduler import (  # noqa: E402
+    DATA_SCHEDULER,
+    PollScheduler,
+)
+from custom_components.steirische_linien.sensor import (  # noqa: E402
+    SteirischeLinienDataUpdateCoordinator,
+)
+
+from .mock_server import MockTriasServer  # noqa: E402
+
+LAG_PROBE_INTERVAL = 0.01
+
+
+class TimedCoordinator(SteirischeLinienDataUpdateCoordinator):
+    """Coordinator that reports parses taking too long.
+
+    Parses of responses below PARSE_EXECUTOR_THRESHOLD run on the loop and
+    block it for their whole duration; larger ones run in the executor.
+    """
+
+    block_threshold = 0.05
+    blocking: list[dict] = []
+
+    def _parse(self, body: bytes, stop_events: bool, counters):
+        """Parse, timing the synchronous step."""
+        start = time.perf_counter()
+        departures = super()._parse(body, stop_events, counters)
+        elapsed = time.perf_counter() - start
+        if elapsed > self.block_threshold:
+            self.blocking.append({
+                "stop_point_ref": self.config_data.get(CONF_STOP_POINT_REF),
+                "bytes": len(body),
+                "in_executor": len(body) >= PARSE_EXECUTOR_THRESHOLD,
+                "ms": round(elapsed * 1000, 2),
+            })
+        return departures
+
+
+def _percentile(samples: list[float], percent: int) -> float | None:
+    """Return a percentile of samples in milliseconds."""
+    if len(samples) < 2:
+        return round(samples[0] * 1000, 3) if samples else None
+    return round(statistics.quantiles(samples, n=100, method="inclusive")[percent - 1] * 1000, 3)
+
+
+async def _probe_lag(lags: list[float], stop: asyncio.Event) -> None:
+    """Measure how late the loop wakes a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(max(loop.time() - start - LAG_PROBE_INTERVAL, 0))
+
+
+async def _drive(
+    coordinator: SteirischeLinienDataUpdateCoordinator,
+    interval: float,
+    latencies: list[float],
+    failures: list[int],
+    stop: asyncio.Event,
+) -> None:
+    """Refresh a coordinator every interval, starting at a random phase."""
+    await asyncio.sleep(random.uniform(0, interval))
+    while not stop.is_set():
+        # Expire the shared result so every refresh goes upstream
+        coordinator._query._updated = None
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        latencies.append(time.perf_counter() - start)
+        if not coordinator.last_update_success:
+            failures[0] += 1
+        await asyncio.sleep(interval)
+
+
+async def run_step(count: int, options: argparse.Namespace, url: str) -> dict:
+    """Run `count` coordinators for the configured duration."""
+    hass = HomeAssistant(tempfile.mkdtemp())
+    hass.data.setdefault(DOMAIN, {})[DATA_SCHEDULER] = scheduler = PollScheduler(hass)
+    hass.data[DOMAIN][DATA_PARSE_BACKEND] = ParseBackend(hass, options.backend)
+    scheduler.async_set_budget("load_test", url, options.rpm)
+    async_set_connection_limit(hass, "load_test", url, options.connection_limit)
+
+    TimedCoordinator.block_threshold = options.block_threshold / 1000
+    TimedCoordinator.blocking = []
+    coordinators = [
+        TimedCoordinator(
+            hass,
+            {
+                CONF_MODE: MODE_STATION,
+                CONF_API_URL: url,
+                CONF_STOP_POINT_REF: f"at:46:{4000 + index}",
+                CONF_PARSER_MODE: options.parser,
+            },
+        )
+        for index in range(count)
+    ]
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    latencies: list[float] = []
+    failures = [0]
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    tasks = [asyncio.create_task(_probe_lag(lags, stop))]
+    tasks.extend(
+        asyncio.create_task(_drive(coordinator, options.interval, latencies, failures, stop))
+        for coordinator in coordinators
+    )
+
+    await asyncio.sleep(options.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    for coordinator in coordinators:
+        coordinator.async_release()
+    await async_close_sessions(hass)
+    await hass.async_stop(force=True)
+
+    blocking = TimedCoordinator.blocking
+    return {
+        "coordinators": count,
+        "refreshes": len(latencies),
+        "failed_refreshes": failures[0],
+        "refresh_p50_ms": _percentile(latencies, 50),
+        "refresh_p99_ms": _percentile(latencies, 99),
+        "loop_lag_p50_ms": _percentile(lags, 50),
+        "loop_lag_p99_ms": _percentile(lags, 99),
+        "loop_lag_max_ms": round(max(lags) * 1000, 3) if lags else None,
+        "cpu_percent": round(100 * cpu / wall, 1),
+        "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "blocking_parses": len(blocking),
+        "worst_blocking_parses": sorted(blocking, key=lambda item: -item["ms"])[:5],
+    }
+
+
+async def main_async(options: argparse.Namespace) -> dict:
+    """Run all steps against one mock server."""
+    counts = [int(count) for count in options.coordinators.split(",")]
+    async with MockTriasServer(
+        events=options.events, latency=options.latency, jitter=options.jitter
+    ) as server:
+        steps = [await run_step(count, options, server.url) for count in counts]
+
+    return {
+        "settings": {
+            "events": options.events,
+            "latency_s": options.latency,
+            "jitter_s": options.jitter,
+            "interval_s": options.interval,
+            "duration_s": options.duration,
+            "parser": options.parser,
+            "backend": options.backend,
+            "requests_per_minute": options.rpm,
+            "connection_limit": options.connection_limit,
+            "block_threshold_ms": options.block_threshold,
+        },
+        "steps": steps,
+    }
+
+
+def main() -> None:
+    """Run the load test."""
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument("--coordinators", default="10,50,100,200", help="comma separated counts")
+    arguments.add_argument("--duration", type=float, default=20, help="seconds per count")
+    arguments.add_argument("--interval", type=float, default=5, help="seconds between refreshes")
+    arguments.add_argument("--events", type=int, default=40, help="results per mock response")
+    arguments.add_argument("--latency", type=float, default=0.05, help="mock response latency (s)")
+    arguments.add_argument("--jitter", type=float, default=0.05, help="extra random latency (s)")
+    arguments.add_argument(
+        "--parser", choices=(PARSER_AUTO, PARSER_STREAMING, PARSER_TREE), default=PARSER_AUTO
+    )
+    arguments.add_argument(
+        "--backend", choices=(BACKEND_STDLIB, BACKEND_LXML), default=DEFAULT_BACKEND
+    )
+    arguments.add_argument("--rpm", type=int, default=100000, help="request budget per minute")
+    arguments.add_argument(
+        "--connection-limit", type=int, default=DEFAULT_CONNECTION_LIMIT, help="open connections"
+    )
+    arguments.add_argument(
+        "--block-threshold", type=float, default=50, help="flag parses longer than this (ms)"
+    )
+    arguments.add_argument("--output", help="write the JSON results to this file")
+    options = arguments.parse_args()
+
+    output = json.dumps(asyncio.run(main_async(options)), indent=2)
+    if options.output:
+        Path(options.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
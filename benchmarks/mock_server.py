@@ -0,0 +1,134 @@
+"""Local stand-in for the TRIAS endpoint."""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import random
+import time
+
+from aiohttp import web
+
+from .fixtures import STOP_POINT_REF, response_for_request
+
+# Rebuild responses this often so departure times stay in the future
+FIXTURE_MAX_AGE = 30
+
+
+class MockTriasServer:
+    """Serve TRIAS fixtures with configurable size, latency and faults.
+
+    Every request type gets a response of `events` results. Responses are
+    built once and reused, like an upstream answering from its own cache;
+    the response latency is `latency` seconds plus up to `jitter` more.
+    A share `error_rate` of the requests is answered with HTTP 503, and so
+    is every request whose body contains one of the byte strings in
+    `failing`, e.g. a stop point reference.
+    With `compress`, clients accepting gzip get a gzip encoded response.
+
+    `requests` counts the requests and `request_times` holds their arrival
+    (time.monotonic()); `connections` counts the client connections seen,
+    told apart by their client address.
+    """
+
+    def __init__(
+        self,
+        events: int = 40,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        compress: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initialize."""
+        self.events = events
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.failing: set[bytes] = set()
+        self.compress = compress
+        self.requests = 0
+        self.request_times: list[float] = []
+        self._peers: set = set()
+        self._host = host
+        self._port = port
+        self._runner: web.AppRunner | None = None
+        self._responses: dict[tuple[str, bool], tuple[float, bytes]] = {}
+        self.url: str | None = None
+
+    async def start(self) -> str:
+        """Start serving and return the endpoint URL."""
+        app = web.Application()
+        app.router.add_post("/trias", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{self._host}:{port}/trias"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def connections(self) -> int:
+        """Return the number of client connections seen."""
+        return len(self._peers)
+
+    async def __aenter__(self) -> MockTriasServer:
+        """Start the server in an async with block."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop the server at the end of an async with block."""
+        await self.stop()
+
+    def response(self, body: bytes, gzipped: bool = False) -> bytes:
+        """Return the (cached) response to a request body."""
+        if b"StopEventRequest" in body:
+            # Every stop point has its own departures
+            match = STOP_POINT_REF.search(body)
+            kind = f"stop_event:{match.group(1).decode() if match else ''}"
+        elif b"<IncludeIntermediateStops>true" in body:
+            kind = "trip_full"
+        elif b"TripRequest" in body:
+            kind = "trip"
+        else:
+            kind = "location"
+        key = (kind, gzipped)
+        cached = self._responses.get(key)
+        now = time.monotonic()
+        if cached is None or now - cached[0] > FIXTURE_MAX_AGE:
+            response = response_for_request(body, self.events)
+            if gzipped:
+                response = gzip.compress(response, compresslevel=6)
+            cached = self._responses[key] = (now, response)
+        return cached[1]
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer a TRIAS request."""
+        self.requests += 1
+        self.request_times.append(time.monotonic())
+        if request.transport is not None:
+            self._peers.add(request.transport.get_extra_info("peername"))
+        body = await request.read()
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if (self.error_rate and random.random() < self.error_rate) or any(
+            pattern in body for pattern in self.failing
+        ):
+            return web.Response(status=503, text="Service Unavailable")
+
+        gzipped = self.compress and "gzip" in request.headers.get("Accept-Encoding", "")
+        response = web.Response(body=self.response(body, gzipped), content_type="text/xml")
+        if gzipped:
+            response.headers["Content-Encoding"] = "gzip"
+        return response
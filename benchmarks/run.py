@@ -0,0 +1,804 @@
+"""Run the offline benchmarks and print the results as JSON.
+
+    python -m benchmarks.run [--quick] [--output results.json]
+
+Covers the request builders, parsing and formatting single timestamps,
+the tree and streaming parsers for stop events, trips and location
+searches at several response sizes with each installed XML backend, the
+per-record field extraction compared with the './/' find chains it
+replaced, how long parsing on the loop or in the executor stalls the
+event loop, and refreshes of real coordinators (render, post through the
+shared pool, digest, parse) against the local mock TRIAS server. It also
+compares bytes on the wire and decode time per refresh for each request
+profile, with and without gzip, how merging and concurrently fetching the
+departures of 1 to 20 nearby stops scales, what departure filters cost
+while parsing, and how long building and searching the offline stop index
+takes for up to 10,000 stops. Needs aiohttp and no network; the
+coordinator refreshes and the stop index need the homeassistant package
+(but no running instance) and are skipped without it.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+import zlib
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from . import fixtures
+from .integration import load
+
+const = load("const")
+parser = load("parser")
+request_builder = load("request_builder")
+trias_time = load("trias_time")
+
+SIZES = (10, 50, 200, 1000)
+QUICK_SIZES = (10, 200)
+FETCH_LIMIT = 10
+BACKENDS = tuple(
+    backend
+    for backend in (parser.BACKEND_STDLIB, parser.BACKEND_LXML)
+    if backend == parser.BACKEND_STDLIB or parser.lxml_etree is not None
+)
+LAG_PROBE_INTERVAL = 0.001
+NEARBY_STOPS = (1, 2, 5, 10, 20)
+QUICK_NEARBY_STOPS = (1, 5, 20)
+# Upstream latency per stop event request in the nearby stops benchmark
+NEARBY_LATENCY = 0.02
+FILTER_SIZES = (50, 200, 1000)
+QUICK_FILTER_SIZES = (200,)
+STOP_INDEX_SIZES = (1000, 10000)
+QUICK_STOP_INDEX_SIZES = (10000,)
+# Requests per minute allowed in the refresh benchmark
+REFRESH_BUDGET = 1_000_000
+# Fewer than the parse cache holds, so warm runs only hit the cache
+TIMESTAMPS = 256
+# Line 6 is one of the eight fixture lines
+FILTERS = {
+    "none": None,
+    "line": {"lines": ["6"]},
+    "line_destination": {"lines": ["6"], "destination": "St\\. Peter"},
+    "exclude_line": {"lines": ["6"], "exclude_lines": True},
+    "min_minutes": {"min_minutes": 30},
+}
+
+
+def _per_call(func: Callable[[], object], repeat: int) -> float:
+    """Return the best time of one call in seconds."""
+    timer = timeit.Timer(func)
+    number, _elapsed = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _peak_memory(func: Callable[[], object]) -> int:
+    """Return the peak memory allocated during one call in bytes."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    """Return latency percentiles of samples in milliseconds."""
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p90_ms": round(cuts[89] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+def _stream(
+    body: bytes,
+    stop_events: bool,
+    limit: int,
+    backend: str = parser.DEFAULT_BACKEND,
+    departure_filter=None,
+) -> list:
+    """Parse a body in slices the way the coordinator does."""
+    streaming = parser.StreamingParser(
+        stop_events=stop_events, limit=limit, backend=backend, departure_filter=departure_filter
+    )
+    chunk = const.STREAM_CHUNK_SIZE
+    for offset in range(0, len(body), chunk):
+        if streaming.feed(body[offset:offset + chunk]):
+            break
+    return streaming.close()
+
+
+def bench_builders(repeat: int) -> dict[str, float]:
+    """Time rendering each request type, in microseconds."""
+    trip = request_builder.trip_request(47.0707, 15.4395, 47.0766, 15.4152, FETCH_LIMIT)
+    stop_event = request_builder.stop_event_request("at:46:4000", 2 * FETCH_LIMIT)
+
+    def render(template):
+        now = trias_time.format_trias_time(trias_time.utcnow())
+        return template.render(request_timestamp=now, dep_arr_time=now)
+
+    def location():
+        return request_builder.location_request(
+            "Graz Jakominiplatz", trias_time.format_trias_time(trias_time.utcnow())
+        )
+
+    return {
+        "trip_request_us": round(_per_call(lambda: render(trip), repeat) * 1e6, 3),
+        "stop_event_request_us": round(_per_call(lambda: render(stop_event), repeat) * 1e6, 3),
+        "location_request_us": round(_per_call(location, repeat) * 1e6, 3),
+    }
+
+
+def bench_timestamps(repeat: int) -> dict[str, float]:
+    """Time parsing and formatting one TRIAS timestamp, in nanoseconds.
+
+    Compares parse_trias_time, with its cache cold and warm, with the
+    replace('Z', '+00:00') and fromisoformat per field it replaced.
+    """
+    start = datetime(2024, 3, 30, tzinfo=timezone.utc)
+    values = [
+        trias_time.format_trias_time(start + timedelta(minutes=index))
+        for index in range(TIMESTAMPS)
+    ]
+    times = [trias_time.parse_trias_time(value) for value in values]
+    uncached = trias_time.parse_trias_time.__wrapped__
+
+    def replace_fromisoformat():
+        for value in values:
+            datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    def parse_uncached():
+        for value in values:
+            uncached(value)
+
+    def parse_cached():
+        for value in values:
+            trias_time.parse_trias_time(value)
+
+    def format_local():
+        for value in times:
+            trias_time.format_local_time(value)
+
+    cases = {
+        "replace_fromisoformat": replace_fromisoformat,
+        "parse_trias_time_uncached": parse_uncached,
+        "parse_trias_time_cached": parse_cached,
+        "format_local_time": format_local,
+    }
+    return {
+        f"{name}_ns": round(_per_call(func, repeat) / TIMESTAMPS * 1e9, 1)
+        for name, func in cases.items()
+    }
+
+
+def _parse_cases(backend: str) -> dict[tuple[str, str], Callable[[bytes], list]]:
+    """Return the parsers to time, by response kind and parser mode."""
+    return {
+        ("stop_event", "tree"): lambda body: parser.parse_stop_events(body, FETCH_LIMIT, None, backend),
+        ("stop_event", "streaming"): lambda body: _stream(body, True, FETCH_LIMIT, backend),
+        ("trip", "tree"): lambda body: parser.parse_departures(body, FETCH_LIMIT, None, backend),
+        ("trip", "streaming"): lambda body: _stream(body, False, FETCH_LIMIT, backend),
+        ("location", "tree"): lambda body: parser.parse_location_response(body, backend),
+    }
+
+
+def _bodies(size: int, now: datetime) -> dict[str, bytes]:
+    """Return a response of each kind with `size` results."""
+    return {
+        "stop_event": fixtures.stop_event_response(size, now),
+        "trip": fixtures.trip_response(size, now),
+        "location": fixtures.location_response(size, now),
+    }
+
+
+def bench_parsers(sizes: tuple[int, ...], repeat: int) -> list[dict]:
+    """Time the parsers on responses of several sizes."""
+    now = datetime.now(timezone.utc)
+    results = []
+
+    for size in sizes:
+        bodies = _bodies(size, now)
+        for backend in BACKENDS:
+            for (kind, mode), parse in _parse_cases(backend).items():
+                body = bodies[kind]
+                seconds = _per_call(lambda: parse(body), repeat)
+                results.append({
+                    "kind": kind,
+                    "parser": mode,
+                    "backend": backend,
+                    "events": size,
+                    "bytes": len(body),
+                    "results": len(parse(body)),
+                    "call_us": round(seconds * 1e6, 2),
+                    # Per result in the response; the streaming parser stops early
+                    "us_per_event": round(seconds * 1e6 / size, 3),
+                    "peak_memory_kib": round(_peak_memory(lambda: parse(body)) / 1024, 1),
+                })
+
+    return results
+
+
+# The element lookups of the parsers before the single-pass extractors
+NAMESPACES = {"trias": "http://www.vdv.de/trias"}
+
+
+def _find_chain_trip(trip_result, cutoff: datetime):
+    """Extract a trip departure with './/' searches, like the old parser."""
+    leg = trip_result.find(".//trias:TimedLeg", NAMESPACES)
+    if leg is None:
+        return None
+    line = leg.find(".//trias:PublishedLineName/trias:Text", NAMESPACES)
+    destination = leg.find(".//trias:DestinationText/trias:Text", NAMESPACES)
+    estimated = leg.find(".//trias:LegBoard//trias:EstimatedTime", NAMESPACES)
+    scheduled = leg.find(".//trias:LegBoard//trias:TimetabledTime", NAMESPACES)
+    return parser._build_departure(
+        line.text if line is not None else None,
+        destination.text if destination is not None else None,
+        scheduled.text if scheduled is not None else None,
+        estimated.text if estimated is not None else None,
+        cutoff,
+    )
+
+
+def _find_chain_stop_event(event, cutoff: datetime):
+    """Extract a stop event departure with './/' searches, like the old parser."""
+    line = event.find(".//trias:PublishedLineName/trias:Text", NAMESPACES)
+    destination = event.find(".//trias:DestinationText/trias:Text", NAMESPACES)
+    call = event.find(".//trias:ThisCall/trias:CallAtStop/trias:ServiceDeparture", NAMESPACES)
+    scheduled = estimated = None
+    if call is not None:
+        scheduled = call.find("trias:TimetabledTime", NAMESPACES)
+        estimated = call.find("trias:EstimatedTime", NAMESPACES)
+    return parser._build_departure(
+        line.text if line is not None else None,
+        destination.text if destination is not None else None,
+        scheduled.text if scheduled is not None else None,
+        estimated.text if estimated is not None else None,
+        cutoff,
+    )
+
+
+def _find_chain_location(location, cutoff: datetime):
+    """Extract a station with './/' searches, like the old config flow."""
+    stop_point = location.find(".//trias:StopPoint", NAMESPACES)
+    if stop_point is None:
+        return None
+    ref = stop_point.find(".//trias:StopPointRef", NAMESPACES)
+    if ref is None or not ref.text:
+        return None
+    name = stop_point.find(".//trias:StopPointName/trias:Text", NAMESPACES)
+    location_name = location.find(".//trias:LocationName/trias:Text", NAMESPACES)
+    return {
+        "stop_point_ref": ref.text,
+        "stop_point_name": name.text if name is not None else None,
+        "location_name": location_name.text if location_name is not None else None,
+    }
+
+
+# Response kind: (record tag, './/' find chain, single-pass extractor)
+EXTRACTORS = {
+    "trip": (parser.TAG_TRIP_RESULT, _find_chain_trip, parser._extract_trip_departure),
+    "stop_event": (parser.TAG_STOP_EVENT, _find_chain_stop_event, parser._extract_stop_event),
+    "location": (
+        parser.TAG_LOCATION,
+        _find_chain_location,
+        lambda location, cutoff: parser._extract_location(location),
+    ),
+}
+
+
+def bench_extraction(sizes: tuple[int, ...], repeat: int) -> list[dict]:
+    """Time pulling the fields out of parsed records, find chains vs one walk.
+
+    The document is parsed once beforehand, so only the element lookups
+    (and the departure records both build) are timed.
+    """
+    now = datetime.now(timezone.utc)
+    results = []
+
+    for size in sizes:
+        bodies = _bodies(size, now)
+        for backend in BACKENDS:
+            for kind, (tag, find_chain, extract) in EXTRACTORS.items():
+                records = list(parser._fromstring(bodies[kind], backend).iter(tag))
+                timings = {
+                    name: _per_call(
+                        lambda function=function: [function(record, now) for record in records],
+                        repeat,
+                    )
+                    for name, function in (("find_chain", find_chain), ("extractor", extract))
+                }
+                results.append({
+                    "kind": kind,
+                    "backend": backend,
+                    "records": len(records),
+                    "find_chain_us_per_record": round(timings["find_chain"] * 1e6 / len(records), 3),
+                    "extractor_us_per_record": round(timings["extractor"] * 1e6 / len(records), 3),
+                    "speedup": round(timings["find_chain"] / timings["extractor"], 2),
+                })
+
+    return results
+
+
+async def _loop_stall(parse: Callable[[], object], in_executor: bool, repeat: int) -> float:
+    """Return the worst event loop stall while parsing, in seconds."""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+
+    for _ in range(repeat):
+        done = asyncio.Event()
+
+        async def probe() -> None:
+            nonlocal worst
+            while not done.is_set():
+                start = loop.time()
+                await asyncio.sleep(LAG_PROBE_INTERVAL)
+                worst = max(worst, loop.time() - start - LAG_PROBE_INTERVAL)
+
+        task = asyncio.create_task(probe())
+        # Let the probe start sleeping before the parse begins
+        await asyncio.sleep(0)
+        if in_executor:
+            await loop.run_in_executor(None, parse)
+        else:
+            parse()
+        done.set()
+        await task
+
+    return worst
+
+
+async def bench_loop_blocking(sizes: tuple[int, ...], repeat: int) -> list[dict]:
+    """Measure how long parsing on the loop or in the executor stalls it."""
+    now = datetime.now(timezone.utc)
+    results = []
+
+    for size in sizes:
+        bodies = _bodies(size, now)
+        for backend in BACKENDS:
+            for (kind, mode), parse in _parse_cases(backend).items():
+                if kind == "location":
+                    continue
+                body = bodies[kind]
+                row = {
+                    "kind": kind,
+                    "parser": mode,
+                    "backend": backend,
+                    "events": size,
+                    "bytes": len(body),
+                    "executor_by_default": len(body) >= const.PARSE_EXECUTOR_THRESHOLD,
+                }
+                for placement, in_executor in (("inline", False), ("executor", True)):
+                    stall = await _loop_stall(lambda: parse(body), in_executor, repeat)
+                    row[f"{placement}_stall_ms"] = round(stall * 1000, 3)
+                results.append(row)
+
+    return results
+
+
+async def bench_refresh(events: int, iterations: int) -> dict[str, dict]:
+    """Time coordinator refreshes against the mock server.
+
+    Runs the real coordinators on a bare Home Assistant core object, like
+    the load test: render, async_post through the shared connection pool
+    and the request budget, digest, parse in the parse backend. Every
+    other refresh forgets the previous payload, so it is parsed; the
+    others find the payload unchanged and skip parsing.
+    """
+    import tempfile
+
+    try:
+        from homeassistant.core import HomeAssistant
+
+        api = load("api")
+        scheduler = load("scheduler")
+        sensor = load("sensor")
+    except ImportError:
+        return {"skipped": "needs the homeassistant package"}
+
+    from .mock_server import MockTriasServer
+
+    results = {}
+    async with MockTriasServer(events=events) as server:
+        hass = HomeAssistant(tempfile.mkdtemp())
+        hass.data.setdefault(const.DOMAIN, {})[scheduler.DATA_SCHEDULER] = (
+            scheduler.PollScheduler(hass)
+        )
+        # Time the refresh path, not the request budget
+        hass.data[const.DOMAIN][scheduler.DATA_SCHEDULER].async_set_budget(
+            "benchmark", server.url, REFRESH_BUDGET
+        )
+        api.async_set_connection_limit(
+            hass, "benchmark", server.url, const.DEFAULT_CONNECTION_LIMIT
+        )
+
+        for kind, stop_events, config in (
+            ("stop_event", True, {
+                const.CONF_MODE: const.MODE_STATION,
+                const.CONF_STOP_POINT_REF: "at:46:4000",
+            }),
+            ("trip", False, {
+                const.CONF_MODE: const.MODE_TRIP,
+                const.CONF_ORIGIN_LAT: 47.0707,
+                const.CONF_ORIGIN_LON: 15.4395,
+                const.CONF_DEST_LAT: 47.0766,
+                const.CONF_DEST_LON: 15.4152,
+            }),
+        ):
+            coordinator = sensor.SteirischeLinienDataUpdateCoordinator(
+                hass,
+                {
+                    const.CONF_API_URL: server.url,
+                    const.CONF_DEPARTURE_COUNT: FETCH_LIMIT - sensor.DEPARTURE_BUFFER,
+                    **config,
+                },
+            )
+            changed: list[float] = []
+            unchanged: list[float] = []
+
+            for iteration in range(iterations):
+                # Expire the shared result so every refresh goes upstream
+                coordinator._query._updated = None
+                if iteration % 2 == 0:
+                    coordinator._query.payloads.clear()
+
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                elapsed = time.perf_counter() - start
+                if not coordinator.last_update_success:
+                    raise RuntimeError(f"{kind} refresh failed: {coordinator.last_exception}")
+                (changed if iteration % 2 == 0 else unchanged).append(elapsed)
+
+            results[kind] = {
+                "iterations": iterations,
+                "parser_mode": coordinator._parser_mode(stop_events),
+                "departures": len(coordinator.data),
+                "changed": _percentiles(changed),
+                "unchanged": _percentiles(unchanged),
+            }
+            coordinator.async_release()
+
+        await api.async_close_sessions(hass)
+        await hass.async_stop(force=True)
+
+    return results
+
+
+async def bench_transfer(events: int, iterations: int) -> list[dict]:
+    """Compare transfer size and decode time per request profile and encoding."""
+    import aiohttp
+
+    from .mock_server import MockTriasServer
+
+    requests = (
+        ("stop_event", const.PROFILE_LEAN, request_builder.stop_event_request("at:46:4000", 2 * FETCH_LIMIT)),
+        *(
+            ("trip", profile, request_builder.trip_request(
+                47.0707, 15.4395, 47.0766, 15.4152, FETCH_LIMIT, profile
+            ))
+            for profile in (const.PROFILE_FULL, const.PROFILE_LEAN)
+        ),
+    )
+    results = []
+
+    async with MockTriasServer(events=events) as server:
+        # Read bodies as sent, like the integration's sessions do
+        async with aiohttp.ClientSession(auto_decompress=False) as session:
+            for kind, profile, template in requests:
+                for encoding in ("identity", const.ACCEPT_ENCODING):
+                    wire: list[int] = []
+                    decoded: list[int] = []
+                    decode_times: list[float] = []
+                    refresh_times: list[float] = []
+
+                    for _ in range(iterations):
+                        start = time.perf_counter()
+                        now = trias_time.format_trias_time(trias_time.utcnow())
+                        request = template.render(request_timestamp=now, dep_arr_time=now)
+                        async with session.post(
+                            server.url,
+                            data=request,
+                            headers={"Content-Type": "text/xml", "Accept-Encoding": encoding},
+                        ) as response:
+                            body = await response.read()
+                            gzipped = response.headers.get("Content-Encoding") == "gzip"
+                        wire.append(len(body))
+                        if gzipped:
+                            decode_start = time.perf_counter()
+                            # What api.decode_body does for gzip
+                            body = zlib.decompress(body, wbits=16 + zlib.MAX_WBITS)
+                            decode_times.append(time.perf_counter() - decode_start)
+                        decoded.append(len(body))
+                        _stream(body, kind == "stop_event", FETCH_LIMIT)
+                        refresh_times.append(time.perf_counter() - start)
+
+                    results.append({
+                        "kind": kind,
+                        "profile": profile,
+                        "encoding": "gzip" if decode_times else "identity",
+                        "request_bytes": len(request),
+                        "wire_bytes": round(statistics.mean(wire)),
+                        "decoded_bytes": round(statistics.mean(decoded)),
+                        "decode_us": (
+                            round(statistics.median(decode_times) * 1e6, 1) if decode_times else 0
+                        ),
+                        "refresh": _percentiles(refresh_times),
+                    })
+
+    return results
+
+
+def _sort_then_set(results: list[list], limit: int) -> list:
+    """Merge per-stop departures the old way: sort everything, then dedupe."""
+    departures = sorted(
+        (departure for departures in results for departure in departures),
+        key=lambda departure: departure.departure,
+    )
+    seen = set()
+    unique = []
+    for departure in departures:
+        if departure.key not in seen:
+            seen.add(departure.key)
+            unique.append(departure)
+            if len(unique) >= limit:
+                break
+    return unique
+
+
+def bench_merge(stop_counts: tuple[int, ...], repeat: int) -> list[dict]:
+    """Time merging the departures of several stops, heap merge vs sorting."""
+    now = datetime.now(timezone.utc)
+    results = []
+
+    for count in stop_counts:
+        per_stop = [
+            parser.parse_stop_events(
+                fixtures.stop_event_response(2 * FETCH_LIMIT, now, stop), FETCH_LIMIT
+            )
+            for stop in range(count)
+        ]
+        merged = parser.merge_departures(per_stop, FETCH_LIMIT)
+        if merged != _sort_then_set(per_stop, FETCH_LIMIT):
+            raise AssertionError(f"Merge results differ for {count} stops")
+
+        results.append({
+            "stops": count,
+            "departures_in": sum(len(departures) for departures in per_stop),
+            "departures_out": len(merged),
+            "heap_merge_us": round(
+                _per_call(lambda: parser.merge_departures(per_stop, FETCH_LIMIT), repeat) * 1e6, 2
+            ),
+            "sort_then_set_us": round(
+                _per_call(lambda: _sort_then_set(per_stop, FETCH_LIMIT), repeat) * 1e6, 2
+            ),
+        })
+
+    return results
+
+
+async def bench_nearby(stop_counts: tuple[int, ...], iterations: int) -> list[dict]:
+    """Time refreshing 1 to 20 nearby stops the way the nearby coordinator does."""
+    import aiohttp
+
+    from .mock_server import MockTriasServer
+
+    results = []
+    async with MockTriasServer(events=2 * FETCH_LIMIT, latency=NEARBY_LATENCY) as server:
+        async with aiohttp.ClientSession() as session:
+
+            async def fetch(template, semaphore: asyncio.Semaphore) -> list:
+                async with semaphore:
+                    now = trias_time.format_trias_time(trias_time.utcnow())
+                    request = template.render(request_timestamp=now, dep_arr_time=now)
+                    async with session.post(
+                        server.url, data=request, headers={"Content-Type": "text/xml"}
+                    ) as response:
+                        body = await response.read()
+                    return _stream(body, True, FETCH_LIMIT)
+
+            for count in stop_counts:
+                templates = [
+                    request_builder.stop_event_request(f"at:46:{4000 + stop}", 2 * FETCH_LIMIT)
+                    for stop in range(count)
+                ]
+                refresh_times: list[float] = []
+                merge_times: list[float] = []
+
+                for _ in range(iterations):
+                    semaphore = asyncio.Semaphore(const.NEARBY_STOPS_PARALLELISM)
+                    start = time.perf_counter()
+                    per_stop = await asyncio.gather(
+                        *(fetch(template, semaphore) for template in templates)
+                    )
+                    merge_start = time.perf_counter()
+                    merged = parser.merge_departures(per_stop, FETCH_LIMIT)
+                    merge_times.append(time.perf_counter() - merge_start)
+                    refresh_times.append(time.perf_counter() - start)
+
+                results.append({
+                    "stops": count,
+                    "parallelism": const.NEARBY_STOPS_PARALLELISM,
+                    "latency_ms": NEARBY_LATENCY * 1000,
+                    "departures": len(merged),
+                    "merge_us": round(statistics.median(merge_times) * 1e6, 2),
+                    "refresh": _percentiles(refresh_times),
+                })
+
+    return results
+
+
+def bench_filters(sizes: tuple[int, ...], repeat: int) -> list[dict]:
+    """Time the parsers with departure filters of different selectivity."""
+    now = datetime.now(timezone.utc)
+    results = []
+
+    for size in sizes:
+        bodies = {
+            "stop_event": fixtures.stop_event_response(size, now),
+            "trip": fixtures.trip_response(size, now),
+        }
+        for name, options in FILTERS.items():
+            departure_filter = parser.DepartureFilter(**options) if options else None
+            for kind, stop_events in (("stop_event", True), ("trip", False)):
+                body = bodies[kind]
+                parse_tree = parser.parse_stop_events if stop_events else parser.parse_departures
+                counters = collections.Counter()
+                parse_tree(body, FETCH_LIMIT, counters, parser.DEFAULT_BACKEND, departure_filter)
+                streaming = parser.StreamingParser(
+                    stop_events=stop_events, limit=FETCH_LIMIT, departure_filter=departure_filter
+                )
+                streaming.feed(body)
+                streaming.close()
+
+                cases = {
+                    "tree": (
+                        counters["events_parsed"],
+                        lambda: parse_tree(
+                            body, FETCH_LIMIT, None, parser.DEFAULT_BACKEND, departure_filter
+                        ),
+                    ),
+                    # Stops reading once FETCH_LIMIT departures matched
+                    "streaming": (
+                        streaming.events,
+                        lambda: _stream(
+                            body, stop_events, FETCH_LIMIT, departure_filter=departure_filter
+                        ),
+                    ),
+                }
+                for mode, (events_read, parse) in cases.items():
+                    results.append({
+                        "kind": kind,
+                        "parser": mode,
+                        "filter": name,
+                        "events": size,
+                        "events_read": events_read,
+                        "results": len(parse()),
+                        "call_us": round(_per_call(parse, repeat) * 1e6, 2),
+                    })
+
+    return results
+
+
+def _stop_index_queries(names: list[str]) -> dict[str, str]:
+    """Return a search of each kind for an index of `names`."""
+    name = names[len(names) // 2]
+    return {
+        "prefix": " ".join(part[:4] for part in name.split()[:2]),
+        "full_name": name,
+        "typo": name[:6] + name[7:],
+        "not_indexed": "Graz Kunsthaus Lendkai",
+    }
+
+
+def bench_stop_index(stop_counts: tuple[int, ...], repeat: int) -> list[dict] | dict:
+    """Time building the offline stop index and searching it."""
+    try:
+        stop_index = load("stop_index")
+    except ImportError:
+        return {"skipped": "needs the homeassistant package"}
+
+    results = []
+    for count in stop_counts:
+        stations = [
+            {
+                "stop_point_ref": f"at:46:{index}",
+                "stop_point_name": name,
+                "location_name": None,
+                "display_name": name,
+            }
+            for index, name in enumerate(fixtures.stop_names(count))
+        ]
+
+        def build():
+            index = stop_index.StopIndex()
+            index.add_all(stations)
+            index.sort_tokens()
+            return index
+
+        index = build()
+        row = {
+            "stops": count,
+            "build_ms": round(_per_call(build, repeat) * 1000, 1),
+        }
+        queries = _stop_index_queries([station["display_name"] for station in stations])
+        for kind, query in queries.items():
+            row[f"{kind}_results"] = len(index.search(query))
+            for search in ("search_prefix", "search_similar"):
+                method = getattr(index, search)
+                row[f"{kind}_{search}_us"] = round(_per_call(lambda: method(query), repeat) * 1e6, 1)
+        results.append(row)
+
+    return results
+
+
+def _commit() -> str | None:
+    """Return the current git commit, if known."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument("--quick", action="store_true", help="fewer sizes and iterations")
+    arguments.add_argument("--output", help="write the JSON results to this file")
+    arguments.add_argument("--events", type=int, default=40, help="results per mock response")
+    arguments.add_argument("--iterations", type=int, default=200, help="refreshes per request type")
+    options = arguments.parse_args()
+
+    repeat = 3 if options.quick else 5
+    iterations = 40 if options.quick else options.iterations
+    sizes = QUICK_SIZES if options.quick else SIZES
+    nearby_stops = QUICK_NEARBY_STOPS if options.quick else NEARBY_STOPS
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "builders": bench_builders(repeat),
+        "timestamps": bench_timestamps(repeat),
+        "parsers": bench_parsers(sizes, repeat),
+        "extraction": bench_extraction(sizes, repeat),
+        "loop_blocking": asyncio.run(bench_loop_blocking(sizes, repeat)),
+        "refresh_events": options.events,
+        "refresh": asyncio.run(bench_refresh(options.events, iterations)),
+        "transfer": asyncio.run(bench_transfer(options.events, iterations)),
+        "merge": bench_merge(nearby_stops, repeat),
+        "filters": bench_filters(QUICK_FILTER_SIZES if options.quick else FILTER_SIZES, repeat),
+        "nearby": asyncio.run(bench_nearby(nearby_stops, iterations // 4)),
+        "stop_index": bench_stop_index(
+            QUICK_STOP_INDEX_SIZES if options.quick else STOP_INDEX_SIZES, repeat
+        ),
+    }
+
+    output = json.dumps(results, indent=2)
+    if options.output:
+        Path(options.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
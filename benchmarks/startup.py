@@ -0,0 +1,210 @@
+"""Startup benchmark: setting up many config entries against a slow API.
+
+    python -m benchmarks.startup --entries 50 --latency 1
+
+Sets up the sensor platform of `--entries` station entries on a bare Home
+Assistant core object, all at once like Home Assistant does at startup,
+against the local mock TRIAS server. Scenarios:
+
+- blocking_first_refresh: every entry waits for its first poll before its
+  setup finishes, like the integration did before departure snapshots
+- cold: no saved snapshot; entries are set up and polled in the background
+- restored: setup restores the snapshot the cold run saved
+- restored_endpoint_down: as restored, with every request failing
+
+For each it reports how long setup of all entries took, how long until
+every entry showed departures, until the API had answered a poll of every
+entry (not measured while the API is failing) and how many entries show
+departures at the end.
+Needs the homeassistant package; results are printed as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Import the integration as custom_components.steirische_linien
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.steirische_linien import sensor  # noqa: E402
+from custom_components.steirische_linien.api import async_close_sessions  # noqa: E402
+from custom_components.steirische_linien.const import (  # noqa: E402
+    CONF_API_URL,
+    CONF_MODE,
+    CONF_STOP_POINT_REF,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DOMAIN,
+    MODE_STATION,
+    STARTUP_REFRESH_WINDOW,
+)
+from custom_components.steirische_linien.scheduler import (  # noqa: E402
+    DATA_SCHEDULER,
+    PollScheduler,
+)
+
+from .mock_server import MockTriasServer  # noqa: E402
+
+SCENARIOS = ("blocking_first_refresh", "cold", "restored", "restored_endpoint_down")
+WAIT_STEP = 0.01
+
+
+def _entry(index: int, url: str) -> ConfigEntry:
+    """Return the config entry of the index-th station."""
+    return ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=f"Station {index}",
+        data={
+            CONF_MODE: MODE_STATION,
+            CONF_API_URL: url,
+            CONF_STOP_POINT_REF: f"at:46:{4000 + index}",
+        },
+        source="user",
+        entry_id=f"entry_{index}",
+    )
+
+
+async def _async_setup(
+    hass: HomeAssistant, entry: ConfigEntry, options: argparse.Namespace, blocking: bool
+) -> None:
+    """Set up one entry the way the integration's async_setup_entry does."""
+    scheduler: PollScheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+    entry.async_on_unload(
+        scheduler.async_set_budget(entry.entry_id, entry.data[CONF_API_URL], options.rpm)
+    )
+    await sensor.async_setup_entry(hass, entry, lambda entities, *args: None)
+    if blocking:
+        # Joins the scheduler's first poll, which is already in flight
+        coordinator = hass.data[DOMAIN][sensor.DATA_COORDINATORS][entry.entry_id]
+        await coordinator.async_refresh()
+
+
+async def _async_wait(condition, timeout: float) -> float | None:
+    """Return the seconds until condition() held, or None on timeout."""
+    start = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start > timeout:
+            return None
+        await asyncio.sleep(WAIT_STEP)
+    return time.perf_counter() - start
+
+
+async def _async_skip() -> None:
+    """Stand in for a wait that is not measured."""
+    return None
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Return seconds as rounded milliseconds."""
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+async def run_scenario(
+    scenario: str, options: argparse.Namespace, server: MockTriasServer, config_dir: str
+) -> dict:
+    """Set up all entries and time how long until they show departures."""
+    server.error_rate = 1.0 if scenario == "restored_endpoint_down" else 0.0
+    requests = server.requests
+
+    hass = HomeAssistant(config_dir)
+    hass.data.setdefault(DOMAIN, {})[DATA_SCHEDULER] = PollScheduler(hass)
+    entries = [_entry(index, server.url) for index in range(options.entries)]
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _async_setup(hass, entry, options, scenario == "blocking_first_refresh")
+            for entry in entries
+        )
+    )
+    setup = time.perf_counter() - start
+
+    coordinators = list(hass.data[DOMAIN][sensor.DATA_COORDINATORS].values())
+    # Both waits start when setup returned
+    departures, polled = await asyncio.gather(
+        _async_wait(
+            lambda: all(coordinator.data for coordinator in coordinators), options.timeout
+        ),
+        _async_wait(
+            lambda: server.requests - requests >= options.entries, options.timeout
+        )
+        if not server.error_rate
+        else _async_skip(),
+    )
+    if server.error_rate:
+        # The circuit breaker stops requests reaching the server; give the
+        # first polls time to fail before counting what is still shown
+        await asyncio.sleep(STARTUP_REFRESH_WINDOW + 2 * (options.latency + options.jitter))
+
+    result = {
+        "scenario": scenario,
+        "entries": options.entries,
+        "setup_ms": _ms(setup),
+        "departures_ms": _ms(setup + departures if departures is not None else None),
+        "all_polled_ms": _ms(setup + polled if polled is not None else None),
+        "entries_with_departures": sum(bool(coordinator.data) for coordinator in coordinators),
+    }
+
+    for entry in entries:
+        await entry._async_process_on_unload(hass)
+    await async_close_sessions(hass)
+    # Flushes the delayed snapshot save
+    await hass.async_stop(force=True)
+    return result
+
+
+async def main_async(options: argparse.Namespace) -> dict:
+    """Run all scenarios against one mock server."""
+    async with MockTriasServer(latency=options.latency, jitter=options.jitter) as server:
+        # The later scenarios restore what the cold run saved
+        results = [
+            await run_scenario(
+                "blocking_first_refresh", options, server, tempfile.mkdtemp()
+            )
+        ]
+        config_dir = tempfile.mkdtemp()
+        results.extend(
+            [await run_scenario(scenario, options, server, config_dir) for scenario in SCENARIOS[1:]]
+        )
+
+    return {
+        "settings": {
+            "entries": options.entries,
+            "latency_s": options.latency,
+            "jitter_s": options.jitter,
+            "requests_per_minute": options.rpm,
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    """Run the startup benchmark."""
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arguments.add_argument("--entries", type=int, default=50, help="config entries")
+    arguments.add_argument("--latency", type=float, default=1.0, help="mock response latency (s)")
+    arguments.add_argument("--jitter", type=float, default=0.5, help="extra random latency (s)")
+    arguments.add_argument(
+        "--rpm", type=int, default=DEFAULT_REQUESTS_PER_MINUTE, help="request budget per minute"
+    )
+    arguments.add_argument("--timeout", type=float, default=180, help="give up waiting after (s)")
+    arguments.add_argument("--output", help="write the JSON results to this file")
+    options = arguments.parse_args()
+
+    output = json.dumps(asyncio.run(main_async(options)), indent=2)
+    if options.output:
+        Path(options.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
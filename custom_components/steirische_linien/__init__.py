@@ -2,32 +2,83 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
+from .api import async_close_session, async_set_connection_limit
+from .const import (
+    CONF_API_URL,
+    CONF_CONNECTION_LIMIT,
+    CONF_REQUESTS_PER_MINUTE,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_REQUESTS_PER_MINUTE,
+)
+from .scheduler import DATA_SCHEDULER, PollScheduler
+from .snapshot_store import async_get_snapshot_store
+
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "steirische_linien"
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
-SCAN_INTERVAL = timedelta(minutes=1)
-
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Steirische Linien from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = entry.data
 
+    # One scheduler paces the polls of all entries
+    if DATA_SCHEDULER not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][DATA_SCHEDULER] = PollScheduler(hass)
+    scheduler: PollScheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+    entry.async_on_unload(
+        scheduler.async_set_budget(
+            entry.entry_id,
+            entry.data[CONF_API_URL],
+            entry.options.get(CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE),
+        )
+    )
+
+    # All entries of an endpoint share one connection pool; the highest
+    # limit any of them asks for applies
+    entry.async_on_unload(
+        async_set_connection_limit(
+            hass,
+            entry.entry_id,
+            entry.data[CONF_API_URL],
+            entry.options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+        )
+    )
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
 
-    return unload_ok
\ No newline at end of file
+        # Close the connection pool once no loaded entry uses this endpoint
+        api_url = entry.data[CONF_API_URL]
+        if not any(
+            other.data.get(CONF_API_URL) == api_url
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id in hass.data[DOMAIN]
+        ):
+            await async_close_session(hass, api_url)
+
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the saved departures of a removed config entry."""
+    await async_get_snapshot_store(hass).async_remove(entry.entry_id)
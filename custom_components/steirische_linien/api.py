@@ -0,0 +1,378 @@
+"""Shared HTTP sessions for the TRIAS API."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+import async_timeout
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import (
+    DOMAIN,
+    ACCEPT_ENCODING,
+    ATTEMPT_TIMEOUT,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    DEFAULT_CONNECTION_LIMIT,
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT,
+    REQUEST_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+)
+from .metrics import (
+    STAGE_CONNECT,
+    STAGE_DECODE,
+    STAGE_FIRST_BYTE,
+    STAGE_READ,
+    RequestTrace,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SESSIONS = "sessions"
+DATA_RETIRED_SESSIONS = "retired_sessions"
+DATA_CONNECTION_LIMITS = "connection_limits"
+DATA_CLOSE_LISTENER = "close_listener"
+DATA_BREAKERS = "breakers"
+
+
+class CircuitOpenError(Exception):
+    """Error to indicate the circuit breaker of an endpoint is open."""
+
+
+class CircuitBreaker:
+    """Stop sending requests to an endpoint that keeps failing.
+
+    After BREAKER_FAILURE_THRESHOLD failed requests in a row the circuit
+    opens and requests fail at once. After BREAKER_RESET_TIMEOUT seconds a
+    single trial request is let through; its outcome closes the circuit or
+    opens it again. A trial that is cancelled or refused with a 4xx has no
+    outcome, and the next request becomes the trial.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize."""
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened: float | None = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are being rejected."""
+        return self._opened is not None
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        if self._opened is None:
+            return True
+        if self._trial or time.monotonic() - self._opened < self._reset_timeout:
+            return False
+        self._trial = True
+        return True
+
+    def release_trial(self) -> None:
+        """Let another request be the trial after one ended without an outcome."""
+        self._trial = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self._failures = 0
+        self._opened = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold."""
+        self._failures += 1
+        if self._trial or self._failures >= self._failure_threshold:
+            if self._opened is None or self._trial:
+                _LOGGER.warning(
+                    f"Opening circuit after {self._failures} failed requests, "
+                    f"pausing requests for {self._reset_timeout} seconds"
+                )
+            self._opened = time.monotonic()
+            self._trial = False
+
+
+async def _on_request_start(session, context, params) -> None:
+    """Start the stage clock of a traced request."""
+    if (trace := context.trace_request_ctx) is not None:
+        trace.start()
+
+
+async def _on_connection_ready(session, context, params) -> None:
+    """Record the time spent getting a connection."""
+    if (trace := context.trace_request_ctx) is not None:
+        trace.mark(STAGE_CONNECT)
+
+
+async def _on_request_end(session, context, params) -> None:
+    """Record the time until the response headers arrived."""
+    if (trace := context.trace_request_ctx) is not None:
+        trace.mark(STAGE_FIRST_BYTE)
+
+
+# Requests without a RequestTrace pass through the hooks untouched
+_TRACE_CONFIG = aiohttp.TraceConfig()
+_TRACE_CONFIG.on_request_start.append(_on_request_start)
+_TRACE_CONFIG.on_connection_create_end.append(_on_connection_ready)
+_TRACE_CONFIG.on_connection_reuseconn.append(_on_connection_ready)
+_TRACE_CONFIG.on_request_end.append(_on_request_end)
+
+
+@callback
+def async_set_connection_limit(
+    hass: HomeAssistant, entry_id: str, api_url: str, limit: int
+) -> CALLBACK_TYPE:
+    """Set the connection limit a config entry wants for an API URL.
+
+    The highest limit of all entries using the URL applies, so the result
+    does not depend on the order entries are loaded in. Returns a callback
+    that withdraws the entry's limit again.
+    """
+    limits: dict[str, dict[str, int]] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_CONNECTION_LIMITS, {}
+    )
+    limits.setdefault(api_url, {})[entry_id] = limit
+
+    @callback
+    def _remove() -> None:
+        entry_limits = limits.get(api_url, {})
+        entry_limits.pop(entry_id, None)
+        if not entry_limits:
+            limits.pop(api_url, None)
+
+    return _remove
+
+
+def connection_limit(hass: HomeAssistant, api_url: str) -> int:
+    """Return the connection limit that applies to an API URL."""
+    limits = hass.data.get(DOMAIN, {}).get(DATA_CONNECTION_LIMITS, {})
+    if entry_limits := limits.get(api_url):
+        return max(entry_limits.values())
+    return DEFAULT_CONNECTION_LIMIT
+
+
+@callback
+def async_get_session(hass: HomeAssistant, api_url: str) -> aiohttp.ClientSession:
+    """Return the keep-alive session for an API URL, creating it on first use.
+
+    All coordinators and the config flow talking to the same endpoint share
+    one connection pool, so polls reuse open connections instead of doing a
+    new TCP/TLS handshake every time. When the connection limit of the URL
+    changed, the pool is replaced by one with the new limit.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    sessions: dict[str, aiohttp.ClientSession] = domain_data.setdefault(DATA_SESSIONS, {})
+    limit = connection_limit(hass, api_url)
+
+    session = sessions.get(api_url)
+    if session is not None and not session.closed and session.connector.limit != limit:
+        _async_retire_session(hass, session)
+        session = None
+
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            use_dns_cache=True,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        # Bodies are decompressed by async_read_body, which also measures
+        # the transferred size and the decode time
+        session = aiohttp.ClientSession(
+            connector=connector,
+            auto_decompress=False,
+            trace_configs=[_TRACE_CONFIG],
+        )
+        sessions[api_url] = session
+        _LOGGER.debug(f"Created connection pool for {api_url} (limit {limit})")
+
+    if DATA_CLOSE_LISTENER not in domain_data:
+
+        async def _async_close_all(event: Event) -> None:
+            await async_close_sessions(hass)
+
+        domain_data[DATA_CLOSE_LISTENER] = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close_all
+        )
+
+    return session
+
+
+@callback
+def _async_retire_session(hass: HomeAssistant, session: aiohttp.ClientSession) -> None:
+    """Close a replaced session once the requests still using it are done."""
+    retired: set[aiohttp.ClientSession] = hass.data[DOMAIN].setdefault(
+        DATA_RETIRED_SESSIONS, set()
+    )
+    retired.add(session)
+
+    async def _async_close() -> None:
+        # No request outlives REQUEST_TIMEOUT once it got a connection
+        await asyncio.sleep(REQUEST_TIMEOUT)
+        retired.discard(session)
+        await session.close()
+
+    hass.async_create_background_task(_async_close(), f"{DOMAIN} close replaced pool")
+
+
+async def async_close_session(hass: HomeAssistant, api_url: str) -> None:
+    """Close the session for an API URL if one is open."""
+    sessions = hass.data.get(DOMAIN, {}).get(DATA_SESSIONS, {})
+    session = sessions.pop(api_url, None)
+    if session is not None and not session.closed:
+        await session.close()
+        _LOGGER.debug(f"Closed connection pool for {api_url}")
+
+
+async def async_close_sessions(hass: HomeAssistant) -> None:
+    """Close all open sessions, including replaced ones still draining."""
+    domain_data = hass.data.get(DOMAIN, {})
+    for api_url in list(domain_data.get(DATA_SESSIONS, {})):
+        await async_close_session(hass, api_url)
+    retired = domain_data.get(DATA_RETIRED_SESSIONS, set())
+    while retired:
+        await retired.pop().close()
+
+
+@callback
+def async_get_circuit_breaker(hass: HomeAssistant, api_url: str) -> CircuitBreaker:
+    """Return the circuit breaker for an API URL, creating it on first use."""
+    breakers: dict[str, CircuitBreaker] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_BREAKERS, {}
+    )
+    if (breaker := breakers.get(api_url)) is None:
+        breaker = breakers[api_url] = CircuitBreaker()
+    return breaker
+
+
+def decode_body(body: bytes, content_encoding: str) -> bytes:
+    """Decompress a response body sent with gzip or deflate encoding."""
+    encoding = content_encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return body
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompress(body, wbits=16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate data without the zlib header
+            return zlib.decompress(body, wbits=-zlib.MAX_WBITS)
+    raise ValueError(f"Unsupported content encoding {content_encoding}")
+
+
+async def async_read_body(
+    response: aiohttp.ClientResponse, trace: RequestTrace | None = None
+) -> bytes:
+    """Read a response body as sent and return it decompressed.
+
+    A trace records the read and decode times and counts the bytes
+    transferred as wire_bytes.
+    """
+    body = await response.read()
+    if trace is not None:
+        trace.mark(STAGE_READ)
+        trace.metrics.counters["wire_bytes"] += len(body)
+
+    encoding = response.headers.get(aiohttp.hdrs.CONTENT_ENCODING, "")
+    if not encoding:
+        return body
+
+    body = decode_body(body, encoding)
+    if trace is not None:
+        trace.mark(STAGE_DECODE)
+    return body
+
+
+def _is_retryable(err: Exception) -> bool:
+    """Return True if a failed request is worth another attempt."""
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status == 429 or err.status >= 500
+    return isinstance(err, (asyncio.TimeoutError, aiohttp.ClientError))
+
+
+async def async_post(
+    hass: HomeAssistant,
+    api_url: str,
+    data: bytes,
+    headers: dict[str, str],
+    acquire: Callable[[], Awaitable[None]] | None = None,
+    trace: RequestTrace | None = None,
+) -> bytes:
+    """Post a request and return the response body, retrying on failure.
+
+    Each attempt has its own ATTEMPT_TIMEOUT and all attempts together stay
+    within REQUEST_TIMEOUT, counted from when the first attempt may start.
+    Timeouts, connection errors and 429/5xx answers are retried after an
+    exponential backoff with full jitter. The endpoint's circuit breaker
+    rejects requests while it is open. acquire is awaited before every
+    attempt, so retries count against the request budget. A trace records
+    the stage timings of each attempt. Compressed responses are accepted
+    and returned decompressed.
+    """
+    headers = {aiohttp.hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING, **headers}
+    breaker = async_get_circuit_breaker(hass, api_url)
+    session = async_get_session(hass, api_url)
+    deadline: float | None = None
+
+    attempt = 0
+    while True:
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {api_url}")
+
+        try:
+            if acquire is not None:
+                await acquire()
+            # Waiting for the request budget is not the endpoint being slow
+            if deadline is None:
+                deadline = time.monotonic() + REQUEST_TIMEOUT
+
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            async with async_timeout.timeout(min(ATTEMPT_TIMEOUT, max(remaining, 0))):
+                async with session.post(
+                    api_url, data=data, headers=headers, trace_request_ctx=trace
+                ) as response:
+                    response.raise_for_status()
+                    body = await async_read_body(response, trace)
+        except Exception as err:
+            if not _is_retryable(err):
+                # The request itself was refused, which says nothing about
+                # whether the endpoint recovered
+                breaker.release_trial()
+                raise
+            breaker.record_failure()
+
+            delay = random.uniform(
+                0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** (attempt - 1))
+            )
+            if attempt >= RETRY_ATTEMPTS or time.monotonic() + delay >= deadline:
+                raise
+            _LOGGER.debug(
+                f"Request to {api_url} failed ({err!r}), retrying in {delay:.1f} seconds"
+            )
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled while waiting for the budget or the answer
+            breaker.release_trial()
+            raise
+
+        breaker.record_success()
+        return body
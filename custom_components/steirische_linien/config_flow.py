@@ -2,31 +2,93 @@
 from __future__ import annotations
 
 import logging
+import re
 from typing import Any
-from datetime import datetime, timezone
-from xml.etree import ElementTree as ET
 
 import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
 from . import DOMAIN
+from .api import async_get_session, async_read_body
 from .const import (
+    ACCEPT_ENCODING,
+    CONF_ADAPTIVE_POLLING,
+    CONF_AGGREGATE_SENSOR,
+    CONF_COLLECT_METRICS,
+    CONF_CONNECTION_LIMIT,
+    CONF_DEPARTURE_COUNT,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_UNRECORDED_VOLATILE,
+    CONF_MAX_INTERVAL,
+    CONF_MAX_STALE_AGE,
+    CONF_MIN_INTERVAL,
+    CONF_PARSER_MODE,
+    CONF_REQUEST_PROFILE,
+    CONF_DESTINATION_PATTERN,
+    CONF_LINE_FILTER_MODE,
+    CONF_LINES,
+    CONF_MIN_MINUTES,
+    CONF_PLATFORMS,
+    DEFAULT_LINE_FILTER_MODE,
+    LINE_FILTER_EXCLUDE,
+    LINE_FILTER_INCLUDE,
+    MAX_MIN_MINUTES,
+    CONF_REQUESTS_PER_MINUTE,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_AGGREGATE_SENSOR,
+    DEFAULT_COLLECT_METRICS,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_DEPARTURE_COUNT,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_UNRECORDED_VOLATILE,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MAX_STALE_AGE,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_PARSER_MODE,
+    DEFAULT_REQUEST_PROFILE,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    MAX_DEPARTURE_COUNT,
+    PARSER_AUTO,
+    PARSER_STREAMING,
+    PARSER_TREE,
+    PROFILE_FULL,
+    PROFILE_LEAN,
     MODE_TRIP,
     MODE_STATION,
+    MODE_MULTI_TRIP,
     CONF_MODE,
+    CONF_ADD_ANOTHER,
     CONF_API_URL,
+    CONF_ROUTES,
+    CONF_ROUTE_NAME,
     CONF_ORIGIN_LAT,
     CONF_ORIGIN_LON,
     CONF_DEST_LAT,
     CONF_DEST_LON,
     CONF_STATION_NAME,
     CONF_STOP_POINT_REF,
+    CONF_LATITUDE,
+    CONF_LONGITUDE,
+    CONF_RADIUS,
+    CONF_MAX_STOPS,
+    CONF_STOP_POINTS,
+    DEFAULT_RADIUS,
+    DEFAULT_MAX_STOPS,
+    MAX_RADIUS,
+    MAX_NEARBY_STOPS,
+    MODE_NEARBY,
 )
+from .parse_backend import async_get_parse_backend
+from .parser import parse_location_response
+from .request_builder import location_request, nearby_stops_request
+from .station_cache import async_get_station_cache
+from .stop_index import async_get_stop_index, async_harvest_stations
+from .trias_time import format_trias_time, utcnow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,7 +96,9 @@ _LOGGER = logging.getLogger(__name__)
 STEP_MODE_SCHEMA = vol.Schema({
     vol.Required(CONF_MODE, default=MODE_TRIP): vol.In({
         MODE_TRIP: "Trip Planning (Origin → Destination)",
-        MODE_STATION: "Station Departures (Single Station)"
+        MODE_STATION: "Station Departures (Single Station)",
+        MODE_MULTI_TRIP: "Multiple Trips (Several Origin → Destination Pairs)",
+        MODE_NEARBY: "Nearby Stops (All Stops Within a Radius)"
     })
 })
 
@@ -47,20 +111,42 @@ STEP_TRIP_SCHEMA = vol.Schema({
     vol.Required(CONF_DEST_LON): float,
 })
 
+# Schema for multi-trip mode: the API URL, then one step per route
+STEP_MULTI_TRIP_SCHEMA = vol.Schema({
+    vol.Required(CONF_API_URL): str,
+})
+
+STEP_ROUTE_SCHEMA = vol.Schema({
+    vol.Required(CONF_ROUTE_NAME): str,
+    vol.Required(CONF_ORIGIN_LAT): float,
+    vol.Required(CONF_ORIGIN_LON): float,
+    vol.Required(CONF_DEST_LAT): float,
+    vol.Required(CONF_DEST_LON): float,
+    vol.Optional(CONF_ADD_ANOTHER, default=False): bool,
+})
+
 # Schema for station mode
 STEP_STATION_SCHEMA = vol.Schema({
     vol.Required(CONF_API_URL): str,
     vol.Required(CONF_STATION_NAME): str,
 })
 
+# Schema for nearby stops mode
+STEP_NEARBY_SCHEMA = vol.Schema({
+    vol.Required(CONF_API_URL): str,
+    vol.Required(CONF_LATITUDE): float,
+    vol.Required(CONF_LONGITUDE): float,
+    vol.Required(CONF_RADIUS, default=DEFAULT_RADIUS): vol.All(
+        vol.Coerce(int), vol.Range(min=10, max=MAX_RADIUS)
+    ),
+    vol.Required(CONF_MAX_STOPS, default=DEFAULT_MAX_STOPS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_NEARBY_STOPS)
+    ),
+})
 
-async def validate_trip_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the trip planning input."""
-    # Validate URL format
-    if not data[CONF_API_URL].startswith(("http://", "https://")):
-        raise ValueError("Invalid API URL format")
 
-    # Validate coordinates are within reasonable bounds
+def _validate_coordinates(data: dict[str, Any]) -> None:
+    """Validate that the coordinates of a trip are within reasonable bounds."""
     if not -90 <= data[CONF_ORIGIN_LAT] <= 90:
         raise ValueError("Invalid origin latitude")
     if not -180 <= data[CONF_ORIGIN_LON] <= 180:
@@ -70,9 +156,48 @@ async def validate_trip_input(hass: HomeAssistant, data: dict[str, Any]) -> dict
     if not -180 <= data[CONF_DEST_LON] <= 180:
         raise ValueError("Invalid destination longitude")
 
+
+def _valid_pattern(pattern: str) -> bool:
+    """Return True if a destination filter is empty or a valid regular expression."""
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+    return True
+
+
+async def validate_trip_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the trip planning input."""
+    # Validate URL format
+    if not data[CONF_API_URL].startswith(("http://", "https://")):
+        raise ValueError("Invalid API URL format")
+
+    _validate_coordinates(data)
+
     return {"title": "Powerhaus - Steirische Öffis"}
 
 
+async def validate_route_input(
+    hass: HomeAssistant, data: dict[str, Any], routes: list[dict]
+) -> dict[str, Any]:
+    """Validate one route of a multi-trip entry."""
+    name = data[CONF_ROUTE_NAME].strip()
+    if not name:
+        raise ValueError("Route name cannot be empty")
+    if any(route[CONF_ROUTE_NAME] == name for route in routes):
+        raise ValueError(f"Route name {name} is already used")
+
+    _validate_coordinates(data)
+
+    return {
+        CONF_ROUTE_NAME: name,
+        CONF_ORIGIN_LAT: data[CONF_ORIGIN_LAT],
+        CONF_ORIGIN_LON: data[CONF_ORIGIN_LON],
+        CONF_DEST_LAT: data[CONF_DEST_LAT],
+        CONF_DEST_LON: data[CONF_DEST_LON],
+    }
+
+
 async def validate_station_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the station input."""
     # Validate URL format
@@ -86,91 +211,96 @@ async def validate_station_input(hass: HomeAssistant, data: dict[str, Any]) -> d
     return {"title": "Powerhaus - Steirische Öffis"}
 
 
-async def search_stations(api_url: str, station_name: str) -> list[dict]:
-    """Search for stations by name using TRIAS API."""
-    xml_request = _create_location_request_xml(station_name)
-
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                api_url,
-                data=xml_request.encode('utf-8'),
-                headers={
-                    'User-Agent': 'HomeAssistant',
-                    'Content-Type': 'text/xml'
-                },
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as response:
-                if response.status != 200:
-                    _LOGGER.error(f"Station search failed with status {response.status}")
-                    return []
-
-                response_text = await response.text()
-                return _parse_location_response(response_text)
-    except Exception as e:
-        _LOGGER.error(f"Error searching stations: {e}")
-        return []
+async def validate_nearby_input(hass: HomeAssistant, data: dict[str, Any]) -> None:
+    """Validate the nearby stops input."""
+    if not data[CONF_API_URL].startswith(("http://", "https://")):
+        raise ValueError("Invalid API URL format")
+    if not -90 <= data[CONF_LATITUDE] <= 90:
+        raise ValueError("Invalid latitude")
+    if not -180 <= data[CONF_LONGITUDE] <= 180:
+        raise ValueError("Invalid longitude")
 
 
-def _create_location_request_xml(station_name: str) -> str:
-    """Create XML request to search for a station by name."""
-    now = datetime.now(timezone.utc).isoformat()
-
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
-<Trias xmlns="http://www.vdv.de/trias" version="1.2">
-  <ServiceRequest>
-    <siri:RequestTimestamp xmlns:siri="http://www.siri.org.uk/siri">{now}</siri:RequestTimestamp>
-    <siri:RequestorRef xmlns:siri="http://www.siri.org.uk/siri">homeassistant</siri:RequestorRef>
-    <RequestPayload>
-      <LocationInformationRequest>
-        <InitialInput>
-          <LocationName>{station_name}</LocationName>
-        </InitialInput>
-        <Restrictions>
-          <Type>stop</Type>
-          <NumberOfResults>10</NumberOfResults>
-        </Restrictions>
-      </LocationInformationRequest>
-    </RequestPayload>
-  </ServiceRequest>
-</Trias>"""
-
-
-def _parse_location_response(xml_text: str) -> list[dict]:
-    """Parse the location search response to extract station information."""
-    try:
-        root = ET.fromstring(xml_text)
-        namespaces = {
-            'trias': 'http://www.vdv.de/trias',
-            'siri': 'http://www.siri.org.uk/siri'
-        }
+async def search_stations(hass: HomeAssistant, api_url: str, station_name: str) -> list[dict]:
+    """Search for stations by name, answering from the station cache if possible."""
+    cache = async_get_station_cache(hass)
 
-        stations = []
-        locations = root.findall('.//trias:Location', namespaces)
+    if (stations := await cache.async_get(api_url, station_name)) is not None:
+        return stations
 
-        for location in locations:
-            stop_point = location.find('.//trias:StopPoint', namespaces)
-            if stop_point is not None:
-                stop_point_ref_elem = stop_point.find('.//trias:StopPointRef', namespaces)
-                stop_point_ref = stop_point_ref_elem.text if stop_point_ref_elem is not None else None
+    stations = await _async_fetch_stations(
+        hass, api_url, location_request(station_name, format_trias_time(utcnow()))
+    )
+    if stations:
+        await cache.async_set(api_url, station_name, stations)
+        async_harvest_stations(hass, stations)
+        return stations
 
-                stop_point_name_elem = stop_point.find('.//trias:StopPointName/trias:Text', namespaces)
-                stop_point_name = stop_point_name_elem.text if stop_point_name_elem is not None else None
+    # Fall back to an expired result while the API is failing
+    return await cache.async_get(api_url, station_name, allow_expired=True) or []
+
+
+async def search_nearby_stops(
+    hass: HomeAssistant,
+    api_url: str,
+    latitude: float,
+    longitude: float,
+    radius: int,
+    max_stops: int,
+) -> list[dict]:
+    """Return up to max_stops stops within radius meters of a point.
+
+    The stops are resolved once, when the entry is created, and kept in
+    the station cache like a search by name.
+    """
+    cache = async_get_station_cache(hass)
+    # Cached under a key that no station name search produces
+    search = f"@{latitude:.5f},{longitude:.5f},{radius}"
+
+    stations = await cache.async_get(api_url, search)
+    if stations is None:
+        stations = await _async_fetch_stations(
+            hass,
+            api_url,
+            nearby_stops_request(
+                latitude, longitude, radius, MAX_NEARBY_STOPS, format_trias_time(utcnow())
+            ),
+        )
+        if stations:
+            await cache.async_set(api_url, search, stations)
+            async_harvest_stations(hass, stations)
+        else:
+            stations = await cache.async_get(api_url, search, allow_expired=True) or []
 
-                location_name_elem = location.find('.//trias:LocationName/trias:Text', namespaces)
-                location_name = location_name_elem.text if location_name_elem is not None else None
+    # A stop place can be listed once per matching stop point
+    unique = {station['stop_point_ref']: station for station in stations}
+    return list(unique.values())[:max_stops]
 
-                if stop_point_ref:
-                    stations.append({
-                        'stop_point_ref': stop_point_ref,
-                        'stop_point_name': stop_point_name,
-                        'location_name': location_name,
-                        'display_name': stop_point_name or location_name or stop_point_ref
-                    })
 
-        return stations
+async def _async_fetch_stations(hass: HomeAssistant, api_url: str, xml_request: bytes) -> list[dict]:
+    """Send a location request to the TRIAS API and return the stops found."""
+    try:
+        session = async_get_session(hass, api_url)
+        async with session.post(
+            api_url,
+            data=xml_request,
+            headers={
+                'User-Agent': 'HomeAssistant',
+                'Content-Type': 'text/xml',
+                'Accept-Encoding': ACCEPT_ENCODING,
+            },
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            if response.status != 200:
+                _LOGGER.error(f"Station search failed with status {response.status}")
+                return []
+
+            body = await async_read_body(response)
+
+        backend = async_get_parse_backend(hass)
+        return await backend.async_parse(parse_location_response, body, backend.name)
     except Exception as e:
-        _LOGGER.error(f"Error parsing location response: {e}")
+        _LOGGER.error(f"Error searching stations: {e}")
         return []
 
 
@@ -179,12 +309,21 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 2
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Return the options flow."""
+        return OptionsFlowHandler(config_entry)
+
     def __init__(self):
         """Initialize the config flow."""
         self._mode = None
         self._api_url = None
         self._station_name = None
         self._stations = []
+        self._routes = []
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -195,6 +334,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             if self._mode == MODE_TRIP:
                 return await self.async_step_trip()
+            elif self._mode == MODE_MULTI_TRIP:
+                return await self.async_step_multi_trip()
+            elif self._mode == MODE_NEARBY:
+                return await self.async_step_nearby()
             else:
                 return await self.async_step_station()
 
@@ -235,6 +378,106 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
+    async def async_step_multi_trip(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle multi-trip mode configuration - get the API URL."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            if user_input[CONF_API_URL].startswith(("http://", "https://")):
+                self._api_url = user_input[CONF_API_URL]
+                return await self.async_step_route()
+            errors["base"] = "invalid_url"
+
+        return self.async_show_form(
+            step_id="multi_trip",
+            data_schema=STEP_MULTI_TRIP_SCHEMA,
+            errors=errors,
+        )
+
+    async def async_step_route(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle one route of a multi-trip entry, repeated until done."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                route = await validate_route_input(self.hass, user_input, self._routes)
+            except ValueError as err:
+                _LOGGER.error(f"Validation error: {err}")
+                errors["base"] = "invalid_route"
+            else:
+                self._routes.append(route)
+                if user_input.get(CONF_ADD_ANOTHER):
+                    return await self.async_step_route()
+
+                names = ", ".join(route[CONF_ROUTE_NAME] for route in self._routes)
+                return self.async_create_entry(
+                    title=f"Powerhaus - {names}",
+                    data={
+                        CONF_MODE: MODE_MULTI_TRIP,
+                        CONF_API_URL: self._api_url,
+                        CONF_ROUTES: self._routes,
+                    }
+                )
+
+        return self.async_show_form(
+            step_id="route",
+            data_schema=STEP_ROUTE_SCHEMA,
+            errors=errors,
+            description_placeholders={
+                "count": str(len(self._routes) + 1)
+            }
+        )
+
+    async def async_step_nearby(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle nearby stops mode configuration - resolve the stops once."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                await validate_nearby_input(self.hass, user_input)
+                stops = await search_nearby_stops(
+                    self.hass,
+                    user_input[CONF_API_URL],
+                    user_input[CONF_LATITUDE],
+                    user_input[CONF_LONGITUDE],
+                    user_input[CONF_RADIUS],
+                    user_input[CONF_MAX_STOPS],
+                )
+
+                if not stops:
+                    errors["base"] = "no_stops_nearby"
+                else:
+                    names = ", ".join(stop['display_name'] for stop in stops[:3])
+                    if len(stops) > 3:
+                        names += f" +{len(stops) - 3}"
+                    return self.async_create_entry(
+                        title=f"Nearby: {names}",
+                        data={
+                            **user_input,
+                            CONF_MODE: MODE_NEARBY,
+                            CONF_STOP_POINTS: stops,
+                        }
+                    )
+
+            except ValueError as err:
+                _LOGGER.error(f"Validation error: {err}")
+                errors["base"] = "invalid_coordinates"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+
+        return self.async_show_form(
+            step_id="nearby",
+            data_schema=STEP_NEARBY_SCHEMA,
+            errors=errors,
+        )
+
     async def async_step_station(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -249,9 +492,29 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 self._api_url = user_input[CONF_API_URL]
                 self._station_name = user_input[CONF_STATION_NAME]
 
-                # Search for stations
+                # Name prefixes found in an offline stop index seeded with
+                # all stops answer the search. An index of harvested stations
+                # only may miss the stop asked for, and similar names may
+                # hide it ("Hauptbahnhof" for "Hauptplatz"), so otherwise the
+                # API is asked and the index's matches come after its results
                 _LOGGER.info(f"Searching for stations matching: {self._station_name}")
-                self._stations = await search_stations(self._api_url, self._station_name)
+                stop_index = await async_get_stop_index(self.hass)
+                self._stations = []
+                if stop_index.seeded:
+                    self._stations = stop_index.search_prefix(self._station_name)
+                if not self._stations:
+                    found = await search_stations(
+                        self.hass, self._api_url, self._station_name
+                    )
+                    refs = {station['stop_point_ref'] for station in found}
+                    found = found + [
+                        station
+                        for station in stop_index.search_prefix(self._station_name)
+                        if station['stop_point_ref'] not in refs
+                    ]
+                    self._stations = found + stop_index.search_similar(
+                        self._station_name, exclude=found
+                    )
 
                 if not self._stations:
                     errors["base"] = "no_stations_found"
@@ -318,4 +581,118 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={
                 "count": str(len(self._stations))
             }
-        )
\ No newline at end of file
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle sensor, polling and connection options for Steirische Linien."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors["base"] = "invalid_interval"
+            elif not _valid_pattern(user_input.get(CONF_DESTINATION_PATTERN, "")):
+                errors["base"] = "invalid_pattern"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        options_schema = vol.Schema({
+            vol.Required(
+                CONF_DEPARTURE_COUNT,
+                default=options.get(CONF_DEPARTURE_COUNT, DEFAULT_DEPARTURE_COUNT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_DEPARTURE_COUNT)),
+            vol.Required(
+                CONF_AGGREGATE_SENSOR,
+                default=options.get(CONF_AGGREGATE_SENSOR, DEFAULT_AGGREGATE_SENSOR),
+            ): bool,
+            vol.Required(
+                CONF_UNRECORDED_VOLATILE,
+                default=options.get(CONF_UNRECORDED_VOLATILE, DEFAULT_UNRECORDED_VOLATILE),
+            ): bool,
+            vol.Required(
+                CONF_MIN_WRITE_INTERVAL,
+                default=options.get(CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+            vol.Required(
+                CONF_ADAPTIVE_POLLING,
+                default=options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+            ): bool,
+            vol.Required(
+                CONF_MIN_INTERVAL,
+                default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=30, max=3600)),
+            vol.Required(
+                CONF_MAX_INTERVAL,
+                default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=30, max=3600)),
+            vol.Required(
+                CONF_COLLECT_METRICS,
+                default=options.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS),
+            ): bool,
+            vol.Required(
+                CONF_MAX_STALE_AGE,
+                default=options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=7200)),
+            vol.Required(
+                CONF_REQUESTS_PER_MINUTE,
+                default=options.get(CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+            vol.Required(
+                CONF_CONNECTION_LIMIT,
+                default=options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+            vol.Required(
+                CONF_PARSER_MODE,
+                default=options.get(CONF_PARSER_MODE, DEFAULT_PARSER_MODE),
+            ): vol.In({
+                PARSER_AUTO: "Automatic",
+                PARSER_STREAMING: "Streaming",
+                PARSER_TREE: "Full document",
+            }),
+            vol.Required(
+                CONF_REQUEST_PROFILE,
+                default=options.get(CONF_REQUEST_PROFILE, DEFAULT_REQUEST_PROFILE),
+            ): vol.In({
+                PROFILE_LEAN: "Lean",
+                PROFILE_FULL: "Full",
+            }),
+            vol.Optional(
+                CONF_LINES,
+                default=options.get(CONF_LINES, ""),
+            ): str,
+            vol.Required(
+                CONF_LINE_FILTER_MODE,
+                default=options.get(CONF_LINE_FILTER_MODE, DEFAULT_LINE_FILTER_MODE),
+            ): vol.In({
+                LINE_FILTER_INCLUDE: "Only these lines",
+                LINE_FILTER_EXCLUDE: "All lines except these",
+            }),
+            vol.Optional(
+                CONF_DESTINATION_PATTERN,
+                default=options.get(CONF_DESTINATION_PATTERN, ""),
+            ): str,
+            vol.Optional(
+                CONF_PLATFORMS,
+                default=options.get(CONF_PLATFORMS, ""),
+            ): str,
+            vol.Required(
+                CONF_MIN_MINUTES,
+                default=options.get(CONF_MIN_MINUTES, 0),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_MIN_MINUTES)),
+        })
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=options_schema,
+            errors=errors,
+        )
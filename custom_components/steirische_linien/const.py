@@ -3,6 +3,9 @@
 DOMAIN = "steirische_linien"
 MANUFACTURER = "Powerhaus"
 
+# Time zone of the timetables
+LOCAL_TIMEZONE = "Europe/Vienna"
+
 # Configuration modes
 MODE_TRIP = "trip"
 MODE_STATION = "station"
@@ -15,4 +18,147 @@ CONF_ORIGIN_LON = "origin_longitude"
 CONF_DEST_LAT = "destination_latitude"
 CONF_DEST_LON = "destination_longitude"
 CONF_STATION_NAME = "station_name"
-CONF_STOP_POINT_REF = "stop_point_ref"
\ No newline at end of file
+CONF_STOP_POINT_REF = "stop_point_ref"
+CONF_CONNECTION_LIMIT = "connection_limit"
+
+# HTTP connection pooling
+DEFAULT_CONNECTION_LIMIT = 4
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 90
+
+# Request coalescing
+COORDINATE_KEY_PRECISION = 4
+SHARED_RESULT_MAX_AGE = 30
+
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
+
+# Poll scheduling
+DEFAULT_REQUESTS_PER_MINUTE = 60
+REQUEST_BURST = 3
+REQUEST_TIMEOUT = 30
+
+# Retries and circuit breaking: each attempt gets a short timeout, retries
+# back off with full jitter, all within the REQUEST_TIMEOUT budget
+ATTEMPT_TIMEOUT = 10
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+RETRY_BACKOFF_MAX = 8.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60
+
+# Diagnostic timings and counters of the fetch pipeline
+CONF_COLLECT_METRICS = "collect_metrics"
+DEFAULT_COLLECT_METRICS = False
+
+# Serving the last good departures while the API is failing
+CONF_MAX_STALE_AGE = "max_stale_age"
+DEFAULT_MAX_STALE_AGE = 1800
+
+CONF_PARSER_MODE = "parser_mode"
+
+# Response parsing; auto streams unfiltered stop events, which it can stop
+# reading halfway, and parses everything else as a whole document
+PARSER_AUTO = "auto"
+PARSER_TREE = "tree"
+PARSER_STREAMING = "streaming"
+DEFAULT_PARSER_MODE = PARSER_AUTO
+STREAM_CHUNK_SIZE = 4096
+
+# Responses at least this large are parsed in the executor, by at most
+# PARSE_EXECUTOR_JOBS jobs at a time
+PARSE_EXECUTOR_THRESHOLD = 32 * 1024
+PARSE_EXECUTOR_JOBS = 2
+
+CONF_REQUEST_PROFILE = "request_profile"
+
+# Request profiles: lean only asks for what the sensors show, full also
+# asks for the intermediate stops of every trip
+PROFILE_LEAN = "lean"
+PROFILE_FULL = "full"
+DEFAULT_REQUEST_PROFILE = PROFILE_LEAN
+
+# Content encodings offered to the API, decoded in api.decode_body
+ACCEPT_ENCODING = "gzip, deflate"
+
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+
+# Adaptive polling (intervals in seconds)
+DEFAULT_ADAPTIVE_POLLING = True
+DEFAULT_MIN_INTERVAL = 60
+DEFAULT_MAX_INTERVAL = 900
+IMMINENT_DEPARTURE = 300
+
+# Station search cache
+STATION_CACHE_TTL = 30 * 24 * 3600
+STATION_CACHE_SIZE = 200
+STATION_CACHE_SAVE_DELAY = 10
+
+# Departure snapshots restored at startup (seconds)
+SNAPSHOT_SAVE_DELAY = 60
+# The first polls after a restore are spread over this window
+STARTUP_REFRESH_WINDOW = 10
+
+# Offline stop index
+STOP_INDEX_FILE = "steirische_linien_stops.txt"
+STOP_INDEX_MIN_SIMILARITY = 0.4
+
+CONF_DEPARTURE_COUNT = "departure_count"
+CONF_AGGREGATE_SENSOR = "aggregate_sensor"
+
+# Departure sensors
+DEFAULT_DEPARTURE_COUNT = 7
+DEFAULT_AGGREGATE_SENSOR = False
+MAX_DEPARTURE_COUNT = 20
+
+CONF_UNRECORDED_VOLATILE = "unrecorded_volatile_attributes"
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+
+# Recorder load
+DEFAULT_UNRECORDED_VOLATILE = False
+DEFAULT_MIN_WRITE_INTERVAL = 0
+VOLATILE_ATTRIBUTES = frozenset(
+    {"departure_time", "scheduled_departure_time", "live_departure_time"}
+)
+
+MODE_MULTI_TRIP = "multi_trip"
+
+CONF_ROUTES = "routes"
+CONF_ROUTE_NAME = "route_name"
+CONF_ADD_ANOTHER = "add_another"
+
+# Multi-route trip planning
+MULTI_ROUTE_PARALLELISM = 3
+
+MODE_NEARBY = "nearby"
+
+CONF_LATITUDE = "latitude"
+CONF_LONGITUDE = "longitude"
+CONF_RADIUS = "radius"
+CONF_MAX_STOPS = "max_stops"
+CONF_STOP_POINTS = "stop_points"
+
+# Nearby stops: stop points within a radius (meters), resolved once at setup
+DEFAULT_RADIUS = 250
+MAX_RADIUS = 2000
+DEFAULT_MAX_STOPS = 6
+MAX_NEARBY_STOPS = 20
+NEARBY_STOPS_PARALLELISM = 4
+
+# Per-entry departure filters, applied while parsing
+CONF_LINES = "lines"
+CONF_LINE_FILTER_MODE = "line_filter_mode"
+CONF_DESTINATION_PATTERN = "destination_pattern"
+CONF_PLATFORMS = "platforms"
+CONF_MIN_MINUTES = "min_minutes"
+
+LINE_FILTER_INCLUDE = "include"
+LINE_FILTER_EXCLUDE = "exclude"
+DEFAULT_LINE_FILTER_MODE = LINE_FILTER_INCLUDE
+MAX_MIN_MINUTES = 120
+
+# Entries keeping only some lines, destinations or platforms ask for this
+# many times more results, up to a maximum
+FILTERED_RESULTS_FACTOR = 5
+MAX_NUMBER_OF_RESULTS = 100
@@ -0,0 +1,48 @@
+"""Diagnostics support for Steirische Linien."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .api import async_get_circuit_breaker
+from .const import CONF_API_URL, DOMAIN
+from .sensor import DATA_COORDINATORS
+
+# The API URL may carry an access key
+TO_REDACT = {CONF_API_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics: dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+    }
+
+    coordinator = hass.data.get(DOMAIN, {}).get(DATA_COORDINATORS, {}).get(entry.entry_id)
+    if coordinator is None:
+        return diagnostics
+
+    breaker = async_get_circuit_breaker(hass, entry.data[CONF_API_URL])
+    now = dt_util.utcnow()
+    diagnostics["coordinator"] = {
+        "last_update_success": coordinator.last_update_success,
+        "poll_interval": coordinator.poll_interval.total_seconds(),
+        "departures": sum(
+            len(coordinator.upcoming(now, route)) for route in coordinator.route_names
+        ),
+        "query_users": coordinator.query_users,
+        "circuit_open": breaker.is_open,
+    }
+    diagnostics["metrics"] = (
+        coordinator.metrics.as_dict() if coordinator.metrics is not None else None
+    )
+    return diagnostics
@@ -0,0 +1,95 @@
+"""Timings and counters of the fetch pipeline."""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Any
+
+STAGE_CONNECT = "connect"
+STAGE_FIRST_BYTE = "first_byte"
+STAGE_READ = "read"
+STAGE_DECODE = "decode"
+STAGE_PARSE = "parse"
+STAGE_WRITE = "write"
+STAGES = (
+    STAGE_CONNECT,
+    STAGE_FIRST_BYTE,
+    STAGE_READ,
+    STAGE_DECODE,
+    STAGE_PARSE,
+    STAGE_WRITE,
+)
+
+
+class FetchMetrics:
+    """Per-stage timings and counters of one coordinator.
+
+    A coordinator only holds an instance while metrics are enabled; every
+    instrumentation point checks for None first, so disabled metrics cost
+    one attribute lookup per stage.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.counters: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.last: dict[str, float] = {}
+        self._total: dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self._samples: Counter[str] = Counter()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record how long a stage took."""
+        self.last[stage] = seconds
+        self._total[stage] += seconds
+        self._samples[stage] += 1
+
+    def record_error(self, err: BaseException) -> None:
+        """Count an error by its class."""
+        self.errors[type(err).__name__] += 1
+
+    def trace(self) -> RequestTrace:
+        """Return a trace for the stages of one request."""
+        return RequestTrace(self)
+
+    def mean(self, stage: str) -> float | None:
+        """Return the mean duration of a stage in seconds."""
+        if not (samples := self._samples[stage]):
+            return None
+        return self._total[stage] / samples
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics in milliseconds, for diagnostics and attributes."""
+        return {
+            "last_ms": {
+                stage: round(seconds * 1000, 2) for stage, seconds in self.last.items()
+            },
+            "mean_ms": {
+                stage: round(mean * 1000, 2)
+                for stage in STAGES
+                if (mean := self.mean(stage)) is not None
+            },
+            "counters": dict(self.counters),
+            "errors": dict(self.errors),
+        }
+
+
+class RequestTrace:
+    """Stage clock of one request attempt, fed by the HTTP session's trace hooks."""
+
+    __slots__ = ("metrics", "_mark")
+
+    def __init__(self, metrics: FetchMetrics) -> None:
+        """Initialize."""
+        self.metrics = metrics
+        self._mark = time.perf_counter()
+
+    def start(self) -> None:
+        """Start timing an attempt."""
+        self.metrics.counters["requests"] += 1
+        self._mark = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Record the time since the previous mark as a stage."""
+        now = time.perf_counter()
+        self.metrics.record(stage, now - self._mark)
+        self._mark = now
@@ -0,0 +1,136 @@
+"""Data records for the Powerhaus - Steirische Öffis integration."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from .trias_time import format_local_time, format_trias_time, parse_trias_time
+
+
+def _format_utc(value: datetime | None) -> str:
+    """Format a timestamp the way TRIAS does, or '' if there is none."""
+    if value is None:
+        return ""
+    return format_trias_time(value)
+
+
+def _parse_utc(value: str) -> datetime | None:
+    """Parse a timestamp written by _format_utc."""
+    return parse_trias_time(value) if value else None
+
+
+class Departure:
+    """A single departure, shared read-only by all sensors of a query."""
+
+    __slots__ = (
+        "line",
+        "destination",
+        "departure",
+        "scheduled",
+        "estimated",
+        "_time",
+        "_attributes",
+    )
+
+    def __init__(
+        self,
+        line: str | None,
+        destination: str | None,
+        scheduled: datetime | None,
+        estimated: datetime | None,
+    ) -> None:
+        """Initialize."""
+        self.line = line
+        self.destination = destination
+        self.scheduled = scheduled
+        self.estimated = estimated
+        # Live time if known, timetabled time otherwise
+        self.departure: datetime = estimated or scheduled
+        self._time: str | None = None
+        self._attributes: dict[str, Any] | None = None
+
+    def minutes_until(self, now: datetime) -> int:
+        """Return the whole minutes from now until departure."""
+        return max(int((self.departure - now).total_seconds() / 60), 0)
+
+    @property
+    def is_delayed(self) -> bool:
+        """Return True if the live time is later than the timetabled time."""
+        return (
+            self.estimated is not None
+            and self.scheduled is not None
+            and self.estimated > self.scheduled
+        )
+
+    @property
+    def is_scheduled(self) -> bool:
+        """Return True if only timetabled data is available."""
+        return self.estimated is None
+
+    @property
+    def time(self) -> str:
+        """Return the local departure time as HH:MM."""
+        if self._time is None:
+            self._time = format_local_time(self.departure)
+        return self._time
+
+    @property
+    def key(self) -> tuple:
+        """Return the key identifying duplicate departures."""
+        return (self.line or "", self.destination or "", self.time)
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the sensor attributes, rendered once per record."""
+        if self._attributes is None:
+            self._attributes = {
+                "line": self.line or "Unknown",
+                "destination": self.destination or "Unknown",
+                "departure_time": self.time,
+                "scheduled_departure_time": _format_utc(self.scheduled),
+                "live_departure_time": _format_utc(self.estimated),
+                "is_delayed": self.is_delayed,
+                "is_scheduled": self.is_scheduled,
+            }
+        return self._attributes
+
+    def as_dict(self) -> dict[str, str | None]:
+        """Return the parsed fields as JSON serializable data."""
+        return {
+            "line": self.line,
+            "destination": self.destination,
+            "scheduled": _format_utc(self.scheduled),
+            "estimated": _format_utc(self.estimated),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, str | None]) -> Departure:
+        """Recreate a departure from as_dict data."""
+        return cls(
+            data["line"],
+            data["destination"],
+            _parse_utc(data["scheduled"]),
+            _parse_utc(data["estimated"]),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the parsed fields of two departures."""
+        if not isinstance(other, Departure):
+            return NotImplemented
+        return (
+            self.line == other.line
+            and self.destination == other.destination
+            and self.scheduled == other.scheduled
+            and self.estimated == other.estimated
+        )
+
+    def __hash__(self) -> int:
+        """Hash the parsed fields."""
+        return hash((self.line, self.destination, self.scheduled, self.estimated))
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        return (
+            f"Departure(line={self.line!r}, destination={self.destination!r}, "
+            f"departure={self.departure.isoformat()})"
+        )
@@ -0,0 +1,55 @@
+"""Run response parsing on or off the event loop."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, PARSE_EXECUTOR_JOBS, PARSE_EXECUTOR_THRESHOLD
+from .parser import DEFAULT_BACKEND
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PARSE_BACKEND = "parse_backend"
+
+_T = TypeVar("_T")
+
+
+class ParseBackend:
+    """Decide where and with which XML library responses are parsed.
+
+    Small responses are parsed right on the event loop, where a thread hop
+    would cost more than the parse. Responses of PARSE_EXECUTOR_THRESHOLD
+    bytes or more are parsed in the executor, with at most
+    PARSE_EXECUTOR_JOBS parses in flight so a burst of large responses does
+    not take over the shared executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str = DEFAULT_BACKEND) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.name = name
+        self._jobs = asyncio.Semaphore(PARSE_EXECUTOR_JOBS)
+
+    async def async_parse(
+        self, func: Callable[..., _T], body: bytes, *args: Any
+    ) -> _T:
+        """Return func(body, *args), run in the executor for large bodies."""
+        if len(body) < PARSE_EXECUTOR_THRESHOLD:
+            return func(body, *args)
+
+        async with self._jobs:
+            return await self.hass.async_add_executor_job(func, body, *args)
+
+
+@callback
+def async_get_parse_backend(hass: HomeAssistant) -> ParseBackend:
+    """Return the parse backend, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (backend := domain_data.get(DATA_PARSE_BACKEND)) is None:
+        backend = domain_data[DATA_PARSE_BACKEND] = ParseBackend(hass)
+        _LOGGER.debug(f"Parsing responses with {backend.name}")
+    return backend
@@ -0,0 +1,540 @@
+"""Parsers for TRIAS trip, stop event and location responses."""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+import re
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from xml.etree import ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+from .models import Departure
+from .trias_time import parse_trias_time, utcnow
+
+_LOGGER = logging.getLogger(__name__)
+
+# XML libraries the parsers can run on; lxml is used when it is installed
+BACKEND_STDLIB = "stdlib"
+BACKEND_LXML = "lxml"
+DEFAULT_BACKEND = BACKEND_LXML if lxml_etree is not None else BACKEND_STDLIB
+
+TRIAS_NS = "{http://www.vdv.de/trias}"
+TAG_TRIP_RESULT = f"{TRIAS_NS}TripResult"
+TAG_TRIP = f"{TRIAS_NS}Trip"
+TAG_TRIP_LEG = f"{TRIAS_NS}TripLeg"
+TAG_TIMED_LEG = f"{TRIAS_NS}TimedLeg"
+TAG_LEG_BOARD = f"{TRIAS_NS}LegBoard"
+TAG_STOP_EVENT = f"{TRIAS_NS}StopEvent"
+TAG_STOP_EVENT_RESULT = f"{TRIAS_NS}StopEventResult"
+TAG_THIS_CALL = f"{TRIAS_NS}ThisCall"
+TAG_CALL_AT_STOP = f"{TRIAS_NS}CallAtStop"
+TAG_SERVICE = f"{TRIAS_NS}Service"
+TAG_SERVICE_DEPARTURE = f"{TRIAS_NS}ServiceDeparture"
+TAG_TIMETABLED_TIME = f"{TRIAS_NS}TimetabledTime"
+TAG_ESTIMATED_TIME = f"{TRIAS_NS}EstimatedTime"
+TAG_PUBLISHED_LINE_NAME = f"{TRIAS_NS}PublishedLineName"
+TAG_DESTINATION_TEXT = f"{TRIAS_NS}DestinationText"
+TAG_TEXT = f"{TRIAS_NS}Text"
+TAG_LOCATION_RESULT = f"{TRIAS_NS}LocationResult"
+TAG_LOCATION = f"{TRIAS_NS}Location"
+TAG_LOCATION_NAME = f"{TRIAS_NS}LocationName"
+TAG_STOP_POINT = f"{TRIAS_NS}StopPoint"
+TAG_STOP_POINT_REF = f"{TRIAS_NS}StopPointRef"
+TAG_STOP_POINT_NAME = f"{TRIAS_NS}StopPointName"
+TAG_PLANNED_BAY = f"{TRIAS_NS}PlannedBay"
+TAG_ESTIMATED_BAY = f"{TRIAS_NS}EstimatedBay"
+
+DEFAULT_DEPARTURE_LIMIT = 7
+
+# Elements that change on every response even when the departures do not
+_VOLATILE_ELEMENTS = re.compile(
+    rb"<(?:[\w.-]+:)?(ResponseTimestamp|CalcTime)>[^<]*</(?:[\w.-]+:)?\1>"
+)
+
+
+def _fold(value: str | None) -> str:
+    """Normalize a line or platform name for comparison."""
+    return (value or "").strip().casefold()
+
+
+class DepartureFilter:
+    """Conditions a departure has to meet to be kept.
+
+    Checked inside the parse loop on the raw element text, before any time
+    is parsed or record built, so a filtered-out result costs little more
+    than reading it. Line and platform names match case-insensitively, the
+    destination pattern is searched case-insensitively.
+    """
+
+    __slots__ = ("lines", "exclude_lines", "destination", "platforms", "min_minutes")
+
+    def __init__(
+        self,
+        lines: Iterable[str] = (),
+        exclude_lines: bool = False,
+        destination: str | None = None,
+        platforms: Iterable[str] = (),
+        min_minutes: int = 0,
+    ) -> None:
+        """Initialize."""
+        self.lines = frozenset(_fold(line) for line in lines)
+        self.exclude_lines = exclude_lines
+        self.destination = re.compile(destination, re.IGNORECASE) if destination else None
+        self.platforms = frozenset(_fold(platform) for platform in platforms)
+        self.min_minutes = min_minutes
+
+    @property
+    def is_selective(self) -> bool:
+        """Return True if only some lines, destinations or platforms are kept.
+
+        Excluded lines and a minimum of minutes drop a few results at most.
+        """
+        return bool(
+            (self.lines and not self.exclude_lines)
+            or self.destination is not None
+            or self.platforms
+        )
+
+    def accepts(self, line: str | None, destination: str | None, platform: str | None) -> bool:
+        """Return True if a departure with these names passes the filter."""
+        if self.lines and (_fold(line) in self.lines) == self.exclude_lines:
+            return False
+        if self.destination is not None and not self.destination.search(destination or ""):
+            return False
+        if self.platforms and _fold(platform) not in self.platforms:
+            return False
+        return True
+
+
+def _cutoff(departure_filter: DepartureFilter | None) -> datetime:
+    """Return the time before which departures are dropped."""
+    now = utcnow()
+    if departure_filter is not None and departure_filter.min_minutes:
+        return now + timedelta(minutes=departure_filter.min_minutes)
+    return now
+
+
+def payload_digest(body: bytes) -> bytes:
+    """Return a digest of a response body, ignoring its timestamps."""
+    return hashlib.blake2b(_VOLATILE_ELEMENTS.sub(b"", body), digest_size=16).digest()
+
+
+def _fromstring(xml_text: str | bytes, backend: str) -> ET.Element:
+    """Parse a whole document with the given backend."""
+    if backend == BACKEND_LXML and lxml_etree is not None:
+        if isinstance(xml_text, str):
+            # lxml refuses str input that carries an encoding declaration
+            xml_text = xml_text.encode("utf-8")
+        # Parsers are not shared between threads, so build one per call
+        parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True)
+        return lxml_etree.fromstring(xml_text, parser)
+    return ET.fromstring(xml_text)
+
+
+def _pull_parser(backend: str) -> ET.XMLPullParser:
+    """Return an incremental parser for the given backend."""
+    if backend == BACKEND_LXML and lxml_etree is not None:
+        return lxml_etree.XMLPullParser(
+            events=("end",), resolve_entities=False, no_network=True
+        )
+    return ET.XMLPullParser(events=("end",))
+
+
+def _child(elem: ET.Element, tag: str) -> ET.Element | None:
+    """Return the first direct child of an element with the given tag."""
+    for child in elem:
+        if child.tag == tag:
+            return child
+    return None
+
+
+def _text(elem: ET.Element) -> str | None:
+    """Return the content of an element's Text child, e.g. PublishedLineName/Text."""
+    text = _child(elem, TAG_TEXT)
+    return text.text if text is not None else None
+
+
+def _service_times(service_departure: ET.Element) -> tuple[str | None, str | None]:
+    """Return the timetabled and estimated time of a ServiceDeparture."""
+    timetabled = estimated = None
+    for child in service_departure:
+        tag = child.tag
+        if tag == TAG_TIMETABLED_TIME:
+            timetabled = child.text
+        elif tag == TAG_ESTIMATED_TIME:
+            estimated = child.text
+    return timetabled, estimated
+
+
+def _call_departure(call: ET.Element) -> tuple[str | None, str | None, str | None]:
+    """Return the timetabled and estimated time and the bay of a stop call."""
+    timetabled = estimated = bay = None
+    for child in call:
+        tag = child.tag
+        if tag == TAG_SERVICE_DEPARTURE:
+            timetabled, estimated = _service_times(child)
+        elif tag == TAG_ESTIMATED_BAY or (tag == TAG_PLANNED_BAY and bay is None):
+            bay = _text(child)
+    return timetabled, estimated, bay
+
+
+def _service_names(service: ET.Element) -> tuple[str | None, str | None]:
+    """Return the published line name and destination of a Service."""
+    line = destination = None
+    for child in service:
+        tag = child.tag
+        if tag == TAG_PUBLISHED_LINE_NAME:
+            line = _text(child)
+        elif tag == TAG_DESTINATION_TEXT:
+            destination = _text(child)
+    return line, destination
+
+
+def _first_timed_leg(trip_result: ET.Element) -> ET.Element | None:
+    """Return the first TimedLeg of a TripResult (TripResult/Trip/TripLeg/TimedLeg)."""
+    trip = _child(trip_result, TAG_TRIP)
+    if trip is None:
+        return None
+    for trip_leg in trip:
+        if trip_leg.tag == TAG_TRIP_LEG:
+            timed_leg = _child(trip_leg, TAG_TIMED_LEG)
+            if timed_leg is not None:
+                return timed_leg
+    return None
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    """Parse a TRIAS timestamp into an aware datetime."""
+    if not value:
+        return None
+    try:
+        return parse_trias_time(value)
+    except ValueError as e:
+        _LOGGER.debug(f"Error parsing departure time: {e}")
+        return None
+
+
+def _build_departure(
+    line: str | None,
+    destination: str | None,
+    timetabled_time_str: str | None,
+    estimated_time_str: str | None,
+    cutoff: datetime,
+) -> Departure | None:
+    """Build a departure record, or None if it is unknown or before cutoff."""
+    scheduled = _parse_time(timetabled_time_str)
+    estimated = _parse_time(estimated_time_str)
+
+    # Use the live time if available, the timetabled time otherwise
+    departure = estimated or scheduled
+    if departure is None or departure < cutoff:
+        return None
+
+    return Departure(line, destination, scheduled, estimated)
+
+
+def _extract_trip_departure(
+    trip_result: ET.Element,
+    cutoff: datetime,
+    departure_filter: DepartureFilter | None = None,
+) -> Departure | None:
+    """Extract the first departure of a TripResult, if it is kept."""
+    first_timed_leg = _first_timed_leg(trip_result)
+
+    if first_timed_leg is None:
+        return None
+
+    # Walk the leg once, picking up line, destination, board times and bay
+    line = destination = scheduled_time_str = live_time_str = bay = None
+    for child in first_timed_leg:
+        tag = child.tag
+        if tag == TAG_LEG_BOARD:
+            scheduled_time_str, live_time_str, bay = _call_departure(child)
+        elif tag == TAG_SERVICE:
+            line, destination = _service_names(child)
+
+    if departure_filter is not None and not departure_filter.accepts(line, destination, bay):
+        return None
+    return _build_departure(line, destination, scheduled_time_str, live_time_str, cutoff)
+
+
+def _extract_stop_event(
+    event: ET.Element,
+    cutoff: datetime,
+    departure_filter: DepartureFilter | None = None,
+) -> Departure | None:
+    """Extract the departure of a StopEvent, if it is kept."""
+    # Walk the event once: ThisCall/CallAtStop and Service
+    line = destination = timetabled_time_str = estimated_time_str = bay = None
+    for child in event:
+        tag = child.tag
+        if tag == TAG_THIS_CALL:
+            call_at_stop = _child(child, TAG_CALL_AT_STOP)
+            if call_at_stop is not None:
+                timetabled_time_str, estimated_time_str, bay = _call_departure(call_at_stop)
+        elif tag == TAG_SERVICE:
+            line, destination = _service_names(child)
+
+    if departure_filter is not None and not departure_filter.accepts(line, destination, bay):
+        return None
+    return _build_departure(line, destination, timetabled_time_str, estimated_time_str, cutoff)
+
+
+def _extract_location(location: ET.Element) -> dict | None:
+    """Extract the stop point of a Location, if it has one."""
+    stop_point_ref = stop_point_name = location_name = None
+    for child in location:
+        tag = child.tag
+        if tag == TAG_STOP_POINT:
+            for item in child:
+                if item.tag == TAG_STOP_POINT_REF:
+                    stop_point_ref = item.text
+                elif item.tag == TAG_STOP_POINT_NAME:
+                    stop_point_name = _text(item)
+        elif tag == TAG_LOCATION_NAME:
+            location_name = _text(child)
+
+    if not stop_point_ref:
+        return None
+
+    return {
+        'stop_point_ref': stop_point_ref,
+        'stop_point_name': stop_point_name,
+        'location_name': location_name,
+        'display_name': stop_point_name or location_name or stop_point_ref
+    }
+
+
+def _take_unique(departures: Iterable[Departure], limit: int) -> list[Departure]:
+    """Keep the first `limit` departures not seen before, in the given order."""
+    # Duplicates share line, destination and departure time
+    seen = set()
+    unique_departures = []
+    for dep in departures:
+        key = dep.key
+        if key not in seen:
+            seen.add(key)
+            unique_departures.append(dep)
+            if len(unique_departures) >= limit:
+                break
+
+    return unique_departures
+
+
+def _select_departures(departures: list[Departure], limit: int) -> list[Departure]:
+    """Sort departures and keep the first `limit` unique ones."""
+    # One response holds a few dozen results in near departure order, which
+    # Timsort handles faster than a heap would
+    departures.sort(key=_departure_time)
+    return _take_unique(departures, limit)
+
+
+def merge_departures(results: Iterable[list[Departure]], limit: int) -> list[Departure]:
+    """Merge departure lists sorted by time, keeping the first `limit` unique ones.
+
+    The lists are merged lazily through a heap, so only the departures up to
+    the last kept one are visited, however many lists there are.
+    """
+    return _take_unique(heapq.merge(*results, key=_departure_time), limit)
+
+
+def _departure_time(departure: Departure) -> datetime:
+    """Return the time a departure leaves, for ordering."""
+    return departure.departure
+
+
+def parse_departures(
+    xml_text: str | bytes,
+    limit: int = DEFAULT_DEPARTURE_LIMIT,
+    counters: Counter[str] | None = None,
+    backend: str = DEFAULT_BACKEND,
+    departure_filter: DepartureFilter | None = None,
+) -> list[Departure]:
+    """Parse departures from TRIAS response.
+
+    If counters is given, the number of trip results read is added to it.
+    Only departures passing departure_filter are kept.
+    """
+    departures = []
+    events = 0
+
+    try:
+        root = _fromstring(xml_text, backend)
+        trip_results = root.iter(TAG_TRIP_RESULT)
+
+        cutoff = _cutoff(departure_filter)
+
+        for trip_result in trip_results:
+            events += 1
+            departure = _extract_trip_departure(trip_result, cutoff, departure_filter)
+            if departure is not None:
+                departures.append(departure)
+
+        if counters is not None:
+            counters["events_parsed"] += events
+        return _select_departures(departures, limit)
+
+    except Exception as e:
+        _LOGGER.error(f"Error parsing response: {e}")
+        return []
+
+
+def parse_stop_events(
+    xml_text: str | bytes,
+    limit: int = DEFAULT_DEPARTURE_LIMIT,
+    counters: Counter[str] | None = None,
+    backend: str = DEFAULT_BACKEND,
+    departure_filter: DepartureFilter | None = None,
+) -> list[Departure]:
+    """Parse station departure events from TRIAS StopEventRequest response.
+
+    If counters is given, the number of stop events read is added to it.
+    Only departures passing departure_filter are kept.
+    """
+    departures = []
+    events = 0
+
+    try:
+        root = _fromstring(xml_text, backend)
+        stop_events = root.iter(TAG_STOP_EVENT)
+
+        cutoff = _cutoff(departure_filter)
+
+        for event in stop_events:
+            events += 1
+            try:
+                departure = _extract_stop_event(event, cutoff, departure_filter)
+                if departure is not None:
+                    departures.append(departure)
+            except Exception as e:
+                _LOGGER.debug(f"Error parsing stop event: {e}")
+                continue
+
+        if counters is not None:
+            counters["events_parsed"] += events
+        return _select_departures(departures, limit)
+
+    except Exception as e:
+        _LOGGER.error(f"Error parsing stop events: {e}")
+        return []
+
+
+def parse_location_response(
+    xml_text: str | bytes, backend: str = DEFAULT_BACKEND
+) -> list[dict]:
+    """Parse the location search response to extract station information."""
+    try:
+        root = _fromstring(xml_text, backend)
+
+        stations = []
+        for location_result in root.iter(TAG_LOCATION_RESULT):
+            location = _child(location_result, TAG_LOCATION)
+            if location is not None:
+                station = _extract_location(location)
+                if station is not None:
+                    stations.append(station)
+
+        return stations
+    except Exception as e:
+        _LOGGER.error(f"Error parsing location response: {e}")
+        return []
+
+
+class StreamingParser:
+    """Incremental parser fed with chunks of a TRIAS response.
+
+    Each TripResult or StopEvent is turned into a departure as soon as its
+    closing tag arrives and is then cleared, so no tree of the whole
+    document is built; the response body itself is read in full before
+    parsing. TRIAS returns results in departure order, which lets the
+    parser stop once `limit` unique future departures passing
+    departure_filter are known.
+    """
+
+    def __init__(
+        self,
+        stop_events: bool,
+        limit: int = DEFAULT_DEPARTURE_LIMIT,
+        # lxml's pull parser is slower than expat when fed small slices
+        backend: str = BACKEND_STDLIB,
+        departure_filter: DepartureFilter | None = None,
+    ) -> None:
+        """Initialize."""
+        self._limit = limit
+        self._filter = departure_filter
+        self._parser = _pull_parser(backend)
+        self._seen: set[tuple] = set()
+        self._departures: list[Departure] = []
+        self._failed = False
+        self.done = False
+        # Number of result elements read so far
+        self.events = 0
+
+        if stop_events:
+            self._event_tag = TAG_STOP_EVENT
+            self._container_tag = TAG_STOP_EVENT_RESULT
+            self._extract = _extract_stop_event
+        else:
+            self._event_tag = TAG_TRIP_RESULT
+            self._container_tag = TAG_TRIP_RESULT
+            self._extract = _extract_trip_departure
+        self._cutoff = _cutoff(departure_filter)
+
+    def feed(self, data: bytes) -> bool:
+        """Feed a chunk of the response, return True once no more is needed."""
+        if self.done:
+            return True
+
+        try:
+            self._parser.feed(data)
+            self._process_events()
+        except Exception as e:
+            _LOGGER.error(f"Error parsing response: {e}")
+            self._failed = True
+            self.done = True
+
+        return self.done
+
+    def close(self) -> list[Departure]:
+        """Finish parsing and return the selected departures."""
+        if not self.done:
+            try:
+                self._parser.close()
+                self._process_events()
+            except Exception as e:
+                _LOGGER.error(f"Error parsing response: {e}")
+                self._failed = True
+            self.done = True
+
+        if self._failed:
+            return []
+        return _select_departures(self._departures, self._limit)
+
+    def _process_events(self) -> None:
+        """Turn completed result elements into departures."""
+        for _event, elem in self._parser.read_events():
+            if elem.tag == self._event_tag:
+                self.events += 1
+                try:
+                    departure = self._extract(elem, self._cutoff, self._filter)
+                except Exception as e:
+                    _LOGGER.debug(f"Error parsing stop event: {e}")
+                    departure = None
+
+                if departure is not None and departure.key not in self._seen:
+                    self._seen.add(departure.key)
+                    self._departures.append(departure)
+
+            if elem.tag in (self._event_tag, self._container_tag):
+                elem.clear()
+
+            if len(self._departures) >= self._limit:
+                self.done = True
+                return
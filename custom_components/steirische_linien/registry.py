@@ -0,0 +1,177 @@
+"""Registry of upstream queries shared between config entries."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DOMAIN,
+    MODE_TRIP,
+    MODE_STATION,
+    MODE_MULTI_TRIP,
+    MODE_NEARBY,
+    CONF_MODE,
+    CONF_API_URL,
+    CONF_ORIGIN_LAT,
+    CONF_ORIGIN_LON,
+    CONF_DEST_LAT,
+    CONF_DEST_LON,
+    CONF_STOP_POINT_REF,
+    CONF_STOP_POINTS,
+    CONF_ROUTES,
+    CONF_ROUTE_NAME,
+    CONF_DEPARTURE_COUNT,
+    CONF_DESTINATION_PATTERN,
+    CONF_LINE_FILTER_MODE,
+    CONF_LINES,
+    CONF_MIN_MINUTES,
+    CONF_PARSER_MODE,
+    CONF_PLATFORMS,
+    CONF_REQUEST_PROFILE,
+    DEFAULT_DEPARTURE_COUNT,
+    DEFAULT_PARSER_MODE,
+    DEFAULT_REQUEST_PROFILE,
+    COORDINATE_KEY_PRECISION,
+    SHARED_RESULT_MAX_AGE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_QUERIES = "queries"
+
+
+def query_key(config_data: dict) -> tuple:
+    """Build the key identifying the upstream query of a config entry."""
+    # Entries only share results when they keep the same departures
+    return (*_request_key(config_data), _filter_key(config_data))
+
+
+def _request_key(config_data: dict) -> tuple:
+    """Build the key identifying the requests of a config entry."""
+    mode = config_data.get(CONF_MODE, MODE_TRIP)
+    api_url = config_data.get(CONF_API_URL)
+    # The departure count decides how many results are requested and kept,
+    # the request profile what is requested and the parser mode how it is read
+    request = (
+        api_url,
+        mode,
+        config_data.get(CONF_DEPARTURE_COUNT, DEFAULT_DEPARTURE_COUNT),
+        config_data.get(CONF_REQUEST_PROFILE, DEFAULT_REQUEST_PROFILE),
+        config_data.get(CONF_PARSER_MODE, DEFAULT_PARSER_MODE),
+    )
+
+    if mode == MODE_STATION:
+        return (*request, config_data.get(CONF_STOP_POINT_REF))
+
+    if mode == MODE_NEARBY:
+        return (
+            *request,
+            tuple(sorted(stop["stop_point_ref"] for stop in config_data[CONF_STOP_POINTS])),
+        )
+
+    if mode == MODE_MULTI_TRIP:
+        return (
+            *request,
+            tuple(
+                (route[CONF_ROUTE_NAME], *_route_key(route))
+                for route in config_data[CONF_ROUTES]
+            ),
+        )
+
+    return (*request, *_route_key(config_data))
+
+
+def _filter_key(config_data: dict) -> tuple:
+    """Return the departure filter options of a config entry."""
+    # Empty and unset options both mean no filter
+    return tuple(
+        config_data.get(option) or None
+        for option in (
+            CONF_LINES,
+            CONF_LINE_FILTER_MODE,
+            CONF_DESTINATION_PATTERN,
+            CONF_PLATFORMS,
+            CONF_MIN_MINUTES,
+        )
+    )
+
+
+def _route_key(route: dict) -> tuple:
+    """Return an origin/destination pair rounded for use in a key."""
+    return (
+        round(route.get(CONF_ORIGIN_LAT), COORDINATE_KEY_PRECISION),
+        round(route.get(CONF_ORIGIN_LON), COORDINATE_KEY_PRECISION),
+        round(route.get(CONF_DEST_LAT), COORDINATE_KEY_PRECISION),
+        round(route.get(CONF_DEST_LON), COORDINATE_KEY_PRECISION),
+    )
+
+
+class SharedQuery:
+    """One upstream query and its latest parsed result."""
+
+    def __init__(self, key: Hashable) -> None:
+        """Initialize."""
+        self.key = key
+        self.users = 0
+        self.data: Any = None
+        # Digest and parsed result of each payload, to skip unchanged ones
+        self.payloads: dict[Hashable, tuple[bytes, Any]] = {}
+        self._updated: float | None = None
+        self._task: asyncio.Task | None = None
+
+    async def async_fetch(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a fresh result, joining a fetch already in flight.
+
+        A result fetched by another entry within the last
+        SHARED_RESULT_MAX_AGE seconds is returned without a new request.
+        """
+        if self._task is None:
+            if (
+                self._updated is not None
+                and time.monotonic() - self._updated < SHARED_RESULT_MAX_AGE
+            ):
+                return self.data
+            self._task = asyncio.create_task(self._async_run(fetch))
+
+        # Shield so a caller timing out does not cancel the fetch for the others
+        return await asyncio.shield(self._task)
+
+    async def _async_run(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the fetch and remember its result."""
+        try:
+            data = await fetch()
+            self.data = data
+            self._updated = time.monotonic()
+            return data
+        finally:
+            self._task = None
+
+
+@callback
+def async_get_shared_query(hass: HomeAssistant, config_data: dict) -> SharedQuery:
+    """Return the shared query for a config entry and register it as a user."""
+    queries: dict[Hashable, SharedQuery] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_QUERIES, {}
+    )
+    key = query_key(config_data)
+
+    query = queries.get(key)
+    if query is None:
+        query = queries[key] = SharedQuery(key)
+    query.users += 1
+
+    _LOGGER.debug(f"Query {key} now shared by {query.users} entries")
+    return query
+
+
+@callback
+def async_release_shared_query(hass: HomeAssistant, query: SharedQuery) -> None:
+    """Unregister a user of a shared query and drop it once unused."""
+    query.users -= 1
+    if query.users <= 0:
+        hass.data.get(DOMAIN, {}).get(DATA_QUERIES, {}).pop(query.key, None)
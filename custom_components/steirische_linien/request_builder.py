@@ -0,0 +1,236 @@
+"""Pre-rendered TRIAS request documents."""
+from __future__ import annotations
+
+from string import Formatter
+from xml.sax.saxutils import escape
+
+from .const import PROFILE_FULL, PROFILE_LEAN
+
+TRIP_REQUEST = """<Trias xmlns="http://www.vdv.de/trias" xmlns:siri="http://www.siri.org.uk/siri" version="1.2">
+<ServiceRequest>
+<siri:RequestTimestamp>{request_timestamp}</siri:RequestTimestamp>
+<siri:RequestorRef>homeassistant</siri:RequestorRef>
+<RequestPayload>
+<TripRequest>
+<Origin>
+<LocationRef>
+<GeoPosition>
+<Longitude>{origin_lon}</Longitude>
+<Latitude>{origin_lat}</Latitude>
+</GeoPosition>
+<LocationName>
+<Text>Origin</Text>
+<Language>de</Language>
+</LocationName>
+</LocationRef>
+<DepArrTime>{dep_arr_time}</DepArrTime>
+</Origin>
+<Destination>
+<LocationRef>
+<GeoPosition>
+<Longitude>{dest_lon}</Longitude>
+<Latitude>{dest_lat}</Latitude>
+</GeoPosition>
+<LocationName>
+<Text>Destination</Text>
+<Language>de</Language>
+</LocationName>
+</LocationRef>
+</Destination>
+<Params>
+<NumberOfResults>{number_of_results}</NumberOfResults>
+<IncludeTrackSections>false</IncludeTrackSections>
+<IncludeLegProjection>false</IncludeLegProjection>
+<IncludeIntermediateStops>{include_intermediate_stops}</IncludeIntermediateStops>
+<IncludeAllRestrictedLines>false</IncludeAllRestrictedLines>
+<WalkSpeed>normal</WalkSpeed>
+<OptimisationMethod>fastest</OptimisationMethod>
+</Params>
+</TripRequest>
+</RequestPayload>
+</ServiceRequest>
+</Trias>"""
+
+STOP_EVENT_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<Trias xmlns="http://www.vdv.de/trias" version="1.2">
+  <ServiceRequest>
+    <siri:RequestTimestamp xmlns:siri="http://www.siri.org.uk/siri">{request_timestamp}</siri:RequestTimestamp>
+    <siri:RequestorRef xmlns:siri="http://www.siri.org.uk/siri">homeassistant</siri:RequestorRef>
+    <RequestPayload>
+      <StopEventRequest>
+        <Location>
+          <LocationRef>
+            <StopPointRef>{stop_point_ref}</StopPointRef>
+          </LocationRef>
+          <DepArrTime>{dep_arr_time}</DepArrTime>
+        </Location>
+        <Params>
+          <NumberOfResults>{number_of_results}</NumberOfResults>
+          <StopEventType>departure</StopEventType>
+          <IncludePreviousCalls>false</IncludePreviousCalls>
+          <IncludeOnwardCalls>false</IncludeOnwardCalls>
+          <IncludeRealtimeData>true</IncludeRealtimeData>
+        </Params>
+      </StopEventRequest>
+    </RequestPayload>
+  </ServiceRequest>
+</Trias>"""
+
+LOCATION_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<Trias xmlns="http://www.vdv.de/trias" version="1.2">
+  <ServiceRequest>
+    <siri:RequestTimestamp xmlns:siri="http://www.siri.org.uk/siri">{request_timestamp}</siri:RequestTimestamp>
+    <siri:RequestorRef xmlns:siri="http://www.siri.org.uk/siri">homeassistant</siri:RequestorRef>
+    <RequestPayload>
+      <LocationInformationRequest>
+        <InitialInput>
+          <LocationName>{station_name}</LocationName>
+        </InitialInput>
+        <Restrictions>
+          <Type>stop</Type>
+          <NumberOfResults>{number_of_results}</NumberOfResults>
+        </Restrictions>
+      </LocationInformationRequest>
+    </RequestPayload>
+  </ServiceRequest>
+</Trias>"""
+
+NEARBY_STOPS_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<Trias xmlns="http://www.vdv.de/trias" version="1.2">
+  <ServiceRequest>
+    <siri:RequestTimestamp xmlns:siri="http://www.siri.org.uk/siri">{request_timestamp}</siri:RequestTimestamp>
+    <siri:RequestorRef xmlns:siri="http://www.siri.org.uk/siri">homeassistant</siri:RequestorRef>
+    <RequestPayload>
+      <LocationInformationRequest>
+        <InitialInput>
+          <GeoRestriction>
+            <Circle>
+              <Center>
+                <Longitude>{longitude}</Longitude>
+                <Latitude>{latitude}</Latitude>
+              </Center>
+              <Radius>{radius}</Radius>
+            </Circle>
+          </GeoRestriction>
+        </InitialInput>
+        <Restrictions>
+          <Type>stop</Type>
+          <NumberOfResults>{number_of_results}</NumberOfResults>
+        </Restrictions>
+      </LocationInformationRequest>
+    </RequestPayload>
+  </ServiceRequest>
+</Trias>"""
+
+
+class RequestTemplate:
+    """A request document rendered to bytes once, apart from its variable fields.
+
+    The fixed parameters of a config entry (coordinates, stop point, result
+    count) are escaped and rendered when the template is built. Rendering a
+    request then only escapes the remaining fields, usually the timestamps,
+    and joins them with the static byte chunks.
+    """
+
+    __slots__ = ("_chunks", "_fields")
+
+    def __init__(self, document: str, **params: object) -> None:
+        """Initialize."""
+        chunks: list[bytes] = []
+        fields: list[str] = []
+        static = ""
+        for literal, field, _spec, _conversion in Formatter().parse(document):
+            static += literal
+            if field is None:
+                continue
+            if field in params:
+                static += escape(str(params[field]))
+                continue
+            chunks.append(static.encode("utf-8"))
+            fields.append(field)
+            static = ""
+        chunks.append(static.encode("utf-8"))
+
+        self._chunks = tuple(chunks)
+        self._fields = tuple(fields)
+
+    def render(self, **values: object) -> bytes:
+        """Return the request document with the variable fields filled in."""
+        chunks = self._chunks
+        parts = [chunks[0]]
+        for field, chunk in zip(self._fields, chunks[1:]):
+            parts.append(escape(str(values[field])).encode("utf-8"))
+            parts.append(chunk)
+        return b"".join(parts)
+
+
+# Trip request parameters per request profile. The parser only reads the
+# boarding call of the first timed leg, so the lean profile leaves out the
+# intermediate stops, which make up most of a trip response.
+_TRIP_PROFILES: dict[str, dict[str, str]] = {
+    PROFILE_LEAN: {"include_intermediate_stops": "false"},
+    PROFILE_FULL: {"include_intermediate_stops": "true"},
+}
+
+
+def trip_request(
+    origin_lat: float,
+    origin_lon: float,
+    dest_lat: float,
+    dest_lon: float,
+    number_of_results: int,
+    profile: str = PROFILE_LEAN,
+) -> RequestTemplate:
+    """Build the trip request template for an origin/destination pair.
+
+    Render it with request_timestamp and dep_arr_time.
+    """
+    return RequestTemplate(
+        TRIP_REQUEST,
+        origin_lat=origin_lat,
+        origin_lon=origin_lon,
+        dest_lat=dest_lat,
+        dest_lon=dest_lon,
+        number_of_results=number_of_results,
+        **_TRIP_PROFILES[profile],
+    )
+
+
+def stop_event_request(stop_point_ref: str, number_of_results: int) -> RequestTemplate:
+    """Build the stop event request template for a stop point.
+
+    Render it with request_timestamp and dep_arr_time.
+    """
+    return RequestTemplate(
+        STOP_EVENT_REQUEST,
+        stop_point_ref=stop_point_ref,
+        number_of_results=number_of_results,
+    )
+
+
+# Station searches differ in the name, so it stays a field of the template
+_LOCATION_TEMPLATE = RequestTemplate(LOCATION_REQUEST, number_of_results=10)
+
+
+def location_request(station_name: str, request_timestamp: str) -> bytes:
+    """Render the location request searching stops by name."""
+    return _LOCATION_TEMPLATE.render(
+        request_timestamp=request_timestamp, station_name=station_name
+    )
+
+
+def nearby_stops_request(
+    latitude: float,
+    longitude: float,
+    radius: int,
+    number_of_results: int,
+    request_timestamp: str,
+) -> bytes:
+    """Render the location request for the stops within radius meters of a point."""
+    return RequestTemplate(
+        NEARBY_STOPS_REQUEST,
+        latitude=latitude,
+        longitude=longitude,
+        radius=radius,
+        number_of_results=number_of_results,
+    ).render(request_timestamp=request_timestamp)
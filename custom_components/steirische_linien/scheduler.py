@@ -0,0 +1,140 @@
+"""Central poll scheduler with a per-endpoint request budget."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import partial
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DEFAULT_REQUESTS_PER_MINUTE, REQUEST_BURST
+
+if TYPE_CHECKING:
+    from .sensor import SteirischeLinienDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULER = "scheduler"
+
+# Fractional part of the golden ratio; successive multiples of it spread
+# evenly over [0, 1) no matter how many coordinators end up registered.
+_PHASE_STEP = 0.6180339887498949
+
+
+class PollScheduler:
+    """Drive all coordinator refreshes from one place.
+
+    Each coordinator gets a phase offset within its poll interval so polls
+    are spread out instead of all firing together, and every upstream request
+    has to take a slot from the request budget of its API URL first.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._registered = 0
+        self._timers: dict[SteirischeLinienDataUpdateCoordinator, CALLBACK_TYPE] = {}
+        self._budgets: dict[str, dict[str, int]] = {}
+        self._next_slot: dict[str, float] = {}
+
+    @callback
+    def async_set_budget(
+        self, entry_id: str, api_url: str, requests_per_minute: int
+    ) -> CALLBACK_TYPE:
+        """Set the budget a config entry wants for an API URL.
+
+        The strictest budget of all entries using the URL applies. Returns a
+        callback that withdraws the entry's budget again.
+        """
+        self._budgets.setdefault(api_url, {})[entry_id] = requests_per_minute
+
+        @callback
+        def _remove() -> None:
+            budgets = self._budgets.get(api_url, {})
+            budgets.pop(entry_id, None)
+            if not budgets:
+                self._budgets.pop(api_url, None)
+                self._next_slot.pop(api_url, None)
+
+        return _remove
+
+    def requests_per_minute(self, api_url: str) -> int:
+        """Return the request budget that applies to an API URL."""
+        if budgets := self._budgets.get(api_url):
+            return min(budgets.values())
+        return DEFAULT_REQUESTS_PER_MINUTE
+
+    async def async_acquire(self, api_url: str) -> None:
+        """Wait until the budget of an API URL allows another request.
+
+        Requests are spaced 60 / budget seconds apart, with up to
+        REQUEST_BURST of them allowed back to back.
+        """
+        loop = asyncio.get_running_loop()
+        spacing = 60 / self.requests_per_minute(api_url)
+        now = loop.time()
+
+        slot = max(self._next_slot.get(api_url, now), now)
+        self._next_slot[api_url] = slot + spacing
+
+        wait = slot - (REQUEST_BURST - 1) * spacing - now
+        if wait > 0:
+            _LOGGER.debug(f"Request budget for {api_url} exhausted, waiting {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    @callback
+    def async_register(
+        self,
+        coordinator: SteirischeLinienDataUpdateCoordinator,
+        first_poll_window: float | None = None,
+    ) -> CALLBACK_TYPE:
+        """Start polling a coordinator and return a callback to stop again.
+
+        The first poll falls at the coordinator's phase within
+        first_poll_window seconds, by default within its poll interval.
+        """
+        self._registered += 1
+        phase = (self._registered * _PHASE_STEP) % 1.0
+
+        if first_poll_window is None:
+            first_poll_window = coordinator.poll_interval.total_seconds()
+        self._schedule(coordinator, phase * first_poll_window)
+
+        @callback
+        def _unregister() -> None:
+            if unsub := self._timers.pop(coordinator, None):
+                unsub()
+
+        return _unregister
+
+    @callback
+    def _schedule(
+        self, coordinator: SteirischeLinienDataUpdateCoordinator, delay: float
+    ) -> None:
+        """Schedule the next poll of a coordinator."""
+        self._timers[coordinator] = async_call_later(
+            self.hass, delay, partial(self._async_start_poll, coordinator)
+        )
+
+    @callback
+    def _async_start_poll(
+        self, coordinator: SteirischeLinienDataUpdateCoordinator, _now=None
+    ) -> None:
+        """Run a poll as a background task.
+
+        Home Assistant does not wait for background tasks to finish starting
+        up and cancels them when stopping, so a slow API holds up neither.
+        """
+        self.hass.async_create_background_task(
+            self._async_poll(coordinator), f"{coordinator.name} poll"
+        )
+
+    async def _async_poll(self, coordinator: SteirischeLinienDataUpdateCoordinator) -> None:
+        """Refresh a coordinator and schedule its next poll."""
+        await coordinator.async_refresh()
+
+        # The coordinator may have been unregistered while refreshing
+        if coordinator in self._timers:
+            self._schedule(coordinator, coordinator.poll_interval.total_seconds())
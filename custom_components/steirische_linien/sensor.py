@@ -1,28 +1,61 @@
 """Sensor platform for Steirische Linien."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+import time
+from abc import abstractmethod
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from functools import partial
 from typing import Any
-from xml.etree import ElementTree as ET
 
-import aiohttp
-import async_timeout
-
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
-from homeassistant.const import UnitOfTime
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util, slugify
 
+from .api import async_post
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_AGGREGATE_SENSOR,
+    CONF_COLLECT_METRICS,
+    CONF_DEPARTURE_COUNT,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_UNRECORDED_VOLATILE,
+    DEFAULT_AGGREGATE_SENSOR,
+    DEFAULT_COLLECT_METRICS,
+    DEFAULT_DEPARTURE_COUNT,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    DEFAULT_UNRECORDED_VOLATILE,
+    VOLATILE_ATTRIBUTES,
+    CONF_MAX_INTERVAL,
+    CONF_MAX_STALE_AGE,
+    CONF_MIN_INTERVAL,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MAX_STALE_AGE,
+    DEFAULT_MIN_INTERVAL,
+    IMMINENT_DEPARTURE,
+    MULTI_ROUTE_PARALLELISM,
+    NEARBY_STOPS_PARALLELISM,
     MODE_TRIP,
     MODE_STATION,
+    MODE_MULTI_TRIP,
+    MODE_NEARBY,
     CONF_MODE,
     CONF_API_URL,
     CONF_ORIGIN_LAT,
@@ -30,11 +63,64 @@ from .const import (
     CONF_DEST_LAT,
     CONF_DEST_LON,
     CONF_STOP_POINT_REF,
+    CONF_STOP_POINTS,
+    CONF_ROUTES,
+    CONF_ROUTE_NAME,
+    CONF_PARSER_MODE,
+    CONF_REQUEST_PROFILE,
+    CONF_DESTINATION_PATTERN,
+    CONF_LINE_FILTER_MODE,
+    CONF_LINES,
+    CONF_MIN_MINUTES,
+    CONF_PLATFORMS,
+    FILTERED_RESULTS_FACTOR,
+    LINE_FILTER_EXCLUDE,
+    MAX_NUMBER_OF_RESULTS,
+    DEFAULT_PARSER_MODE,
+    DEFAULT_REQUEST_PROFILE,
+    DOMAIN,
+    PARSER_AUTO,
+    PARSER_STREAMING,
+    PARSER_TREE,
+    STARTUP_REFRESH_WINDOW,
+    STREAM_CHUNK_SIZE,
+)
+from .metrics import (
+    STAGE_CONNECT,
+    STAGE_DECODE,
+    STAGE_FIRST_BYTE,
+    STAGE_PARSE,
+    STAGE_READ,
+    STAGE_WRITE,
+    FetchMetrics,
+)
+from .models import Departure
+from .parse_backend import ParseBackend, async_get_parse_backend
+from .parser import (
+    DepartureFilter,
+    StreamingParser,
+    merge_departures,
+    parse_departures,
+    parse_stop_events,
+    payload_digest,
 )
+from .registry import async_get_shared_query, async_release_shared_query
+from .request_builder import RequestTemplate, stop_event_request, trip_request
+from .trias_time import format_trias_time, utcnow
+from .scheduler import DATA_SCHEDULER, PollScheduler
+from .snapshot_store import SnapshotStore, async_get_snapshot_store
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(minutes=1)
+SCAN_INTERVAL = timedelta(minutes=2)
+
+# Sensors count down against the local clock between fetches
+LOCAL_UPDATE_INTERVAL = timedelta(seconds=15)
+
+# Extra departures fetched so slots stay filled as departures leave
+DEPARTURE_BUFFER = 3
+
+DATA_COORDINATORS = "coordinators"
 
 
 async def async_setup_entry(
@@ -43,26 +129,96 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
-    coordinator = SteirischeLinienDataUpdateCoordinator(
-        hass,
-        config_entry.data,
+    config_data = {**config_entry.data, **config_entry.options}
+    if config_data.get(CONF_MODE) == MODE_MULTI_TRIP:
+        coordinator_class = MultiRouteDataUpdateCoordinator
+    elif config_data.get(CONF_MODE) == MODE_NEARBY:
+        coordinator_class = NearbyStopsDataUpdateCoordinator
+    else:
+        coordinator_class = SteirischeLinienDataUpdateCoordinator
+    coordinator = coordinator_class(hass, config_data, config_entry.entry_id)
+
+    config_entry.async_on_unload(coordinator.async_release)
+
+    # Diagnostics look the coordinator up by entry
+    coordinators = hass.data[DOMAIN].setdefault(DATA_COORDINATORS, {})
+    coordinators[config_entry.entry_id] = coordinator
+
+    @callback
+    def _async_forget_coordinator() -> None:
+        coordinators.pop(config_entry.entry_id, None)
+
+    config_entry.async_on_unload(_async_forget_coordinator)
+
+    # Start from the departures saved before the restart instead of
+    # waiting for the API; all polls, the first one included, are paced by
+    # the integration-wide scheduler in the background
+    restored = await coordinator.async_restore_snapshot()
+    scheduler: PollScheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+    config_entry.async_on_unload(
+        scheduler.async_register(coordinator, STARTUP_REFRESH_WINDOW if restored else 0)
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    if coordinator.metrics is not None:
+        async_add_entities(
+            [
+                FetchMetricsSensor(coordinator, config_entry.entry_id, key)
+                for key in METRIC_SENSORS
+            ]
+        )
+
+    if config_data.get(CONF_AGGREGATE_SENSOR, DEFAULT_AGGREGATE_SENSOR):
+        async_add_entities(
+            [
+                TransitDeparturesSensor(coordinator, config_entry.entry_id, route)
+                for route in coordinator.route_names
+            ]
+        )
+        return
+
+    sensor_class = TransitDepartureSensor
+    if config_data.get(CONF_UNRECORDED_VOLATILE, DEFAULT_UNRECORDED_VOLATILE):
+        sensor_class = UnrecordedTransitDepartureSensor
 
     sensors = []
-    for i in range(7):
-        sensors.append(
-            TransitDepartureSensor(
-                coordinator,
-                i,
-                config_entry.entry_id,
+    for route in coordinator.route_names:
+        for i in range(coordinator.departure_count):
+            sensors.append(
+                sensor_class(
+                    coordinator,
+                    i,
+                    config_entry.entry_id,
+                    route,
+                )
             )
-        )
 
     async_add_entities(sensors)
 
 
+def _split_names(value: str | None) -> list[str]:
+    """Split a comma separated option into names."""
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def _create_departure_filter(config_data: dict) -> DepartureFilter | None:
+    """Build the departure filter of an entry, or None if it filters nothing."""
+    lines = _split_names(config_data.get(CONF_LINES))
+    platforms = _split_names(config_data.get(CONF_PLATFORMS))
+    destination = config_data.get(CONF_DESTINATION_PATTERN) or None
+    min_minutes = config_data.get(CONF_MIN_MINUTES) or 0
+
+    if not (lines or platforms or destination or min_minutes):
+        return None
+
+    return DepartureFilter(
+        lines=lines,
+        exclude_lines=config_data.get(CONF_LINE_FILTER_MODE) == LINE_FILTER_EXCLUDE,
+        destination=destination,
+        platforms=platforms,
+        min_minutes=min_minutes,
+    )
+
+
 class SteirischeLinienDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
@@ -70,371 +226,617 @@ class SteirischeLinienDataUpdateCoordinator(DataUpdateCoordinator):
         self,
         hass: HomeAssistant,
         config_data: dict,
+        entry_id: str | None = None,
     ) -> None:
-        """Initialize."""
+        """Initialize.
+
+        Departures are only saved for restarts when entry_id is given.
+        """
         self.config_data = config_data
         self.hass = hass
+        self.entry_id = entry_id
+        self._snapshots: SnapshotStore | None = (
+            async_get_snapshot_store(hass) if entry_id is not None else None
+        )
+        self._query = async_get_shared_query(hass, config_data)
+        self._scheduler: PollScheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+        self._parse_backend: ParseBackend = async_get_parse_backend(hass)
+        self.poll_interval = SCAN_INTERVAL
+        self._last_success: float | None = None
+        self.departure_count: int = config_data.get(CONF_DEPARTURE_COUNT, DEFAULT_DEPARTURE_COUNT)
+        self._fetch_limit = self.departure_count + DEPARTURE_BUFFER
+        self._stop_events = config_data.get(CONF_MODE, MODE_TRIP) == MODE_STATION
+        self._filter = _create_departure_filter(config_data)
+        self._templates = self._create_request_templates()
+        # Timings and counters, only collected when enabled
+        self.metrics: FetchMetrics | None = (
+            FetchMetrics()
+            if config_data.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS)
+            else None
+        )
+        # Polls are triggered by the scheduler, not by a timer of our own
         super().__init__(
             hass,
             _LOGGER,
             name="Powerhaus - Steirische Öffis",
-            update_interval=SCAN_INTERVAL,
+            update_interval=None,
+            # Only notify sensors when the departures actually changed
+            always_update=False,
         )
 
+    @property
+    def route_names(self) -> list[str | None]:
+        """Return the routes sensors are created for (None for a single query)."""
+        return [None]
+
+    def _route_departures(self, route: str | None) -> list[Departure]:
+        """Return the fetched departures of a route."""
+        return self.data or []
+
+    def _all_departures(self, data: Any) -> list[Departure]:
+        """Return all departures in coordinator data, in departure order."""
+        return data or []
+
+    def upcoming(self, now: datetime, route: str | None = None) -> list[Departure]:
+        """Return the fetched departures that have not left yet.
+
+        With a minimum minutes filter, departures closer than that are
+        dropped as the countdown reaches them.
+        """
+        if self._filter is not None and self._filter.min_minutes:
+            now += timedelta(minutes=self._filter.min_minutes)
+        return [
+            departure
+            for departure in self._route_departures(route)
+            if departure.departure >= now
+        ]
+
+    @property
+    def query_users(self) -> int:
+        """Return the number of entries sharing this coordinator's query."""
+        return self._query.users
+
+    @callback
+    def async_release(self) -> None:
+        """Stop sharing the upstream query with other entries."""
+        async_release_shared_query(self.hass, self._query)
+
     async def _async_update_data(self):
         """Update data via library."""
         try:
-            async with async_timeout.timeout(30):
-                return await self._fetch_departures()
+            # Entries watching the same stop or trip share one fetch and result
+            departures = await self._query.async_fetch(self._fetch_departures)
         except Exception as err:
+            if self.metrics is not None:
+                self.metrics.record_error(err)
+            return self._stale_data(err)
+
+        self._last_success = time.monotonic()
+
+        if self.config_data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING):
+            self.poll_interval = self._adaptive_interval(
+                self._all_departures(departures), dt_util.utcnow()
+            )
+
+        if self._snapshots is not None:
+            await self._snapshots.async_set(self.entry_id, self._snapshot_data(departures))
+
+        return departures
+
+    async def async_restore_snapshot(self) -> bool:
+        """Show the departures saved before the last restart.
+
+        The sensors count down from the saved times on the local clock. A
+        snapshot older than max_stale_age is not restored, like stale data
+        is not kept while the API is failing. Returns True if departures
+        were restored.
+        """
+        if self._snapshots is None:
+            return False
+        if (snapshot := await self._snapshots.async_get(self.entry_id)) is None:
+            return False
+
+        saved, stored = snapshot
+        age = max(time.time() - saved, 0)
+        if age > self.config_data.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE):
+            return False
+        try:
+            data = self._restore_data(stored)
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning(f"Ignoring unreadable departure snapshot: {err!r}")
+            return False
+
+        # Count the snapshot's age towards max_stale_age if polls fail
+        self._last_success = time.monotonic() - age
+        if self._query.data is None:
+            self._query.data = data
+        self.async_set_updated_data(data)
+        _LOGGER.debug(f"Restored departures saved {int(age)} seconds ago")
+        return True
+
+    def _snapshot_data(self, data: Any) -> Any:
+        """Return coordinator data in a JSON serializable form."""
+        return [departure.as_dict() for departure in data or []]
+
+    def _restore_data(self, stored: Any) -> Any:
+        """Return coordinator data from its _snapshot_data form."""
+        return [Departure.from_dict(item) for item in stored]
+
+    def _stale_data(self, err: Exception) -> Any:
+        """Keep serving the last good departures while the API is failing.
+
+        The sensors count down on the local clock, so old data stays useful
+        for a while. Once it is older than max_stale_age the update fails
+        and the sensors become unavailable.
+        """
+        max_stale_age = self.config_data.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+        if (
+            self.data is None
+            or self._last_success is None
+            or time.monotonic() - self._last_success > max_stale_age
+        ):
             raise UpdateFailed(f"Error communicating with API: {err}")
 
-    async def _fetch_departures(self):
-        """Fetch departure data from TRIAS API."""
-        mode = self.config_data.get(CONF_MODE, MODE_TRIP)
-        api_url = self.config_data.get(CONF_API_URL)
+        _LOGGER.warning(
+            f"Error communicating with API, keeping departures from "
+            f"{int(time.monotonic() - self._last_success)} seconds ago: {err}"
+        )
+        # Try again soon rather than after a long adaptive interval
+        self.poll_interval = timedelta(
+            seconds=self.config_data.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        )
+        return self.data
 
-        # Determine which XML request to create based on mode
-        if mode == MODE_STATION:
-            stop_point_ref = self.config_data.get(CONF_STOP_POINT_REF)
-            xml_request = self._create_stop_event_request_xml(stop_point_ref)
+    def _adaptive_interval(self, departures: list[Departure], now: datetime) -> timedelta:
+        """Choose the next poll interval from the departures just fetched.
+
+        Polls often while a departure is imminent or live delays are moving,
+        and back off when the next departure is far away. Late at night and
+        after the last departure of the service day this naturally stretches
+        the interval to its maximum.
+        """
+        min_interval = timedelta(
+            seconds=self.config_data.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        )
+        max_interval = timedelta(
+            seconds=self.config_data.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+        )
+
+        if not departures:
+            return max_interval
+
+        until_next = departures[0].departure - now
+        if until_next <= timedelta(seconds=IMMINENT_DEPARTURE) or self._delays_changed(
+            departures
+        ):
+            return min_interval
+
+        # Check again about a third of the way to the next departure
+        interval = until_next / 3
+
+        # Refetch before the buffer runs out and sensor slots go empty
+        if len(departures) > DEPARTURE_BUFFER:
+            interval = min(interval, departures[DEPARTURE_BUFFER].departure - now)
+
+        return max(min_interval, min(interval, max_interval))
+
+    def _delays_changed(self, departures: list[Departure]) -> bool:
+        """Return True if a live time moved since the previous fetch."""
+        if not self.data:
+            return False
+        previous = {
+            (departure.line, departure.destination, departure.scheduled): departure.estimated
+            for departure in self._all_departures(self.data)
+        }
+        for departure in departures:
+            key = (departure.line, departure.destination, departure.scheduled)
+            if key in previous and previous[key] != departure.estimated:
+                return True
+        return False
+
+    def _create_request_templates(self) -> dict[str | None, RequestTemplate]:
+        """Pre-render the request of this entry; only timestamps change per poll."""
+        if self._stop_events:
+            # Stop events include every line, so ask for more than we keep
+            template = stop_event_request(
+                self.config_data.get(CONF_STOP_POINT_REF),
+                self._number_of_results(2 * self._fetch_limit),
+            )
         else:
             # Trip mode (default/legacy)
-            origin_lat = self.config_data.get(CONF_ORIGIN_LAT)
-            origin_lon = self.config_data.get(CONF_ORIGIN_LON)
-            dest_lat = self.config_data.get(CONF_DEST_LAT)
-            dest_lon = self.config_data.get(CONF_DEST_LON)
-            xml_request = self._create_trip_request_xml(
-                origin_lat, origin_lon,
-                dest_lat, dest_lon,
-                datetime.now()
-            )
+            template = self._create_route_template(self.config_data)
+        return {None: template}
+
+    def _create_route_template(self, route: dict) -> RequestTemplate:
+        """Pre-render the trip request for an origin/destination pair."""
+        return trip_request(
+            route.get(CONF_ORIGIN_LAT), route.get(CONF_ORIGIN_LON),
+            route.get(CONF_DEST_LAT), route.get(CONF_DEST_LON),
+            self._number_of_results(self._fetch_limit),
+            self.config_data.get(CONF_REQUEST_PROFILE, DEFAULT_REQUEST_PROFILE),
+        )
+
+    def _number_of_results(self, count: int) -> int:
+        """Return how many results to request to keep `count` departures.
+
+        Keeping only some lines, destinations or platforms drops most of
+        the results, so such entries ask for FILTERED_RESULTS_FACTOR times
+        more.
+        """
+        if self._filter is None or not self._filter.is_selective:
+            return count
+        return min(count * FILTERED_RESULTS_FACTOR, MAX_NUMBER_OF_RESULTS)
+
+    def _render_request(self, key: str | None = None) -> bytes:
+        """Fill the current time into a pre-rendered request."""
+        now = format_trias_time(utcnow())
+        return self._templates[key].render(request_timestamp=now, dep_arr_time=now)
+
+    async def _fetch_departures(self):
+        """Fetch departure data from TRIAS API."""
+        return await self._async_request(self._render_request(), self._stop_events)
+
+    async def _async_request(
+        self, xml_request: bytes, stop_events: bool, payload_key: str | None = None
+    ) -> list[Departure]:
+        """Send a request and return the parsed departures.
+
+        payload_key tells apart the payloads of a query that sends several
+        requests, so each one is compared with its own previous version.
+        """
+        api_url = self.config_data.get(CONF_API_URL)
 
         headers = {
             "User-Agent": "HomeAssistant",
             "Content-Type": "text/xml",
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                api_url,
-                data=xml_request.encode('utf-8'),
-                headers=headers
-            ) as response:
-                response_text = await response.text()
-
-                # Parse response based on mode
-                if mode == MODE_STATION:
-                    return self._parse_stop_events(response_text)
-                else:
-                    return self._parse_departures(response_text)
-
-    def _create_trip_request_xml(
+        metrics = self.metrics
+        body = await async_post(
+            self.hass,
+            api_url,
+            xml_request,
+            headers,
+            partial(self._scheduler.async_acquire, api_url),
+            metrics.trace() if metrics is not None else None,
+        )
+        if metrics is not None:
+            metrics.counters["response_bytes"] += len(body)
+
+        # Skip parsing when the payload is the same as last time
+        digest = payload_digest(body)
+        previous = self._query.payloads.get(payload_key)
+        if previous is not None and previous[0] == digest:
+            if metrics is not None:
+                metrics.counters["unchanged_payloads"] += 1
+            return previous[1]
+
+        # Large responses are parsed in the executor, so the parser only
+        # counts into a local Counter that is merged here on the loop
+        if metrics is None:
+            departures = await self._parse_backend.async_parse(
+                self._parse, body, stop_events, None
+            )
+        else:
+            counters: Counter[str] = Counter()
+            start = time.perf_counter()
+            departures = await self._parse_backend.async_parse(
+                self._parse, body, stop_events, counters
+            )
+            metrics.record(STAGE_PARSE, time.perf_counter() - start)
+            counters["departures_kept"] += len(departures)
+            metrics.counters.update(counters)
+
+        # Hand back the previous list if nothing meaningful changed, so
+        # listeners see identical data and skip their state writes
+        if previous is not None and departures == previous[1]:
+            departures = previous[1]
+
+        self._query.payloads[payload_key] = (digest, departures)
+        return departures
+
+    def _parser_mode(self, stop_events: bool) -> str:
+        """Return the parser to use for a response.
+
+        Streaming only pays off when it can stop reading early: unfiltered
+        stop event responses hold twice the departures kept. Filtered
+        responses are mostly dropped and trip responses hold just what is
+        kept, so those parse faster as a whole document.
+        """
+        mode = self.config_data.get(CONF_PARSER_MODE, DEFAULT_PARSER_MODE)
+        if mode != PARSER_AUTO:
+            return mode
+        if stop_events and self._filter is None:
+            return PARSER_STREAMING
+        return PARSER_TREE
+
+    def _parse(
+        self, body: bytes, stop_events: bool, counters: Counter[str] | None
+    ) -> list[Departure]:
+        """Parse a response body with the configured parser.
+
+        May run in the executor, so it must not touch coordinator state.
+        """
+        limit = self._fetch_limit
+
+        if self._parser_mode(stop_events) == PARSER_STREAMING:
+            parser = StreamingParser(
+                stop_events=stop_events, limit=limit, departure_filter=self._filter
+            )
+            for offset in range(0, len(body), STREAM_CHUNK_SIZE):
+                if parser.feed(body[offset:offset + STREAM_CHUNK_SIZE]):
+                    break
+            departures = parser.close()
+            if counters is not None:
+                counters["events_parsed"] += parser.events
+            return departures
+
+        # Parse response based on mode
+        backend = self._parse_backend.name
+        if stop_events:
+            return parse_stop_events(body, limit, counters, backend, self._filter)
+        else:
+            return parse_departures(body, limit, counters, backend, self._filter)
+
+
+class MultiRouteDataUpdateCoordinator(SteirischeLinienDataUpdateCoordinator):
+    """Coordinator answering several origin/destination pairs in one poll.
+
+    The trip requests of all routes run concurrently, at most
+    MULTI_ROUTE_PARALLELISM at a time. A route whose request fails keeps
+    its previous departures; the update only fails if every route fails.
+    """
+
+    def __init__(
         self,
-        origin_lat: float,
-        origin_lon: float,
-        dest_lat: float,
-        dest_lon: float,
-        dep_time: datetime,
-    ) -> str:
-        """Create TRIAS XML request for trip planning."""
-        utc_time = dep_time - timedelta(hours=2)
-        dep_arr_time = utc_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        
-        now_utc = datetime.now() - timedelta(hours=2)
-        request_timestamp = now_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
-        
-        return f"""<Trias xmlns="http://www.vdv.de/trias" xmlns:siri="http://www.siri.org.uk/siri" version="1.2">
-<ServiceRequest>
-<siri:RequestTimestamp>{request_timestamp}</siri:RequestTimestamp>
-<siri:RequestorRef>homeassistant</siri:RequestorRef>
-<RequestPayload>
-<TripRequest>
-<Origin>
-<LocationRef>
-<GeoPosition>
-<Longitude>{origin_lon}</Longitude>
-<Latitude>{origin_lat}</Latitude>
-</GeoPosition>
-<LocationName>
-<Text>Origin</Text>
-<Language>de</Language>
-</LocationName>
-</LocationRef>
-<DepArrTime>{dep_arr_time}</DepArrTime>
-</Origin>
-<Destination>
-<LocationRef>
-<GeoPosition>
-<Longitude>{dest_lon}</Longitude>
-<Latitude>{dest_lat}</Latitude>
-</GeoPosition>
-<LocationName>
-<Text>Destination</Text>
-<Language>de</Language>
-</LocationName>
-</LocationRef>
-</Destination>
-<Params>
-<NumberOfResults>10</NumberOfResults>
-<IncludeTrackSections>false</IncludeTrackSections>
-<IncludeLegProjection>false</IncludeLegProjection>
-<IncludeIntermediateStops>true</IncludeIntermediateStops>
-<IncludeAllRestrictedLines>false</IncludeAllRestrictedLines>
-<WalkSpeed>normal</WalkSpeed>
-<OptimisationMethod>fastest</OptimisationMethod>
-</Params>
-</TripRequest>
-</RequestPayload>
-</ServiceRequest>
-</Trias>"""
-
-    def _parse_departures(self, xml_text: str) -> list[dict]:
-        """Parse departures from TRIAS response."""
-        departures = []
-        
-        try:
-            namespaces = {
-                'trias': 'http://www.vdv.de/trias',
-                'siri': 'http://www.siri.org.uk/siri'
-            }
-            
-            root = ET.fromstring(xml_text)
-            trip_results = root.findall('.//trias:TripResult', namespaces)
-            
-            now = datetime.now()
-            
-            for trip_result in trip_results:
-                first_timed_leg = trip_result.find('.//trias:TimedLeg', namespaces)
-                
-                if first_timed_leg is not None:
-                    departure_info = {}
-                    
-                    # Get line number
-                    line_name = first_timed_leg.find('.//trias:PublishedLineName/trias:Text', namespaces)
-                    if line_name is not None:
-                        departure_info['line'] = line_name.text
-                    
-                    # Get destination
-                    destination = first_timed_leg.find('.//trias:DestinationText/trias:Text', namespaces)
-                    if destination is not None:
-                        departure_info['destination'] = destination.text
-                    
-                    # Get times from API
-                    board_estimated = first_timed_leg.find('.//trias:LegBoard//trias:EstimatedTime', namespaces)
-                    board_scheduled = first_timed_leg.find('.//trias:LegBoard//trias:TimetabledTime', namespaces)
-                    
-                    # Store raw API times
-                    scheduled_time_str = board_scheduled.text if board_scheduled is not None else ""
-                    live_time_str = board_estimated.text if board_estimated is not None else ""
-                    
-                    departure_info['scheduled_departure_time'] = scheduled_time_str
-                    departure_info['live_departure_time'] = live_time_str
-                    
-                    departure_time_str = None
-                    is_delayed = False
-                    is_scheduled = False
-                    
-                    if board_estimated is not None:
-                        departure_time_str = board_estimated.text
-                        if board_scheduled is not None:
-                            try:
-                                sched_utc = datetime.strptime(board_scheduled.text, "%Y-%m-%dT%H:%M:%SZ")
-                                est_utc = datetime.strptime(board_estimated.text, "%Y-%m-%dT%H:%M:%SZ")
-                                if est_utc > sched_utc:
-                                    is_delayed = True
-                            except:
-                                pass
-                    elif board_scheduled is not None:
-                        departure_time_str = board_scheduled.text
-                        is_scheduled = True
-                    
-                    if departure_time_str:
-                        try:
-                            dep_utc = datetime.strptime(departure_time_str, "%Y-%m-%dT%H:%M:%SZ")
-                            dep_local = dep_utc + timedelta(hours=2)
-                            
-                            if dep_local >= now:
-                                minutes_until = int((dep_local - now).total_seconds() / 60)
-                                departure_info['minutes'] = minutes_until
-                                departure_info['time'] = dep_local.strftime("%H:%M")
-                                departure_info['is_delayed'] = is_delayed
-                                departure_info['is_scheduled'] = is_scheduled
-                                departures.append(departure_info)
-                        except:
-                            pass
-            
-            # Sort by minutes
-            departures.sort(key=lambda x: x.get('minutes', 999))
-            
-            # Filter out duplicates based on line, destination, and time
-            seen = set()
-            unique_departures = []
-            for dep in departures:
-                # Create a unique key from line, destination, and departure time
-                key = (
-                    dep.get('line', ''),
-                    dep.get('destination', ''),
-                    dep.get('time', '')
-                )
-                if key not in seen:
-                    seen.add(key)
-                    unique_departures.append(dep)
-                    if len(unique_departures) >= 7:
-                        break
-            
-            return unique_departures
-            
-        except Exception as e:
-            _LOGGER.error(f"Error parsing response: {e}")
-            return []
+        hass: HomeAssistant,
+        config_data: dict,
+        entry_id: str | None = None,
+    ) -> None:
+        """Initialize."""
+        super().__init__(hass, config_data, entry_id)
+        self.routes: list[dict] = config_data[CONF_ROUTES]
+        self._semaphore = asyncio.Semaphore(MULTI_ROUTE_PARALLELISM)
 
-    def _create_stop_event_request_xml(self, stop_point_ref: str) -> str:
-        """Create TRIAS XML request for station departures."""
-        now = datetime.now(timezone.utc).isoformat()
-
-        return f"""<?xml version="1.0" encoding="UTF-8"?>
-<Trias xmlns="http://www.vdv.de/trias" version="1.2">
-  <ServiceRequest>
-    <siri:RequestTimestamp xmlns:siri="http://www.siri.org.uk/siri">{now}</siri:RequestTimestamp>
-    <siri:RequestorRef xmlns:siri="http://www.siri.org.uk/siri">homeassistant</siri:RequestorRef>
-    <RequestPayload>
-      <StopEventRequest>
-        <Location>
-          <LocationRef>
-            <StopPointRef>{stop_point_ref}</StopPointRef>
-          </LocationRef>
-          <DepArrTime>{now}</DepArrTime>
-        </Location>
-        <Params>
-          <NumberOfResults>20</NumberOfResults>
-          <StopEventType>departure</StopEventType>
-          <IncludePreviousCalls>false</IncludePreviousCalls>
-          <IncludeOnwardCalls>false</IncludeOnwardCalls>
-          <IncludeRealtimeData>true</IncludeRealtimeData>
-        </Params>
-      </StopEventRequest>
-    </RequestPayload>
-  </ServiceRequest>
-</Trias>"""
-
-    def _parse_stop_events(self, xml_text: str) -> list[dict]:
-        """Parse station departure events from TRIAS StopEventRequest response."""
-        departures = []
+    def _create_request_templates(self) -> dict[str | None, RequestTemplate]:
+        """Pre-render the trip request of every route."""
+        return {
+            route[CONF_ROUTE_NAME]: self._create_route_template(route)
+            for route in self.config_data[CONF_ROUTES]
+        }
 
-        try:
-            namespaces = {
-                'trias': 'http://www.vdv.de/trias',
-                'siri': 'http://www.siri.org.uk/siri'
-            }
-
-            root = ET.fromstring(xml_text)
-            stop_events = root.findall('.//trias:StopEvent', namespaces)
-
-            now = datetime.now(timezone.utc)
-
-            for event in stop_events:
-                try:
-                    departure_info = {}
-
-                    # Extract line number
-                    line_name = event.find('.//trias:PublishedLineName/trias:Text', namespaces)
-                    if line_name is not None:
-                        departure_info['line'] = line_name.text
-
-                    # Extract destination
-                    destination_text = event.find('.//trias:DestinationText/trias:Text', namespaces)
-                    if destination_text is not None:
-                        departure_info['destination'] = destination_text.text
-
-                    # Extract departure times
-                    service_departure = event.find('.//trias:ThisCall/trias:CallAtStop/trias:ServiceDeparture', namespaces)
-
-                    timetabled_time_str = None
-                    estimated_time_str = None
-
-                    if service_departure is not None:
-                        timetabled_elem = service_departure.find('trias:TimetabledTime', namespaces)
-                        if timetabled_elem is not None:
-                            timetabled_time_str = timetabled_elem.text
-
-                        estimated_elem = service_departure.find('trias:EstimatedTime', namespaces)
-                        if estimated_elem is not None:
-                            estimated_time_str = estimated_elem.text
-
-                    # Store raw API times
-                    departure_info['scheduled_departure_time'] = timetabled_time_str or ""
-                    departure_info['live_departure_time'] = estimated_time_str or ""
-
-                    # Determine which time to use
-                    departure_time_str = estimated_time_str or timetabled_time_str
-                    is_delayed = False
-                    is_scheduled = False
-
-                    if estimated_time_str and timetabled_time_str:
-                        try:
-                            timetabled_dt = datetime.fromisoformat(timetabled_time_str.replace('Z', '+00:00'))
-                            estimated_dt = datetime.fromisoformat(estimated_time_str.replace('Z', '+00:00'))
-                            if estimated_dt > timetabled_dt:
-                                is_delayed = True
-                        except:
-                            pass
-                    elif not estimated_time_str:
-                        is_scheduled = True
-
-                    if departure_time_str:
-                        try:
-                            # Parse ISO format with timezone
-                            dep_dt = datetime.fromisoformat(departure_time_str.replace('Z', '+00:00'))
-
-                            # Only include future departures
-                            if dep_dt >= now:
-                                time_diff = dep_dt - now
-                                minutes = int(time_diff.total_seconds() / 60)
-
-                                # Convert to local time for display
-                                local_time = dep_dt.astimezone()
-
-                                departure_info['minutes'] = minutes
-                                departure_info['time'] = local_time.strftime("%H:%M")
-                                departure_info['is_delayed'] = is_delayed
-                                departure_info['is_scheduled'] = is_scheduled
-
-                                departures.append(departure_info)
-                        except Exception as e:
-                            _LOGGER.debug(f"Error parsing departure time: {e}")
-                            pass
-
-                except Exception as e:
-                    _LOGGER.debug(f"Error parsing stop event: {e}")
-                    continue
-
-            # Sort by minutes until departure
-            departures.sort(key=lambda x: x.get('minutes', 999))
-
-            # Filter out duplicates based on line, destination, and time
-            seen = set()
-            unique_departures = []
-            for dep in departures:
-                key = (
-                    dep.get('line', ''),
-                    dep.get('destination', ''),
-                    dep.get('time', '')
-                )
-                if key not in seen:
-                    seen.add(key)
-                    unique_departures.append(dep)
-                    if len(unique_departures) >= 7:
-                        break
+    @property
+    def route_names(self) -> list[str | None]:
+        """Return the names of all routes."""
+        return [route[CONF_ROUTE_NAME] for route in self.routes]
 
-            return unique_departures
+    def _route_departures(self, route: str | None) -> list[Departure]:
+        """Return the fetched departures of a route."""
+        return (self.data or {}).get(route, [])
 
-        except Exception as e:
-            _LOGGER.error(f"Error parsing stop events: {e}")
+    def _all_departures(self, data: Any) -> list[Departure]:
+        """Return the departures of all routes, in departure order."""
+        if not data:
             return []
+        return sorted(
+            (departure for departures in data.values() for departure in departures),
+            key=lambda departure: departure.departure,
+        )
+
+    def _snapshot_data(self, data: Any) -> Any:
+        """Return the departures of every route in a JSON serializable form."""
+        return {
+            name: [departure.as_dict() for departure in departures]
+            for name, departures in (data or {}).items()
+        }
+
+    def _restore_data(self, stored: Any) -> Any:
+        """Return the departures of every route from their _snapshot_data form."""
+        return {
+            name: [Departure.from_dict(item) for item in departures]
+            for name, departures in stored.items()
+        }
+
+    async def _fetch_departures(self) -> dict[str, list[Departure]]:
+        """Fetch the departures of all routes concurrently."""
+        results = await asyncio.gather(
+            *(self._async_fetch_route(route) for route in self.routes),
+            return_exceptions=True,
+        )
+
+        previous = self._query.data or {}
+        data: dict[str, list[Departure]] = {}
+        errors: list[BaseException] = []
+
+        for route, result in zip(self.routes, results):
+            name = route[CONF_ROUTE_NAME]
+            if isinstance(result, BaseException):
+                _LOGGER.warning(f"Error fetching route {name}: {result!r}")
+                errors.append(result)
+                data[name] = previous.get(name, [])
+            else:
+                data[name] = result
+
+        if len(errors) == len(self.routes):
+            raise errors[0]
+
+        return data
+
+    async def _async_fetch_route(self, route: dict) -> list[Departure]:
+        """Fetch the departures of one route."""
+        async with self._semaphore:
+            name = route[CONF_ROUTE_NAME]
+            return await self._async_request(self._render_request(name), False, name)
+
+
+class NearbyStopsDataUpdateCoordinator(SteirischeLinienDataUpdateCoordinator):
+    """Coordinator merging the departures of all stops near a point.
+
+    The stop points were resolved once when the entry was created. Their
+    stop event requests run concurrently, at most NEARBY_STOPS_PARALLELISM
+    at a time, and the per-stop results, each already in departure order,
+    are merged into one list. A stop whose request fails keeps its previous
+    departures; the update only fails if every stop fails.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_data: dict,
+        entry_id: str | None = None,
+    ) -> None:
+        """Initialize."""
+        super().__init__(hass, config_data, entry_id)
+        self.stop_point_refs: list[str] = [
+            stop['stop_point_ref'] for stop in config_data[CONF_STOP_POINTS]
+        ]
+        self._semaphore = asyncio.Semaphore(NEARBY_STOPS_PARALLELISM)
+
+    def _create_request_templates(self) -> dict[str | None, RequestTemplate]:
+        """Pre-render the stop event request of every stop point."""
+        return {
+            stop['stop_point_ref']: stop_event_request(
+                stop['stop_point_ref'], self._number_of_results(2 * self._fetch_limit)
+            )
+            for stop in self.config_data[CONF_STOP_POINTS]
+        }
+
+    async def _fetch_departures(self) -> list[Departure]:
+        """Fetch the departures of all stops concurrently and merge them."""
+        results = await asyncio.gather(
+            *(self._async_fetch_stop(stop_point_ref) for stop_point_ref in self.stop_point_refs),
+            return_exceptions=True,
+        )
+
+        stop_departures: list[list[Departure]] = []
+        errors: list[BaseException] = []
+
+        for stop_point_ref, result in zip(self.stop_point_refs, results):
+            if isinstance(result, BaseException):
+                _LOGGER.warning(f"Error fetching stop {stop_point_ref}: {result!r}")
+                errors.append(result)
+                previous = self._query.payloads.get(stop_point_ref)
+                result = previous[1] if previous is not None else []
+            stop_departures.append(result)
+
+        if len(errors) == len(self.stop_point_refs):
+            raise errors[0]
+
+        return merge_departures(stop_departures, self._fetch_limit)
+
+    async def _async_fetch_stop(self, stop_point_ref: str) -> list[Departure]:
+        """Fetch the departures of one stop point."""
+        async with self._semaphore:
+            return await self._async_request(
+                self._render_request(stop_point_ref), True, stop_point_ref
+            )
+
+
+class _CountdownSensor(CoordinatorEntity, SensorEntity):
+    """Base for sensors that count down to departures on the local clock.
+
+    State is only written when what the sensor shows changed. A new
+    departure or a change of availability is written right away; a
+    countdown that merely ticked is written at most every
+    min_write_interval seconds.
+    """
+
+    def __init__(
+        self,
+        coordinator: SteirischeLinienDataUpdateCoordinator,
+        route: str | None,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._route = route
+        self._attr_native_unit_of_measurement = UnitOfTime.MINUTES
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._min_write_interval: float = coordinator.config_data.get(
+            CONF_MIN_WRITE_INTERVAL, DEFAULT_MIN_WRITE_INTERVAL
+        )
+        self._last_departures: Any = None
+        self._last_countdown: Any = None
+        self._last_available: bool | None = None
+        self._last_write = 0.0
+        self._unsub_deferred_write: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Start the local countdown when added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_countdown, LOCAL_UPDATE_INTERVAL
+            )
+        )
+        self.async_on_remove(self._async_cancel_deferred_write)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if what this sensor shows changed."""
+        self._async_write_if_changed()
+
+    @callback
+    def _async_countdown(self, _now: datetime) -> None:
+        """Re-render the state against the current time."""
+        self._async_write_if_changed()
+
+    @callback
+    def _async_deferred_write(self, _now: datetime) -> None:
+        """Write a countdown change held back by the throttle."""
+        self._unsub_deferred_write = None
+        self._async_write_if_changed()
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write state when availability or the rendered departures changed."""
+        departures, countdown = self._render(dt_util.utcnow())
+        available = self.available
+
+        if available == self._last_available and departures == self._last_departures:
+            if countdown == self._last_countdown:
+                return
+
+            # Only the countdown moved: throttle the write
+            wait = self._last_write + self._min_write_interval - time.monotonic()
+            if wait > 0:
+                if self._unsub_deferred_write is None:
+                    self._unsub_deferred_write = async_call_later(
+                        self.hass, wait, self._async_deferred_write
+                    )
+                return
+
+        self._async_cancel_deferred_write()
+        self._last_available = available
+        self._last_departures = departures
+        self._last_countdown = countdown
+        self._last_write = time.monotonic()
+
+        if (metrics := self.coordinator.metrics) is None:
+            self.async_write_ha_state()
+            return
+        start = time.perf_counter()
+        self.async_write_ha_state()
+        metrics.record(STAGE_WRITE, time.perf_counter() - start)
+        metrics.counters["state_writes"] += 1
+
+    @callback
+    def _async_cancel_deferred_write(self) -> None:
+        """Cancel a pending throttled write."""
+        if self._unsub_deferred_write is not None:
+            self._unsub_deferred_write()
+            self._unsub_deferred_write = None
+
+    @abstractmethod
+    def _render(self, now: datetime) -> tuple[Any, Any]:
+        """Return what the sensor shows as (departures, countdowns)."""
+
+    @property
+    def icon(self) -> str:
+        """Return the icon to use in the frontend."""
+        return "mdi:bus"
 
 
-class TransitDepartureSensor(CoordinatorEntity, SensorEntity):
+class TransitDepartureSensor(_CountdownSensor):
     """Representation of a Transit Departure sensor."""
 
     def __init__(
@@ -442,41 +844,198 @@ class TransitDepartureSensor(CoordinatorEntity, SensorEntity):
         coordinator: SteirischeLinienDataUpdateCoordinator,
         index: int,
         entry_id: str,
+        route: str | None = None,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, route)
         self._index = index
-        self._attr_unique_id = f"{entry_id}_departure_{index + 1}"
-        self._attr_name = f"Transit Departure {index + 1}"
-        self._attr_native_unit_of_measurement = UnitOfTime.MINUTES
-        self._attr_device_class = SensorDeviceClass.DURATION
+        if route is None:
+            self._attr_unique_id = f"{entry_id}_departure_{index + 1}"
+            self._attr_name = f"Transit Departure {index + 1}"
+        else:
+            self._attr_unique_id = f"{entry_id}_{slugify(route)}_departure_{index + 1}"
+            self._attr_name = f"{route} Departure {index + 1}"
+
+    def _render(self, now: datetime) -> tuple[Departure | None, int | None]:
+        """Return the departure in this sensor's slot and its countdown."""
+        departure = self._departure(now)
+        return departure, departure.minutes_until(now) if departure else None
+
+    def _departure(self, now: datetime) -> Departure | None:
+        """Return the departure in this sensor's slot."""
+        upcoming = self.coordinator.upcoming(now, self._route)
+        if len(upcoming) > self._index:
+            return upcoming[self._index]
+        return None
 
     @property
     def state(self) -> int | None:
         """Return the state of the sensor."""
-        if self.coordinator.data and len(self.coordinator.data) > self._index:
-            departure = self.coordinator.data[self._index]
-            minutes = departure.get('minutes', 0)
-            return int(minutes)
+        now = dt_util.utcnow()
+        departure = self._departure(now)
+        if departure is not None:
+            return departure.minutes_until(now)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
-        if self.coordinator.data and len(self.coordinator.data) > self._index:
-            departure = self.coordinator.data[self._index]
-            return {
-                "line": departure.get('line', 'Unknown'),
-                "destination": departure.get('destination', 'Unknown'),
-                "departure_time": departure.get('time', ''),
-                "scheduled_departure_time": departure.get('scheduled_departure_time', ''),
-                "live_departure_time": departure.get('live_departure_time', ''),
-                "is_delayed": departure.get('is_delayed', False),
-                "is_scheduled": departure.get('is_scheduled', False),
-            }
+        departure = self._departure(dt_util.utcnow())
+        if departure is not None:
+            return departure.attributes
         return {}
 
+
+class UnrecordedTransitDepartureSensor(TransitDepartureSensor):
+    """Transit Departure sensor that keeps volatile attributes out of the recorder."""
+
+    _unrecorded_attributes = VOLATILE_ATTRIBUTES
+
+
+class TransitDeparturesSensor(_CountdownSensor):
+    """Single sensor exposing all departures of an entry as one list.
+
+    The state is the countdown to the next departure. The list itself is
+    left out of the recorder so history stays small.
+    """
+
+    _unrecorded_attributes = frozenset({"departures"})
+
+    def __init__(
+        self,
+        coordinator: SteirischeLinienDataUpdateCoordinator,
+        entry_id: str,
+        route: str | None = None,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, route)
+        if route is None:
+            self._attr_unique_id = f"{entry_id}_departures"
+            self._attr_name = "Transit Departures"
+        else:
+            self._attr_unique_id = f"{entry_id}_{slugify(route)}_departures"
+            self._attr_name = f"{route} Departures"
+
+    def _upcoming(self, now: datetime) -> list[Departure]:
+        """Return the departures shown by this sensor."""
+        return self.coordinator.upcoming(now, self._route)[:self.coordinator.departure_count]
+
+    def _render(self, now: datetime) -> tuple[tuple, tuple]:
+        """Return the departures shown and their countdowns."""
+        upcoming = self._upcoming(now)
+        return (
+            tuple(upcoming),
+            tuple(departure.minutes_until(now) for departure in upcoming),
+        )
+
     @property
-    def icon(self) -> str:
-        """Return the icon to use in the frontend."""
-        return "mdi:bus"
\ No newline at end of file
+    def state(self) -> int | None:
+        """Return the minutes until the next departure."""
+        now = dt_util.utcnow()
+        if upcoming := self._upcoming(now):
+            return upcoming[0].minutes_until(now)
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return all departures with their countdowns."""
+        now = dt_util.utcnow()
+        upcoming = self._upcoming(now)
+        return {
+            "departures": [
+                {**departure.attributes, "minutes": departure.minutes_until(now)}
+                for departure in upcoming
+            ]
+        }
+
+
+def _last_fetch_ms(metrics: FetchMetrics) -> float | None:
+    """Return the network time of the last request in milliseconds."""
+    stages = [metrics.last[stage] for stage in NETWORK_STAGES if stage in metrics.last]
+    return round(sum(stages) * 1000, 1) if stages else None
+
+
+def _last_stage_ms(stage: str) -> Callable[[FetchMetrics], float | None]:
+    """Return a getter for the last duration of a stage in milliseconds."""
+
+    def value(metrics: FetchMetrics) -> float | None:
+        if (seconds := metrics.last.get(stage)) is None:
+            return None
+        return round(seconds * 1000, 2)
+
+    return value
+
+
+NETWORK_STAGES = (STAGE_CONNECT, STAGE_FIRST_BYTE, STAGE_READ)
+
+# key: (name, unit, state class, value)
+METRIC_SENSORS: dict[str, tuple[str, str | None, SensorStateClass, Callable]] = {
+    "fetch_time": (
+        "Fetch Time",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        _last_fetch_ms,
+    ),
+    "parse_time": (
+        "Parse Time",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        _last_stage_ms(STAGE_PARSE),
+    ),
+    "decode_time": (
+        "Decode Time",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        _last_stage_ms(STAGE_DECODE),
+    ),
+    "response_bytes": (
+        "Response Bytes",
+        UnitOfInformation.BYTES,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda metrics: metrics.counters["response_bytes"],
+    ),
+    "wire_bytes": (
+        "Transferred Bytes",
+        UnitOfInformation.BYTES,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda metrics: metrics.counters["wire_bytes"],
+    ),
+    "fetch_errors": (
+        "Fetch Errors",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda metrics: sum(metrics.errors.values()),
+    ),
+}
+
+
+class FetchMetricsSensor(SensorEntity):
+    """Diagnostic sensor showing one fetch pipeline metric.
+
+    Metrics change on every poll even when the departures do not, so these
+    sensors are polled instead of listening to the coordinator. They only
+    record their own value; all timings and counters are in the
+    diagnostics download.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: SteirischeLinienDataUpdateCoordinator,
+        entry_id: str,
+        key: str,
+    ) -> None:
+        """Initialize the sensor."""
+        name, unit, state_class, value = METRIC_SENSORS[key]
+        self._metrics: FetchMetrics = coordinator.metrics
+        self._value = value
+        self._attr_unique_id = f"{entry_id}_{key}"
+        self._attr_name = f"Transit {name}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the metric."""
+        return self._value(self._metrics)
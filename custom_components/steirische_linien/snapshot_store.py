@@ -0,0 +1,92 @@
+"""Persisted departure snapshots, restored at startup."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SNAPSHOT_STORE = "snapshot_store"
+
+STORAGE_KEY = f"{DOMAIN}.snapshots"
+STORAGE_VERSION = 1
+
+
+class SnapshotStore:
+    """Last good departures of every config entry, persisted with Store.
+
+    All entries share one file. The first change after a write schedules
+    a save SNAPSHOT_SAVE_DELAY seconds later, so the updates of many
+    entries end up in one write without polls postponing it; Store
+    flushes a pending save when Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._snapshots: dict[str, dict[str, Any]] | None = None
+        self._load_lock = asyncio.Lock()
+        self._save_pending = False
+
+    async def _async_load(self) -> dict[str, dict[str, Any]]:
+        """Load the snapshots from disk on first use."""
+        async with self._load_lock:
+            if self._snapshots is None:
+                stored = await self._store.async_load() or {}
+                self._snapshots = stored.get("entries", {})
+        return self._snapshots
+
+    async def async_get(self, entry_id: str) -> tuple[float, Any] | None:
+        """Return (saved timestamp, data) of an entry, or None if there is none."""
+        snapshots = await self._async_load()
+        if (snapshot := snapshots.get(entry_id)) is None:
+            return None
+        return snapshot["saved"], snapshot["data"]
+
+    async def async_set(self, entry_id: str, data: Any) -> None:
+        """Save the data of an entry; `data` must be JSON serializable."""
+        snapshots = await self._async_load()
+        snapshot = snapshots.get(entry_id)
+        if snapshot is not None and snapshot["data"] == data:
+            # Still as fresh as this poll, written with the next change
+            snapshot["saved"] = time.time()
+            return
+        snapshots[entry_id] = {"saved": time.time(), "data": data}
+        self._async_schedule_save()
+
+    async def async_remove(self, entry_id: str) -> None:
+        """Forget the snapshot of a removed entry."""
+        snapshots = await self._async_load()
+        if snapshots.pop(entry_id, None) is not None:
+            self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule a save, unless one is already pending."""
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        self._save_pending = False
+        _LOGGER.debug(f"Saving departure snapshots of {len(self._snapshots or {})} entries")
+        return {"entries": dict(self._snapshots or {})}
+
+
+@callback
+def async_get_snapshot_store(hass: HomeAssistant) -> SnapshotStore:
+    """Return the shared snapshot store."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_SNAPSHOT_STORE not in domain_data:
+        domain_data[DATA_SNAPSHOT_STORE] = SnapshotStore(hass)
+    return domain_data[DATA_SNAPSHOT_STORE]
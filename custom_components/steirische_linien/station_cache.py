@@ -0,0 +1,113 @@
+"""Persistent cache of TRIAS station search results."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    STATION_CACHE_SAVE_DELAY,
+    STATION_CACHE_SIZE,
+    STATION_CACHE_TTL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STATION_CACHE = "station_cache"
+
+STORAGE_KEY = f"{DOMAIN}.station_cache"
+STORAGE_VERSION = 1
+
+
+def normalize_station_name(station_name: str) -> str:
+    """Normalize a station name so trivially different searches share a key."""
+    return " ".join(station_name.casefold().split())
+
+
+class StationCache:
+    """LRU cache of station name -> stop records, persisted with Store.
+
+    Entries expire after STATION_CACHE_TTL seconds but are kept until
+    evicted, so an expired result can still be served while the API is
+    unreachable.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._entries: OrderedDict[str, dict[str, Any]] | None = None
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def _async_load(self) -> OrderedDict[str, dict[str, Any]]:
+        """Load the cache from disk on first use."""
+        async with self._load_lock:
+            if self._entries is None:
+                stored = await self._store.async_load() or {}
+                self._entries = OrderedDict(stored.get("entries", {}))
+        return self._entries
+
+    async def async_get(
+        self, api_url: str, station_name: str, allow_expired: bool = False
+    ) -> list[dict] | None:
+        """Return cached stations for a search, or None on a miss."""
+        entries = await self._async_load()
+        key = f"{api_url}|{normalize_station_name(station_name)}"
+
+        entry = entries.get(key)
+        if entry is None or (
+            not allow_expired and time.time() - entry["fetched"] > STATION_CACHE_TTL
+        ):
+            if not allow_expired:
+                self.misses += 1
+            return None
+
+        entries.move_to_end(key)
+        if not allow_expired:
+            self.hits += 1
+        _LOGGER.debug(f"Station cache hit for {station_name!r} (hit rate {self.hit_rate:.0%})")
+        return entry["stations"]
+
+    async def async_set(self, api_url: str, station_name: str, stations: list[dict]) -> None:
+        """Store the stations found for a search."""
+        entries = await self._async_load()
+        key = f"{api_url}|{normalize_station_name(station_name)}"
+
+        entries[key] = {"stations": stations, "fetched": time.time()}
+        entries.move_to_end(key)
+        while len(entries) > STATION_CACHE_SIZE:
+            entries.popitem(last=False)
+
+        self._store.async_delay_save(self._data_to_save, STATION_CACHE_SAVE_DELAY)
+
+    async def async_all_stations(self) -> list[dict]:
+        """Return every cached stop record."""
+        entries = await self._async_load()
+        return [station for entry in entries.values() for station in entry["stations"]]
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"entries": dict(self._entries or {})}
+
+
+@callback
+def async_get_station_cache(hass: HomeAssistant) -> StationCache:
+    """Return the shared station cache."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_STATION_CACHE not in domain_data:
+        domain_data[DATA_STATION_CACHE] = StationCache(hass)
+    return domain_data[DATA_STATION_CACHE]
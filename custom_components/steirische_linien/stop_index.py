@@ -0,0 +1,304 @@
+"""Offline stop index with prefix and typo-tolerant station search."""
+from __future__ import annotations
+
+import asyncio
+import csv
+import heapq
+import logging
+import os
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterable
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, STOP_INDEX_FILE, STOP_INDEX_MIN_SIMILARITY
+from .station_cache import async_get_station_cache
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STOP_INDEX = "stop_index"
+DATA_STOP_INDEX_LOCK = "stop_index_lock"
+
+
+def _normalize(text: str) -> str:
+    """Case-fold and strip accents, so 'Grazer Straße' matches 'grazer strasse'."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _tokens(text: str) -> list[str]:
+    """Split a normalized name into alphanumeric tokens."""
+    return "".join(char if char.isalnum() else " " for char in _normalize(text)).split()
+
+
+def _trigrams(token: str) -> frozenset[str]:
+    """Return the padded trigrams of a name token."""
+    padded = f"  {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class StopIndex:
+    """In-memory index of stop records for offline station lookup.
+
+    Every token of every stop name goes into a sorted list, so a prefix
+    lookup is a binary search (a flattened trie). Typo-tolerant matching
+    works on the vocabulary of distinct tokens: trigram posting lists find
+    the tokens similar to a query token, and token posting lists, sorted
+    by the length of the stop names, the stops using them.
+
+    seeded is True when the index was built from a full stop list; only
+    then does a stop missing from it not exist.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.seeded = False
+        self._stops: list[dict] = []
+        self._refs: dict[str, int] = {}
+        self._tokens: list[tuple[str, int]] = []
+        self._stop_tokens: list[tuple[str, ...]] = []
+        self._stop_weights: list[int] = []
+        self._token_stops: dict[str, list[int]] = {}
+        self._vocabulary: list[str] = []
+        self._unsorted_tokens: set[str] = set()
+        self._token_trigrams: dict[str, frozenset[str]] = {}
+        self._trigram_tokens: dict[str, list[str]] = {}
+        self._sorted = True
+
+    def __len__(self) -> int:
+        """Return the number of indexed stops."""
+        return len(self._stops)
+
+    def add(self, station: dict) -> None:
+        """Index a stop record, ignoring stop points already known."""
+        stop_point_ref = station['stop_point_ref']
+        if stop_point_ref in self._refs:
+            return
+
+        stop_id = len(self._stops)
+        self._stops.append(station)
+        self._refs[stop_point_ref] = stop_id
+
+        tokens = tuple(set(_tokens(station['display_name'])))
+        self._stop_tokens.append(tokens)
+        self._stop_weights.append(sum(len(token) for token in tokens))
+        for token in tokens:
+            self._tokens.append((token, stop_id))
+            if (stops := self._token_stops.get(token)) is None:
+                stops = self._token_stops[token] = []
+                trigrams = self._token_trigrams[token] = _trigrams(token)
+                for trigram in trigrams:
+                    self._trigram_tokens.setdefault(trigram, []).append(token)
+            stops.append(stop_id)
+            self._unsorted_tokens.add(token)
+        self._sorted = False
+
+    def add_all(self, stations: Iterable[dict]) -> None:
+        """Index several stop records."""
+        for station in stations:
+            self.add(station)
+
+    def sort_tokens(self) -> None:
+        """Sort the token lists after stops were added."""
+        if not self._sorted:
+            self._tokens.sort()
+            self._vocabulary = sorted(self._token_stops)
+            for token in self._unsorted_tokens:
+                self._token_stops[token].sort(key=self._stop_weights.__getitem__)
+            self._unsorted_tokens.clear()
+            self._sorted = True
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Return stops matching all query tokens by prefix, then by similarity."""
+        results = self.search_prefix(query, limit)
+        if len(results) < limit:
+            results.extend(self.search_similar(query, limit - len(results), results))
+        return results
+
+    def _prefix_range(self, query_token: str) -> tuple[int, int]:
+        """Return where the tokens starting with query_token are in the token list."""
+        low = bisect_left(self._tokens, (query_token, -1))
+        high = bisect_left(self._tokens, (query_token + "\uffff", -1))
+        return low, high
+
+    def search_prefix(self, query: str, limit: int = 10) -> list[dict]:
+        """Return stops with a name token starting with every query token.
+
+        Shorter names, which match the query more closely, come first.
+        """
+        self.sort_tokens()
+
+        query_tokens = _tokens(query)
+        if not query_tokens:
+            return []
+
+        # Intersect the stops of every query token, most selective first
+        ranges = [self._prefix_range(query_token) for query_token in query_tokens]
+        ranges.sort(key=lambda bounds: bounds[1] - bounds[0])
+        candidates: set[int] | None = None
+        for low, high in ranges:
+            stops = {stop_id for _token, stop_id in self._tokens[low:high]}
+            candidates = stops if candidates is None else candidates & stops
+            if not candidates:
+                return []
+
+        results = heapq.nsmallest(
+            limit, candidates, key=lambda stop_id: len(self._stops[stop_id]['display_name'])
+        )
+        return [self._stops[stop_id] for stop_id in results]
+
+    def _similar_tokens(self, query_token: str) -> dict[str, float]:
+        """Return the indexed tokens similar to a query token and their similarity.
+
+        Tokens starting with the query token are a full match; the others
+        are scored by trigram similarity (Jaccard).
+        """
+        low = bisect_left(self._vocabulary, query_token)
+        high = bisect_left(self._vocabulary, query_token + "\uffff")
+        similar = dict.fromkeys(self._vocabulary[low:high], 1.0)
+
+        query_trigrams = _trigrams(query_token)
+        shared: Counter[str] = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._trigram_tokens.get(trigram, ()))
+        for token, count in shared.items():
+            if token in similar:
+                continue
+            similarity = count / (
+                len(query_trigrams) + len(self._token_trigrams[token]) - count
+            )
+            if similarity >= STOP_INDEX_MIN_SIMILARITY:
+                similar[token] = similarity
+        return similar
+
+    def search_similar(
+        self, query: str, limit: int = 10, exclude: Iterable[dict] = ()
+    ) -> list[dict]:
+        """Return stops with a name similar to the query, most similar first.
+
+        Names are compared token by token, each token counting with its
+        length: the matched length, with typos counting as partial matches,
+        over the length of query and name together less the matched length
+        (a weighted Jaccard index). A stop needs STOP_INDEX_MIN_SIMILARITY.
+
+        The query tokens with the fewest stops are looked at first. A stop
+        first found through the remaining tokens can only reach the
+        threshold if its name is short enough, so only the shortest names
+        of long posting lists are read, and stops that can no longer reach
+        it are dropped.
+        """
+        self.sort_tokens()
+
+        query_tokens = list(dict.fromkeys(_tokens(query)))
+        if not query_tokens:
+            return []
+
+        matches = []
+        for query_token in query_tokens:
+            similar = self._similar_tokens(query_token)
+            stops = sum(len(self._token_stops[token]) for token in similar)
+            matches.append((stops, len(query_token), similar))
+        matches.sort(key=lambda match: match[0])
+
+        threshold = STOP_INDEX_MIN_SIMILARITY
+        query_weight = remaining = sum(weight for _stops, weight, _similar in matches)
+        stop_weights = self._stop_weights
+        matched: dict[int, float] = {}
+        for _stops, weight, similar in matches:
+            # Drop stops that cannot reach the threshold even if all
+            # remaining tokens match, then credit the others
+            matched = {
+                stop_id: score
+                for stop_id, score in matched.items()
+                if (score + remaining) * (1 + threshold)
+                >= threshold * (query_weight + stop_weights[stop_id])
+            }
+            for stop_id in matched:
+                best = 0.0
+                for token in self._stop_tokens[stop_id]:
+                    if (similarity := similar.get(token, 0.0)) > best:
+                        best = similarity
+                matched[stop_id] += weight * best
+
+            # New stops match at most the remaining length
+            longest = remaining * (1 + threshold) / threshold - query_weight
+            found: dict[int, float] = {}
+            for token, similarity in similar.items():
+                postings = self._token_stops[token]
+                end = bisect_right(postings, longest, key=stop_weights.__getitem__)
+                for stop_id in postings[:end]:
+                    if stop_id not in matched and similarity > found.get(stop_id, 0.0):
+                        found[stop_id] = similarity
+            for stop_id, similarity in found.items():
+                matched[stop_id] = weight * similarity
+            remaining -= weight
+
+        skip = {self._refs.get(station['stop_point_ref']) for station in exclude}
+        scored = []
+        for stop_id, score in matched.items():
+            similarity = score / (query_weight + stop_weights[stop_id] - score)
+            if similarity >= threshold and stop_id not in skip:
+                scored.append((-similarity, stop_weights[stop_id], stop_id))
+        return [self._stops[stop_id] for _score, _weight, stop_id in heapq.nsmallest(limit, scored)]
+
+
+def load_gtfs_stops(path: str) -> list[dict]:
+    """Read stop records from a GTFS stops.txt file."""
+    stations = []
+    with open(path, encoding="utf-8-sig", newline="") as stops_file:
+        for row in csv.DictReader(stops_file):
+            stop_id = row.get("stop_id")
+            stop_name = row.get("stop_name")
+            if stop_id and stop_name:
+                stations.append({
+                    'stop_point_ref': stop_id,
+                    'stop_point_name': stop_name,
+                    'location_name': None,
+                    'display_name': stop_name
+                })
+    return stations
+
+
+def _build_index(path: str, stations: list[dict]) -> StopIndex:
+    """Build the stop index from a stop list file (if present) and known stations."""
+    index = StopIndex()
+    if os.path.isfile(path):
+        try:
+            index.add_all(load_gtfs_stops(path))
+            index.seeded = len(index) > 0
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            _LOGGER.error(f"Error reading stop list {path}: {e}")
+    index.add_all(stations)
+    index.sort_tokens()
+    return index
+
+
+async def async_get_stop_index(hass: HomeAssistant) -> StopIndex:
+    """Return the stop index, building it on first use.
+
+    The index is seeded from an optional GTFS stops.txt named
+    STOP_INDEX_FILE in the config directory and from all station searches
+    remembered in the station cache. It is built in the executor.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    lock = domain_data.setdefault(DATA_STOP_INDEX_LOCK, asyncio.Lock())
+
+    async with lock:
+        if DATA_STOP_INDEX not in domain_data:
+            stations = await async_get_station_cache(hass).async_all_stations()
+            index = await hass.async_add_executor_job(
+                _build_index, hass.config.path(STOP_INDEX_FILE), stations
+            )
+            _LOGGER.debug(f"Stop index built with {len(index)} stops")
+            domain_data[DATA_STOP_INDEX] = index
+
+    return domain_data[DATA_STOP_INDEX]
+
+
+@callback
+def async_harvest_stations(hass: HomeAssistant, stations: list[dict]) -> None:
+    """Add stations found by a live search to the index, if it is built."""
+    if (index := hass.data.get(DOMAIN, {}).get(DATA_STOP_INDEX)) is not None:
+        index.add_all(stations)
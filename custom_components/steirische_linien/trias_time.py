@@ -0,0 +1,47 @@
+"""Timestamp handling shared by the TRIAS requests and parsers."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from .const import LOCAL_TIMEZONE
+
+# The Styrian network runs on Vienna time, whatever the host is set to
+LOCAL_ZONE = ZoneInfo(LOCAL_TIMEZONE)
+
+
+def utcnow() -> datetime:
+    """Return the current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+@lru_cache(maxsize=512)
+def parse_trias_time(value: str) -> datetime:
+    """Parse a TRIAS timestamp into an aware datetime.
+
+    fromisoformat reads the YYYY-MM-DDTHH:MM:SSZ form TRIAS sends directly
+    (Python 3.11+), without rewriting the Z suffix first; times without an
+    offset are taken as UTC. Departures of one response share many
+    timestamps, so parsed values are cached. Raises ValueError if the value
+    is not a timestamp.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def format_trias_time(value: datetime) -> str:
+    """Format an aware datetime the way TRIAS does, in UTC with a Z suffix."""
+    value = value.astimezone(timezone.utc)
+    return (
+        f"{value.year:04d}-{value.month:02d}-{value.day:02d}"
+        f"T{value.hour:02d}:{value.minute:02d}:{value.second:02d}Z"
+    )
+
+
+def format_local_time(value: datetime) -> str:
+    """Format an aware datetime as HH:MM local time."""
+    value = value.astimezone(LOCAL_ZONE)
+    return f"{value.hour:02d}:{value.minute:02d}"
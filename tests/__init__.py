@@ -0,0 +1 @@
+"""Tests for the Powerhaus - Steirische Öffis integration."""
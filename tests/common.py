@@ -0,0 +1,124 @@
+"""Helpers running the integration on a bare Home Assistant core object."""
+from __future__ import annotations
+
+import logging
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity, entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from custom_components.steirische_linien import sensor
+from custom_components.steirische_linien.api import (
+    async_close_sessions,
+    async_set_connection_limit,
+)
+from custom_components.steirische_linien.const import (
+    CONF_API_URL,
+    CONF_CONNECTION_LIMIT,
+    CONF_MODE,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_STOP_POINT_REF,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DOMAIN,
+    MODE_STATION,
+)
+from custom_components.steirische_linien.scheduler import DATA_SCHEDULER, PollScheduler
+
+
+@asynccontextmanager
+async def async_hass(config_dir: str | None = None) -> AsyncIterator[HomeAssistant]:
+    """Yield a Home Assistant core object that is not started.
+
+    It has the integration's scheduler and, unless config_dir is given, a
+    config directory of its own; the connection pools are closed and
+    pending saves flushed afterwards.
+    """
+    hass = HomeAssistant(config_dir or tempfile.mkdtemp())
+    hass.data.setdefault(DOMAIN, {})[DATA_SCHEDULER] = PollScheduler(hass)
+    try:
+        yield hass
+    finally:
+        await async_close_sessions(hass)
+        await hass.async_stop(force=True)
+
+
+def station_entry(
+    index: int, api_url: str, options: dict[str, Any] | None = None, **data: Any
+) -> ConfigEntry:
+    """Return the config entry of the index-th synthetic station."""
+    return ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=f"Station {index}",
+        data={
+            CONF_MODE: MODE_STATION,
+            CONF_API_URL: api_url,
+            CONF_STOP_POINT_REF: f"at:46:{4000 + index}",
+            **data,
+        },
+        options=options or {},
+        source="user",
+        entry_id=f"entry_{index}",
+    )
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> list:
+    """Set up an entry like the integration does and return its entities.
+
+    Mirrors async_setup_entry in __init__.py without forwarding to the
+    sensor platform through the config entries manager.
+    """
+    scheduler: PollScheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+    api_url = entry.data[CONF_API_URL]
+    entry.async_on_unload(
+        scheduler.async_set_budget(
+            entry.entry_id,
+            api_url,
+            entry.options.get(CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE),
+        )
+    )
+    entry.async_on_unload(
+        async_set_connection_limit(
+            hass,
+            entry.entry_id,
+            api_url,
+            entry.options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+        )
+    )
+
+    entities: list = []
+    await sensor.async_setup_entry(
+        hass, entry, lambda new_entities, *args: entities.extend(new_entities)
+    )
+    return entities
+
+
+def coordinator_of(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the coordinator of a set up entry."""
+    return hass.data[DOMAIN][sensor.DATA_COORDINATORS][entry.entry_id]
+
+
+async def async_add_to_platform(hass: HomeAssistant, entities: list) -> EntityPlatform:
+    """Add entities to a sensor platform of the integration, writing their state."""
+    # What bootstrap sets up before platforms add entities
+    entity.async_setup(hass)
+    await er.async_load(hass)
+    platform = EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=sensor.SCAN_INTERVAL,
+        entity_namespace=None,
+    )
+    await platform.async_add_entities(entities)
+    await hass.async_block_till_done()
+    return platform
@@ -0,0 +1,135 @@
+"""Replay a recorded service day against fixed and adaptive polling."""
+from __future__ import annotations
+
+import statistics
+from datetime import datetime, timedelta, timezone
+
+from custom_components.steirische_linien.const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_API_URL,
+    CONF_MODE,
+    CONF_STOP_POINT_REF,
+    DEFAULT_MIN_INTERVAL,
+    IMMINENT_DEPARTURE,
+    MODE_STATION,
+)
+from custom_components.steirische_linien.models import Departure
+from custom_components.steirische_linien.sensor import (
+    SteirischeLinienDataUpdateCoordinator,
+)
+
+from .common import async_hass
+
+DAY = datetime(2024, 6, 3, tzinfo=timezone.utc)
+FIXED_INTERVAL = timedelta(minutes=1)
+# Live times are published this long before a departure
+LIVE_WINDOW = timedelta(minutes=30)
+RESULTS = 10
+SAMPLE = timedelta(seconds=10)
+
+
+def _timetable() -> list[tuple[datetime, int]]:
+    """Return the departures of the day with their final delay in minutes.
+
+    Trams run every 15 minutes from 05:00 to 23:30 and every 7.5 minutes
+    in the morning and evening rush hours.
+    """
+    departures = []
+    at = DAY + timedelta(hours=5)
+    while at <= DAY + timedelta(hours=23, minutes=30):
+        departures.append((at, (0, 1, 2, 4)[len(departures) % 4]))
+        rush = 6 <= at.hour < 9 or 16 <= at.hour < 19
+        at += timedelta(minutes=7.5 if rush else 15)
+    return departures
+
+
+TIMETABLE = _timetable()
+
+
+def _estimate(scheduled: datetime, delay: int, now: datetime) -> datetime | None:
+    """Return the live time published at `now`; the delay builds up over time."""
+    if now < scheduled - LIVE_WINDOW:
+        return None
+    progress = min((now - (scheduled - LIVE_WINDOW)) / LIVE_WINDOW, 1)
+    return scheduled + timedelta(minutes=round(delay * progress))
+
+
+def _response(now: datetime) -> list[Departure]:
+    """Return the departures the API answered with at `now`."""
+    departures = []
+    for scheduled, delay in TIMETABLE:
+        estimated = _estimate(scheduled, delay, now)
+        if (estimated or scheduled) >= now:
+            departures.append(Departure("6", "St. Peter", scheduled, estimated))
+            if len(departures) == RESULTS:
+                break
+    return departures
+
+
+def _replay(coordinator: SteirischeLinienDataUpdateCoordinator, adaptive: bool) -> dict:
+    """Poll through the day and report requests against staleness.
+
+    Every SAMPLE the departure shown first is compared with what the API
+    would answer right then. Staleness counts the age of the shown data
+    while a departure is imminent and how far off the shown time is.
+    """
+    polls = []
+    shown: list[tuple[datetime, list[Departure]]] = []
+    now = DAY
+    while now < DAY + timedelta(days=1):
+        departures = _response(now)
+        polls.append(now)
+        shown.append((now, departures))
+        interval = (
+            coordinator._adaptive_interval(departures, now) if adaptive else FIXED_INTERVAL
+        )
+        coordinator.data = departures
+        now += interval
+
+    ages: list[float] = []
+    errors: list[float] = []
+    current = 0
+    sample = DAY
+    while sample < DAY + timedelta(days=1):
+        while current + 1 < len(shown) and shown[current + 1][0] <= sample:
+            current += 1
+        polled, departures = shown[current]
+        truth = _response(sample)
+        if truth and truth[0].departure - sample <= timedelta(seconds=IMMINENT_DEPARTURE):
+            ages.append((sample - polled).total_seconds())
+            upcoming = [departure for departure in departures if departure.departure >= sample]
+            if upcoming:
+                errors.append(abs((upcoming[0].departure - truth[0].departure).total_seconds()))
+            else:
+                errors.append(IMMINENT_DEPARTURE)
+        sample += SAMPLE
+
+    return {
+        "requests": len(polls),
+        "imminent_age_mean_s": round(statistics.mean(ages), 1),
+        "imminent_age_max_s": round(max(ages), 1),
+        "imminent_error_mean_s": round(statistics.mean(errors), 1),
+    }
+
+
+async def test_adaptive_polling_replay() -> None:
+    """Adaptive polling needs far fewer requests for similar staleness."""
+    async with async_hass() as hass:
+        coordinator = SteirischeLinienDataUpdateCoordinator(
+            hass,
+            {
+                CONF_MODE: MODE_STATION,
+                CONF_API_URL: "http://127.0.0.1:1/trias",
+                CONF_STOP_POINT_REF: "at:46:4000",
+                CONF_ADAPTIVE_POLLING: True,
+            },
+        )
+        fixed = _replay(coordinator, adaptive=False)
+        coordinator.data = None
+        adaptive = _replay(coordinator, adaptive=True)
+
+    results = f"fixed: {fixed}, adaptive: {adaptive}"
+    assert adaptive["requests"] < 0.6 * fixed["requests"], results
+    # Imminent departures are polled every DEFAULT_MIN_INTERVAL
+    assert adaptive["imminent_age_mean_s"] <= 2 * DEFAULT_MIN_INTERVAL, results
+    assert adaptive["imminent_error_mean_s"] <= fixed["imminent_error_mean_s"] + 30, results
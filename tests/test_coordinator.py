@@ -0,0 +1,169 @@
+"""Tests of the coordinators' requests, parsing and merging."""
+from __future__ import annotations
+
+import zlib
+
+import pytest
+
+from benchmarks.mock_server import MockTriasServer
+from custom_components.steirische_linien import api, registry
+from custom_components.steirische_linien.const import (
+    CONF_API_URL,
+    CONF_DEST_LAT,
+    CONF_DEST_LON,
+    CONF_DESTINATION_PATTERN,
+    CONF_LINE_FILTER_MODE,
+    CONF_LINES,
+    CONF_MIN_MINUTES,
+    CONF_MODE,
+    CONF_ORIGIN_LAT,
+    CONF_ORIGIN_LON,
+    CONF_PARSER_MODE,
+    CONF_PLATFORMS,
+    CONF_STOP_POINT_REF,
+    CONF_STOP_POINTS,
+    DOMAIN,
+    FILTERED_RESULTS_FACTOR,
+    LINE_FILTER_EXCLUDE,
+    MAX_NUMBER_OF_RESULTS,
+    MODE_NEARBY,
+    MODE_STATION,
+    MODE_TRIP,
+    PARSER_STREAMING,
+    PARSER_TREE,
+)
+from custom_components.steirische_linien.scheduler import DATA_SCHEDULER
+from custom_components.steirische_linien.sensor import (
+    NearbyStopsDataUpdateCoordinator,
+    SteirischeLinienDataUpdateCoordinator,
+)
+
+from .common import async_hass
+
+API_URL = "http://127.0.0.1:1/trias"
+TRIP = {
+    CONF_MODE: MODE_TRIP,
+    CONF_ORIGIN_LAT: 47.0707,
+    CONF_ORIGIN_LON: 15.4395,
+    CONF_DEST_LAT: 47.0766,
+    CONF_DEST_LON: 15.4152,
+}
+
+
+def _fixture_stop(stop_point_ref: str) -> int:
+    """Return which departures the mock server answers a stop point with."""
+    return zlib.crc32(stop_point_ref.encode()) % 97
+
+
+def _stop_points(count: int) -> list[dict]:
+    """Return stop points with their own departures, the last sharing the first's.
+
+    Nearby stops often see the same departures, e.g. two platforms of
+    one stop; with more than one stop point the last one does.
+    """
+    refs = [f"at:46:{4000 + index}" for index in range(count)]
+    if count > 1:
+        first = _fixture_stop(refs[0])
+        refs[-1] = next(
+            ref
+            for index in range(5000, 10000)
+            if _fixture_stop(ref := f"at:46:{index}") == first
+        )
+    return [{'stop_point_ref': ref, 'stop_point_name': ref} for ref in refs]
+
+
+def _coordinator(hass, **config) -> SteirischeLinienDataUpdateCoordinator:
+    """Return a coordinator of a station entry with extra config."""
+    return SteirischeLinienDataUpdateCoordinator(
+        hass,
+        {
+            CONF_MODE: MODE_STATION,
+            CONF_API_URL: API_URL,
+            CONF_STOP_POINT_REF: "at:46:4000",
+            **config,
+        },
+    )
+
+
+async def test_automatic_parser_mode() -> None:
+    """Only unfiltered stop events are streamed by default."""
+    async with async_hass() as hass:
+        assert _coordinator(hass)._parser_mode(True) == PARSER_STREAMING
+        assert _coordinator(hass, **{CONF_LINES: "6"})._parser_mode(True) == PARSER_TREE
+        assert _coordinator(hass, **TRIP)._parser_mode(False) == PARSER_TREE
+
+
+async def test_configured_parser_mode() -> None:
+    """A configured parser is used for every response."""
+    async with async_hass() as hass:
+        streaming = _coordinator(hass, **{CONF_PARSER_MODE: PARSER_STREAMING, CONF_LINES: "6"})
+        assert streaming._parser_mode(False) == PARSER_STREAMING
+        tree = _coordinator(hass, **{CONF_PARSER_MODE: PARSER_TREE})
+        assert tree._parser_mode(True) == PARSER_TREE
+
+
+async def test_filtered_number_of_results() -> None:
+    """Only filters keeping some lines, destinations or platforms ask for more results."""
+    async with async_hass() as hass:
+        assert _coordinator(hass)._number_of_results(10) == 10
+        for selective in (
+            {CONF_LINES: "6"},
+            {CONF_DESTINATION_PATTERN: "St\\. Peter"},
+            {CONF_PLATFORMS: "A"},
+            {CONF_LINES: "6", CONF_LINE_FILTER_MODE: LINE_FILTER_EXCLUDE, CONF_PLATFORMS: "A"},
+        ):
+            coordinator = _coordinator(hass, **selective)
+            assert coordinator._number_of_results(10) == 10 * FILTERED_RESULTS_FACTOR
+            assert coordinator._number_of_results(40) == MAX_NUMBER_OF_RESULTS
+        for few_dropped in (
+            {CONF_LINES: "6", CONF_LINE_FILTER_MODE: LINE_FILTER_EXCLUDE},
+            {CONF_MIN_MINUTES: 5},
+        ):
+            assert _coordinator(hass, **few_dropped)._number_of_results(10) == 10
+
+
+@pytest.mark.parametrize("stops", [1, 5, 20])
+async def test_nearby_stops_are_merged(monkeypatch: pytest.MonkeyPatch, stops: int) -> None:
+    """The stops' departures are merged in order without duplicates.
+
+    A stop whose request fails keeps its previous departures.
+    """
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(registry, "SHARED_RESULT_MAX_AGE", 0)
+    async with MockTriasServer() as server, async_hass() as hass:
+        hass.data[DOMAIN][DATA_SCHEDULER].async_set_budget("test", server.url, 600000)
+        stop_points = _stop_points(stops)
+        coordinator = NearbyStopsDataUpdateCoordinator(
+            hass,
+            {CONF_MODE: MODE_NEARBY, CONF_API_URL: server.url, CONF_STOP_POINTS: stop_points},
+        )
+        await coordinator.async_refresh()
+        departures = coordinator.data
+        assert server.requests == stops
+
+        times = [departure.departure for departure in departures]
+        assert times == sorted(times)
+        keys = [departure.key for departure in departures]
+        assert len(set(keys)) == len(keys)
+        refs = [stop_point['stop_point_ref'] for stop_point in stop_points]
+        fetched = {ref: coordinator._query.payloads[ref][1] for ref in refs}
+        by_key = {
+            departure.key: departure for stop in fetched.values() for departure in stop
+        }
+        if stops > 1:
+            assert len(by_key) < sum(len(stop) for stop in fetched.values())
+        expected = sorted(by_key.values(), key=lambda departure: departure.departure)
+        assert set(keys) == {departure.key for departure in expected[:coordinator._fetch_limit]}
+
+        # A stop whose departures no other stop has fails
+        failing = next(
+            ref
+            for departure in departures
+            for ref in (refs if stops == 1 else refs[1:-1])
+            if departure in fetched[ref]
+        )
+        server.failing = {f"<StopPointRef>{failing}</StopPointRef>".encode()}
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert [departure.key for departure in coordinator.data] == keys
+        assert server.requests == 2 * stops
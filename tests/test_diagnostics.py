@@ -0,0 +1,69 @@
+"""Tests of the diagnostics download."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from custom_components.steirische_linien.const import (
+    CONF_COLLECT_METRICS,
+    CONF_DEST_LAT,
+    CONF_DEST_LON,
+    CONF_MODE,
+    CONF_ORIGIN_LAT,
+    CONF_ORIGIN_LON,
+    CONF_ROUTE_NAME,
+    CONF_ROUTES,
+    MODE_MULTI_TRIP,
+)
+from custom_components.steirische_linien.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.steirische_linien.models import Departure
+from custom_components.steirische_linien.sensor import METRIC_SENSORS, FetchMetricsSensor
+from custom_components.steirische_linien.trias_time import utcnow
+
+from .common import async_hass, async_setup_entry, coordinator_of, station_entry
+
+API_URL = "http://127.0.0.1:1/trias"
+
+
+def _route(name: str, offset: float) -> dict:
+    """Return a route of a multi-trip entry."""
+    return {
+        CONF_ROUTE_NAME: name,
+        CONF_ORIGIN_LAT: 47.0707 + offset,
+        CONF_ORIGIN_LON: 15.4395,
+        CONF_DEST_LAT: 47.0766,
+        CONF_DEST_LON: 15.4152,
+    }
+
+
+def _departures(count: int) -> list[Departure]:
+    """Return upcoming departures."""
+    now = utcnow()
+    return [
+        Departure("6", "St. Peter", now + timedelta(minutes=5 * (index + 1)), None)
+        for index in range(count)
+    ]
+
+
+async def test_departures_of_all_routes() -> None:
+    """A multi-trip entry reports the upcoming departures of every route."""
+    async with async_hass() as hass:
+        entry = station_entry(
+            0,
+            API_URL,
+            {CONF_COLLECT_METRICS: True},
+            **{CONF_MODE: MODE_MULTI_TRIP, CONF_ROUTES: [_route("Work", 0), _route("School", 0.01)]},
+        )
+        entities = await async_setup_entry(hass, entry)
+        coordinator = coordinator_of(hass, entry)
+        coordinator.async_set_updated_data({"Work": _departures(3), "School": _departures(2)})
+
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+        assert diagnostics["coordinator"]["departures"] == 5
+        assert diagnostics["metrics"] is not None
+        # Metric sensors leave the full metrics to diagnostics
+        metric_sensors = [entity for entity in entities if isinstance(entity, FetchMetricsSensor)]
+        assert len(metric_sensors) == len(METRIC_SENSORS)
+        assert all(entity.extra_state_attributes is None for entity in metric_sensors)
+        await entry._async_process_on_unload(hass)
@@ -0,0 +1,81 @@
+"""Tests of the Departure record."""
+from __future__ import annotations
+
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from custom_components.steirische_linien.models import Departure
+from custom_components.steirische_linien.trias_time import format_trias_time
+
+RECORDS = 1000
+START = datetime(2024, 6, 3, 7, 0, tzinfo=timezone.utc)
+
+
+def _allocated(build: Callable[[], object]) -> tuple[int, object]:
+    """Return the bytes still allocated after build() and what it returned."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def _times(index: int) -> tuple[datetime, datetime]:
+    """Return the timetabled and live time of the index-th departure."""
+    scheduled = START + timedelta(minutes=index)
+    return scheduled, scheduled + timedelta(minutes=index % 3)
+
+
+def _departures() -> list[Departure]:
+    """Build departure records."""
+    return [Departure("6", "St. Peter", *_times(index)) for index in range(RECORDS)]
+
+
+def _dicts() -> list[dict]:
+    """Build the dicts the parsers returned before the Departure record."""
+    departures = []
+    for index in range(RECORDS):
+        scheduled, estimated = _times(index)
+        departures.append({
+            "line": "6",
+            "destination": "St. Peter",
+            "scheduled_departure_time": format_trias_time(scheduled),
+            "live_departure_time": format_trias_time(estimated),
+            "minutes": index,
+            "time": estimated.strftime("%H:%M"),
+            "is_delayed": estimated > scheduled,
+            "is_scheduled": False,
+        })
+    return departures
+
+
+def test_records_allocate_less_than_dicts() -> None:
+    """A slotted record with parsed times takes less memory than the old dict."""
+    records, departures = _allocated(_departures)
+    dicts, _ = _allocated(_dicts)
+
+    assert len(departures) == RECORDS
+    assert records < 0.6 * dicts
+
+
+def test_attributes_are_rendered_once() -> None:
+    """Reading the attributes again, as every state write does, allocates nothing."""
+    departures = _departures()
+    first, _ = _allocated(lambda: [departure.attributes for departure in departures])
+    again, attributes = _allocated(lambda: [departure.attributes for departure in departures])
+
+    assert attributes[0] is departures[0].attributes
+    # Only the list holding the results is new
+    assert again < first / 10
+    assert again < RECORDS * 16
+
+
+def test_round_trip() -> None:
+    """as_dict data recreates an equal departure."""
+    departure = Departure("6", "St. Peter", *_times(1))
+    assert Departure.from_dict(departure.as_dict()) == departure
+    scheduled_only = Departure(None, None, START, None)
+    assert Departure.from_dict(scheduled_only.as_dict()) == scheduled_only
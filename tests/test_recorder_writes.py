@@ -0,0 +1,198 @@
+"""Count the recorder writes of the departure sensors over a simulated day."""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
+
+from custom_components.steirische_linien import sensor
+from custom_components.steirische_linien.const import (
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_UNRECORDED_VOLATILE,
+)
+from custom_components.steirische_linien.models import Departure
+from custom_components.steirische_linien.scheduler import PollScheduler
+
+from .common import (
+    async_add_to_platform,
+    async_hass,
+    async_setup_entry,
+    coordinator_of,
+    station_entry,
+)
+
+DAY = datetime(2024, 6, 3, tzinfo=timezone.utc)
+# Four lines, each every 10 minutes: a departure every 2.5 minutes
+LINES = (("1", "Eggenberg"), ("4", "Liebenau"), ("6", "St. Peter"), ("7", "LKH"))
+HEADWAY = timedelta(minutes=10)
+# Live times are published this long before a departure
+LIVE_WINDOW = timedelta(minutes=30)
+RESULTS = 10
+
+
+class _Clock:
+    """Simulated wall clock, monotonic clock and async_call_later."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.now = DAY
+        self._pending: list[tuple[datetime, int, object]] = []
+
+    def utcnow(self) -> datetime:
+        """Return the simulated time."""
+        return self.now
+
+    def monotonic(self) -> float:
+        """Return the simulated time in seconds."""
+        return (self.now - DAY).total_seconds()
+
+    def call_later(self, hass: HomeAssistant, delay: float, action) -> callable:
+        """Schedule action at the simulated time delay seconds from now."""
+        entry = (self.now + timedelta(seconds=delay), len(self._pending), action)
+        self._pending.append(entry)
+        return lambda: self._pending.remove(entry) if entry in self._pending else None
+
+    def advance(self, to: datetime) -> None:
+        """Run the scheduled actions due until `to`, then move there."""
+        while self._pending and (due := min(self._pending))[0] <= to:
+            self._pending.remove(due)
+            self.now = due[0]
+            due[2](self.now)
+        self.now = to
+
+
+def _timetable() -> list[tuple[datetime, str, str, int]]:
+    """Return the departures of the day with their final delay in minutes."""
+    departures = []
+    for offset, (line, destination) in enumerate(LINES):
+        at = DAY + timedelta(hours=5, minutes=2.5 * offset)
+        while at < DAY + timedelta(hours=24):
+            departures.append((at, line, destination, (0, 1, 3, 2, 0, 5)[len(departures) % 6]))
+            at += HEADWAY
+    departures.sort()
+    return departures
+
+
+TIMETABLE = _timetable()
+
+
+def _response(now: datetime) -> list[Departure]:
+    """Return the departures the API answered with at `now`."""
+    departures = []
+    for scheduled, line, destination, delay in TIMETABLE:
+        estimated = None
+        if now >= scheduled - LIVE_WINDOW:
+            progress = min((now - (scheduled - LIVE_WINDOW)) / LIVE_WINDOW, 1)
+            estimated = scheduled + timedelta(minutes=round(delay * progress))
+        if (estimated or scheduled) >= now:
+            departures.append(Departure(line, destination, scheduled, estimated))
+            if len(departures) == RESULTS:
+                break
+    return departures
+
+
+async def _replay(
+    hass: HomeAssistant, clock: _Clock, options: dict
+) -> dict[str, list[int]]:
+    """Run one entry's departure sensors through the day.
+
+    The coordinator gets fresh departures every poll interval and the
+    sensors count down every LOCAL_UPDATE_INTERVAL, on the simulated clock.
+    For every state change, one states row is counted and an attributes
+    row when its recorded attributes were not written before, like the
+    recorder's shared attributes.
+    """
+    entry = station_entry(0, "http://127.0.0.1:1/trias", options)
+    entities = await async_setup_entry(hass, entry)
+    platform = await async_add_to_platform(hass, entities)
+    coordinator = coordinator_of(hass, entry)
+
+    states = [0] * 24
+    attribute_rows = [0] * 24
+    shared_attributes: set[bytes] = set()
+
+    @callback
+    def _async_record(event: Event) -> None:
+        state = event.data["new_state"]
+        states[clock.now.hour] += 1
+        unrecorded = (state.state_info or {}).get("unrecorded_attributes", ())
+        shared = json_bytes(
+            {key: value for key, value in state.attributes.items() if key not in unrecorded}
+        )
+        if shared not in shared_attributes:
+            shared_attributes.add(shared)
+            attribute_rows[clock.now.hour] += 1
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _async_record)
+    poll = DAY
+    tick = DAY
+    while tick < DAY + timedelta(days=1):
+        clock.advance(tick)
+        if tick >= poll:
+            coordinator.async_set_updated_data(_response(tick))
+            poll += coordinator.poll_interval
+        for departure_sensor in entities:
+            departure_sensor._async_countdown(tick)
+        # Lets the listener count this tick's state changes
+        await hass.async_block_till_done()
+        tick += sensor.LOCAL_UPDATE_INTERVAL
+    unsub()
+
+    await platform.async_reset()
+    await entry._async_process_on_unload(hass)
+    return {"states": states, "attribute_rows": attribute_rows}
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    """Run the sensors on a simulated clock."""
+    clock = _Clock()
+    monkeypatch.setattr(sensor, "dt_util", SimpleNamespace(utcnow=clock.utcnow))
+    monkeypatch.setattr(
+        sensor, "time", SimpleNamespace(monotonic=clock.monotonic, perf_counter=time.perf_counter)
+    )
+    monkeypatch.setattr(sensor, "async_call_later", clock.call_later)
+    # The replay hands the coordinator its departures; nothing is polled
+    monkeypatch.setattr(
+        PollScheduler, "async_register", lambda self, coordinator, window: lambda: None
+    )
+    return clock
+
+
+async def test_recorder_writes_per_hour(clock: _Clock) -> None:
+    """Unrecorded volatile attributes and the write throttle cut recorder writes."""
+    scenarios = {
+        "default": {},
+        "unrecorded": {CONF_UNRECORDED_VOLATILE: True},
+        "throttled_1_min": {CONF_UNRECORDED_VOLATILE: True, CONF_MIN_WRITE_INTERVAL: 60},
+        "throttled_5_min": {CONF_UNRECORDED_VOLATILE: True, CONF_MIN_WRITE_INTERVAL: 300},
+    }
+    results = {}
+    for name, options in scenarios.items():
+        clock.now = DAY
+        async with async_hass() as hass:
+            results[name] = await _replay(hass, clock, options)
+
+    noon = 12
+    counts = "; ".join(
+        f"{name}: {sum(result['states'])} states and "
+        f"{sum(result['attribute_rows'])} attribute rows per day, "
+        f"{result['states'][noon]} and {result['attribute_rows'][noon]} from 12:00 to 13:00"
+        for name, result in results.items()
+    )
+
+    default, unrecorded, throttled_1_min, throttled_5_min = results.values()
+    # Live and timetabled times change with every departure
+    assert default["attribute_rows"][noon] > 100, counts
+    # Unrecorded, they leave few combinations of attributes, all seen by noon
+    assert sum(unrecorded["states"]) == sum(default["states"]), counts
+    assert sum(unrecorded["attribute_rows"]) < 0.05 * sum(default["attribute_rows"]), counts
+    assert unrecorded["attribute_rows"][noon] == 0, counts
+    # Countdowns tick once a minute, so only a longer interval saves much
+    assert sum(throttled_1_min["states"]) <= sum(unrecorded["states"]), counts
+    assert sum(throttled_5_min["states"]) < 0.5 * sum(unrecorded["states"]), counts
@@ -0,0 +1,69 @@
+"""Tests of the upstream queries shared between entries."""
+from __future__ import annotations
+
+import asyncio
+
+from benchmarks.mock_server import MockTriasServer
+from custom_components.steirische_linien.const import (
+    CONF_API_URL,
+    CONF_MODE,
+    CONF_PARSER_MODE,
+    CONF_REQUEST_PROFILE,
+    CONF_STOP_POINT_REF,
+    DEFAULT_PARSER_MODE,
+    DEFAULT_REQUEST_PROFILE,
+    MODE_STATION,
+    PARSER_TREE,
+    PROFILE_FULL,
+)
+from custom_components.steirische_linien.registry import query_key
+from custom_components.steirische_linien.sensor import (
+    SteirischeLinienDataUpdateCoordinator,
+)
+
+from .common import async_hass
+
+STATION = {
+    CONF_MODE: MODE_STATION,
+    CONF_API_URL: "http://127.0.0.1:1/trias",
+    CONF_STOP_POINT_REF: "at:46:4000",
+}
+
+
+def test_request_options_split_queries() -> None:
+    """Entries only share a query with the same request profile and parser."""
+    assert query_key({**STATION, CONF_REQUEST_PROFILE: PROFILE_FULL}) != query_key(STATION)
+    assert query_key({**STATION, CONF_PARSER_MODE: PARSER_TREE}) != query_key(STATION)
+
+
+def test_default_options_share_queries() -> None:
+    """Options set to their defaults share the query of unset ones."""
+    assert query_key(
+        {
+            **STATION,
+            CONF_REQUEST_PROFILE: DEFAULT_REQUEST_PROFILE,
+            CONF_PARSER_MODE: DEFAULT_PARSER_MODE,
+        }
+    ) == query_key(STATION)
+
+
+async def test_entries_share_a_fetch() -> None:
+    """Entries with the same query key wait for one request and share its result."""
+    async with MockTriasServer(latency=0.2) as server, async_hass() as hass:
+        station = {**STATION, CONF_API_URL: server.url}
+        first, second = (
+            SteirischeLinienDataUpdateCoordinator(hass, dict(station), entry_id)
+            for entry_id in ("entry_0", "entry_1")
+        )
+        assert first.query_users == 2
+
+        await asyncio.gather(first.async_refresh(), second.async_refresh())
+        assert server.requests == 1
+        assert first.data
+        assert second.data is first.data
+
+        other = SteirischeLinienDataUpdateCoordinator(
+            hass, {**station, CONF_PARSER_MODE: PARSER_TREE}
+        )
+        await other.async_refresh()
+        assert server.requests == 2
@@ -0,0 +1,60 @@
+"""Golden-file tests of the rendered TRIAS requests.
+
+Set UPDATE_GOLDEN=1 to rewrite the files in tests/golden after an
+intended change of a request, and review the diff.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pytest
+
+from custom_components.steirische_linien.const import PROFILE_FULL, PROFILE_LEAN
+from custom_components.steirische_linien.request_builder import (
+    location_request,
+    nearby_stops_request,
+    stop_event_request,
+    trip_request,
+)
+
+GOLDEN = Path(__file__).parent / "golden"
+NOW = "2024-06-03T10:15:00Z"
+DEPARTURE = "2024-06-03T10:20:00Z"
+
+REQUESTS = {
+    "trip_lean": lambda: trip_request(47.0707, 15.4395, 47.0766, 15.4152, 10, PROFILE_LEAN).render(
+        request_timestamp=NOW, dep_arr_time=DEPARTURE
+    ),
+    "trip_full": lambda: trip_request(47.0707, 15.4395, 47.0766, 15.4152, 10, PROFILE_FULL).render(
+        request_timestamp=NOW, dep_arr_time=DEPARTURE
+    ),
+    "stop_event": lambda: stop_event_request("at:46:4000", 10).render(
+        request_timestamp=NOW, dep_arr_time=DEPARTURE
+    ),
+    "location": lambda: location_request("Graz Jakominiplatz", NOW),
+    # Names are escaped, not interpolated raw
+    "location_escaped": lambda: location_request('Graz <Hbf> & "Süd"', NOW),
+    "nearby_stops": lambda: nearby_stops_request(47.0707, 15.4395, 250, 6, NOW),
+}
+
+
+@pytest.mark.parametrize("name", REQUESTS)
+def test_request_matches_golden_file(name: str) -> None:
+    """Each request type renders byte for byte as its golden file."""
+    rendered = REQUESTS[name]()
+    golden = GOLDEN / f"{name}.xml"
+    if os.environ.get("UPDATE_GOLDEN"):
+        golden.write_bytes(rendered)
+    assert rendered == golden.read_bytes()
+    # And is well-formed XML
+    ElementTree.fromstring(rendered)
+
+
+def test_station_name_round_trips() -> None:
+    """An escaped station name reads back as the name searched for."""
+    name = 'Graz <Hbf> & "Süd"'
+    document = ElementTree.fromstring(location_request(name, NOW))
+    location_name = document.find(".//{http://www.vdv.de/trias}LocationName")
+    assert location_name.text == name
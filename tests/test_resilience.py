@@ -0,0 +1,295 @@
+"""Fault injection tests of retries, circuit breaking and stale data."""
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from benchmarks import mock_server
+from benchmarks.mock_server import MockTriasServer
+from custom_components.steirische_linien import api, registry
+from custom_components.steirische_linien.api import (
+    DATA_BREAKERS,
+    CircuitBreaker,
+    CircuitOpenError,
+    async_post,
+)
+from custom_components.steirische_linien.const import (
+    BREAKER_FAILURE_THRESHOLD,
+    CONF_API_URL,
+    CONF_DEST_LAT,
+    CONF_DEST_LON,
+    CONF_MAX_STALE_AGE,
+    CONF_MODE,
+    CONF_ORIGIN_LAT,
+    CONF_ORIGIN_LON,
+    CONF_ROUTE_NAME,
+    CONF_ROUTES,
+    CONF_STOP_POINT_REF,
+    DEFAULT_MIN_INTERVAL,
+    DOMAIN,
+    MODE_MULTI_TRIP,
+    MODE_STATION,
+)
+from custom_components.steirische_linien.scheduler import DATA_SCHEDULER
+from custom_components.steirische_linien.sensor import (
+    MultiRouteDataUpdateCoordinator,
+    SteirischeLinienDataUpdateCoordinator,
+)
+
+from .common import async_hass
+
+HEADERS = {"Content-Type": "text/xml"}
+REQUEST = b"<Trias><LocationInformationRequest/></Trias>"
+# Slack for the event loop and the local round trip
+SLACK = 0.1
+# Routes told apart by the mock server through their origin longitude
+ROUTES = [
+    {
+        CONF_ROUTE_NAME: name,
+        CONF_ORIGIN_LAT: 47.0707,
+        CONF_ORIGIN_LON: origin_lon,
+        CONF_DEST_LAT: 47.0766,
+        CONF_DEST_LON: 15.4152,
+    }
+    for name, origin_lon in (("Work", 15.4395), ("School", 15.4411), ("Gym", 15.4427))
+]
+
+
+@pytest.fixture(autouse=True)
+def worst_case_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Back off the longest time full jitter allows, so delays are known."""
+    monkeypatch.setattr(api, "random", SimpleNamespace(uniform=lambda low, high: high))
+
+
+def _gaps(server: MockTriasServer) -> list[float]:
+    """Return the seconds between the requests the server saw."""
+    times = server.request_times
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+async def test_retries_back_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failing request is retried RETRY_ATTEMPTS times with growing delays."""
+    monkeypatch.setattr(api, "RETRY_BACKOFF", 0.1)
+    monkeypatch.setattr(api, "RETRY_BACKOFF_MAX", 0.15)
+    async with MockTriasServer(error_rate=1.0) as server, async_hass() as hass:
+        with pytest.raises(aiohttp.ClientResponseError) as err:
+            await async_post(hass, server.url, REQUEST, HEADERS)
+
+    assert err.value.status == 503
+    assert server.requests == api.RETRY_ATTEMPTS
+    # 0.1 s, then 0.2 s capped at RETRY_BACKOFF_MAX
+    for gap, delay in zip(_gaps(server), (0.1, 0.15)):
+        assert delay <= gap < delay + SLACK
+
+
+async def test_retries_stop_at_request_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """No retry is started that would end after REQUEST_TIMEOUT."""
+    monkeypatch.setattr(api, "REQUEST_TIMEOUT", 0.5)
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 10)
+    monkeypatch.setattr(api, "RETRY_BACKOFF", 0.1)
+    async with MockTriasServer(error_rate=1.0) as server, async_hass() as hass:
+        start = time.monotonic()
+        with pytest.raises(aiohttp.ClientResponseError):
+            await async_post(hass, server.url, REQUEST, HEADERS)
+        elapsed = time.monotonic() - start
+
+    # Backoffs of 0.1, 0.2 and 0.4 s: the third would end at 0.7 s
+    assert server.requests == 3
+    assert elapsed < api.REQUEST_TIMEOUT
+
+
+async def test_slow_attempts_time_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An attempt slower than ATTEMPT_TIMEOUT is given up and retried."""
+    monkeypatch.setattr(api, "ATTEMPT_TIMEOUT", 0.1)
+    monkeypatch.setattr(api, "RETRY_BACKOFF", 0.05)
+    async with MockTriasServer(latency=1.0) as server, async_hass() as hass:
+        start = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await async_post(hass, server.url, REQUEST, HEADERS)
+        elapsed = time.monotonic() - start
+
+    assert server.requests == api.RETRY_ATTEMPTS
+    assert elapsed < api.RETRY_ATTEMPTS * (0.1 + 0.2) + SLACK
+
+
+async def test_breaker_opens_at_threshold(monkeypatch: pytest.MonkeyPatch) -> None:
+    """After BREAKER_FAILURE_THRESHOLD failures requests fail without being sent."""
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    async with MockTriasServer(error_rate=1.0) as server, async_hass() as hass:
+        for _ in range(BREAKER_FAILURE_THRESHOLD):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await async_post(hass, server.url, REQUEST, HEADERS)
+        assert hass.data[DOMAIN][DATA_BREAKERS][server.url].is_open
+
+        with pytest.raises(CircuitOpenError):
+            await async_post(hass, server.url, REQUEST, HEADERS)
+        assert server.requests == BREAKER_FAILURE_THRESHOLD
+
+
+async def test_breaker_counts_failed_retries(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every failed attempt counts, and an open circuit stops the retries."""
+    monkeypatch.setattr(api, "RETRY_BACKOFF", 0.01)
+    async with MockTriasServer(error_rate=1.0) as server, async_hass() as hass:
+        with pytest.raises(aiohttp.ClientResponseError):
+            await async_post(hass, server.url, REQUEST, HEADERS)
+        with pytest.raises(CircuitOpenError):
+            await async_post(hass, server.url, REQUEST, HEADERS)
+        assert server.requests == BREAKER_FAILURE_THRESHOLD
+
+
+async def test_breaker_half_open_trial(monkeypatch: pytest.MonkeyPatch) -> None:
+    """After the reset timeout one trial request closes or reopens the circuit."""
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    reset_timeout = 0.2
+    async with MockTriasServer(error_rate=1.0, latency=0.05) as server, async_hass() as hass:
+        breaker = CircuitBreaker(reset_timeout=reset_timeout)
+        hass.data[DOMAIN][DATA_BREAKERS] = {server.url: breaker}
+        for _ in range(BREAKER_FAILURE_THRESHOLD):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await async_post(hass, server.url, REQUEST, HEADERS)
+
+        # A failed trial opens the circuit again at once
+        await asyncio.sleep(reset_timeout)
+        with pytest.raises(aiohttp.ClientResponseError):
+            await async_post(hass, server.url, REQUEST, HEADERS)
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            await async_post(hass, server.url, REQUEST, HEADERS)
+        assert server.requests == BREAKER_FAILURE_THRESHOLD + 1
+
+        # Only the trial is sent; it succeeds and closes the circuit
+        server.error_rate = 0.0
+        await asyncio.sleep(reset_timeout)
+        trial, concurrent = await asyncio.gather(
+            async_post(hass, server.url, REQUEST, HEADERS),
+            async_post(hass, server.url, REQUEST, HEADERS),
+            return_exceptions=True,
+        )
+        assert isinstance(trial, bytes)
+        assert isinstance(concurrent, CircuitOpenError)
+        assert not breaker.is_open
+        assert server.requests == BREAKER_FAILURE_THRESHOLD + 2
+
+        await async_post(hass, server.url, REQUEST, HEADERS)
+        assert server.requests == BREAKER_FAILURE_THRESHOLD + 3
+
+
+async def test_cancelled_trial_frees_the_circuit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A trial cancelled before its answer lets the next request be the trial."""
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    reset_timeout = 0.2
+    async with MockTriasServer(error_rate=1.0) as server, async_hass() as hass:
+        breaker = CircuitBreaker(reset_timeout=reset_timeout)
+        hass.data[DOMAIN][DATA_BREAKERS] = {server.url: breaker}
+        for _ in range(BREAKER_FAILURE_THRESHOLD):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await async_post(hass, server.url, REQUEST, HEADERS)
+
+        server.error_rate = 0.0
+        server.latency = 1.0
+        await asyncio.sleep(reset_timeout)
+        trial = asyncio.create_task(async_post(hass, server.url, REQUEST, HEADERS))
+        await asyncio.sleep(SLACK)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        server.latency = 0.0
+        await async_post(hass, server.url, REQUEST, HEADERS)
+        assert not breaker.is_open
+        assert server.requests == BREAKER_FAILURE_THRESHOLD + 2
+
+
+async def test_refused_trial_is_not_a_success(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A trial refused with a 4xx neither closes the circuit nor blocks the next trial."""
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    reset_timeout = 0.2
+    async with MockTriasServer(error_rate=1.0) as server, async_hass() as hass:
+        # The mock server answers unknown paths with 404
+        missing_url = f"{server.url}/missing"
+        breaker = CircuitBreaker(reset_timeout=reset_timeout)
+        hass.data[DOMAIN][DATA_BREAKERS] = {server.url: breaker, missing_url: breaker}
+        for _ in range(BREAKER_FAILURE_THRESHOLD):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await async_post(hass, server.url, REQUEST, HEADERS)
+
+        await asyncio.sleep(reset_timeout)
+        with pytest.raises(aiohttp.ClientResponseError) as err:
+            await async_post(hass, missing_url, REQUEST, HEADERS)
+        assert err.value.status == 404
+        assert breaker.is_open
+
+        server.error_rate = 0.0
+        await async_post(hass, server.url, REQUEST, HEADERS)
+        assert not breaker.is_open
+
+
+async def test_stale_data_until_max_stale_age(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Departures are kept while the API fails, until max_stale_age has passed."""
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(registry, "SHARED_RESULT_MAX_AGE", 0)
+    max_stale_age = 0.3
+    async with MockTriasServer() as server, async_hass() as hass:
+        coordinator = SteirischeLinienDataUpdateCoordinator(
+            hass,
+            {
+                CONF_MODE: MODE_STATION,
+                CONF_API_URL: server.url,
+                CONF_STOP_POINT_REF: "at:46:4000",
+                CONF_MAX_STALE_AGE: max_stale_age,
+            },
+        )
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        departures = coordinator.data
+        assert departures
+
+        server.error_rate = 1.0
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert coordinator.data is departures
+        # Failing polls are retried soon
+        assert coordinator.poll_interval.total_seconds() == DEFAULT_MIN_INTERVAL
+
+        await asyncio.sleep(max_stale_age)
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+        assert server.requests == 3
+
+
+async def test_failing_route_keeps_its_departures(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A route whose request fails keeps its departures while the others update."""
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(registry, "SHARED_RESULT_MAX_AGE", 0)
+    # Rebuild responses per request, so a change of events shows at once
+    monkeypatch.setattr(mock_server, "FIXTURE_MAX_AGE", -1)
+    async with MockTriasServer(events=3) as server, async_hass() as hass:
+        # Every poll sends a request per route, more than the default burst
+        hass.data[DOMAIN][DATA_SCHEDULER].async_set_budget("test", server.url, 600000)
+        coordinator = MultiRouteDataUpdateCoordinator(
+            hass, {CONF_MODE: MODE_MULTI_TRIP, CONF_API_URL: server.url, CONF_ROUTES: ROUTES}
+        )
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        school = coordinator.data["School"]
+        assert [len(departures) for departures in coordinator.data.values()] == [3, 3, 3]
+
+        server.events = 5
+        server.failing = {b"<Longitude>15.4411</Longitude>"}
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert coordinator.data["School"] is school
+        assert len(coordinator.data["Work"]) == len(coordinator.data["Gym"]) == 5
+        assert server.requests == 6
+
+        # When every route fails, the update fails and stale data is kept
+        data = coordinator.data
+        server.failing = {b"TripRequest"}
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert coordinator.data is data
+        assert coordinator.poll_interval.total_seconds() == DEFAULT_MIN_INTERVAL
@@ -0,0 +1,104 @@
+"""Simulate many entries polling the mock TRIAS server through the scheduler."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from benchmarks.mock_server import MockTriasServer
+from custom_components.steirische_linien.const import (
+    CONF_API_URL,
+    CONF_CONNECTION_LIMIT,
+    CONF_MODE,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_STOP_POINT_REF,
+    DOMAIN,
+    MODE_STATION,
+    REQUEST_BURST,
+)
+from custom_components.steirische_linien.scheduler import DATA_SCHEDULER
+from custom_components.steirische_linien.sensor import (
+    SteirischeLinienDataUpdateCoordinator,
+)
+
+from .common import async_hass, async_setup_entry, station_entry
+
+ENTRIES = 100
+# Arrival at the server lags the budget slot by event loop and socket work
+TOLERANCE = 0.015
+
+
+async def _async_wait_for(condition, timeout: float) -> None:
+    """Wait until condition() holds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_entries_share_the_strictest_budget() -> None:
+    """100 entries polling at once are paced by the strictest budget of their URL."""
+    async with MockTriasServer(events=10) as server, async_hass() as hass:
+        entries = [
+            station_entry(
+                index,
+                server.url,
+                {
+                    # Every other entry asks for half the budget
+                    CONF_REQUESTS_PER_MINUTE: 3000 if index % 2 else 6000,
+                    CONF_CONNECTION_LIMIT: 10,
+                },
+            )
+            for index in range(ENTRIES)
+        ]
+        for entry in entries:
+            await async_setup_entry(hass, entry)
+
+        scheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+        assert scheduler.requests_per_minute(server.url) == 3000
+        spacing = 60 / 3000
+
+        await _async_wait_for(lambda: server.requests >= ENTRIES, timeout=30)
+        # Every entry polls a stop of its own once; the next polls are minutes away
+        await asyncio.sleep(0.2)
+        assert server.requests == ENTRIES
+
+        times = server.request_times
+        for first in range(len(times)):
+            for last in range(first + REQUEST_BURST, len(times)):
+                allowed = (last - first - REQUEST_BURST + 1) * spacing
+                assert times[last] - times[first] >= allowed - TOLERANCE
+
+        for entry in entries:
+            await entry._async_process_on_unload(hass)
+
+
+async def test_first_polls_spread_over_window() -> None:
+    """First polls of 100 coordinators are spread evenly over their window."""
+    window = 1.0
+    async with MockTriasServer(events=10) as server, async_hass() as hass:
+        scheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+        scheduler.async_set_budget("simulation", server.url, 600000)
+        start = time.monotonic()
+        for index in range(ENTRIES):
+            coordinator = SteirischeLinienDataUpdateCoordinator(
+                hass,
+                {
+                    CONF_MODE: MODE_STATION,
+                    CONF_API_URL: server.url,
+                    CONF_STOP_POINT_REF: f"at:46:{4000 + index}",
+                },
+            )
+            scheduler.async_register(coordinator, window)
+
+        await _async_wait_for(lambda: server.requests >= ENTRIES, timeout=10)
+        offsets = sorted(at - start for at in server.request_times)
+
+        assert offsets[-1] < window + 0.1
+        # Golden ratio phases leave no gap much larger than window / ENTRIES;
+        # the margin absorbs a stalled event loop on a busy machine
+        gaps = [later - earlier for earlier, later in zip(offsets, offsets[1:])]
+        assert max(gaps) < window / 10
+        # Every tenth of the window gets about a tenth of the polls
+        for bucket in range(10):
+            polls = sum(bucket / 10 <= offset < (bucket + 1) / 10 for offset in offsets)
+            assert 5 <= polls <= 15
@@ -0,0 +1,115 @@
+"""Tests of the sensor entities."""
+from __future__ import annotations
+
+import pytest
+from homeassistant.const import STATE_UNAVAILABLE
+
+from benchmarks.mock_server import MockTriasServer
+from custom_components.steirische_linien import api, registry
+from custom_components.steirische_linien.const import CONF_MAX_STALE_AGE
+from custom_components.steirische_linien.scheduler import PollScheduler
+from custom_components.steirische_linien.sensor import (
+    TransitDepartureSensor,
+    TransitDeparturesSensor,
+    _CountdownSensor,
+)
+
+from .common import (
+    async_add_to_platform,
+    async_hass,
+    async_setup_entry,
+    coordinator_of,
+    station_entry,
+)
+
+
+def test_countdown_sensors_must_render() -> None:
+    """The countdown base cannot be created; its subclasses implement _render."""
+    assert _CountdownSensor.__abstractmethods__ == frozenset({"_render"})
+    with pytest.raises(TypeError):
+        _CountdownSensor(None, None)
+    assert not TransitDepartureSensor.__abstractmethods__
+    assert not TransitDeparturesSensor.__abstractmethods__
+
+
+async def test_failed_refresh_makes_sensors_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failed refresh is written at once, for filled and empty slots alike."""
+    monkeypatch.setattr(api, "RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(registry, "SHARED_RESULT_MAX_AGE", 0)
+    # The test refreshes the coordinator itself
+    monkeypatch.setattr(
+        PollScheduler, "async_register", lambda self, coordinator, window: lambda: None
+    )
+    # Fewer results than sensors leaves the last slots empty
+    async with MockTriasServer(events=5) as server, async_hass() as hass:
+        entry = station_entry(0, server.url, {CONF_MAX_STALE_AGE: 0})
+        entities = await async_setup_entry(hass, entry)
+        await async_add_to_platform(hass, entities)
+        coordinator = coordinator_of(hass, entry)
+        entity_ids = [entity.entity_id for entity in entities]
+
+        def _states() -> list[str]:
+            return [hass.states.get(entity_id).state for entity_id in entity_ids]
+
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        shown = _states()
+        assert STATE_UNAVAILABLE not in shown
+        assert "unknown" in shown
+
+        server.error_rate = 1.0
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert not coordinator.last_update_success
+        assert _states() == [STATE_UNAVAILABLE] * len(entities)
+
+        server.error_rate = 0.0
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert _states() == shown
+
+        await entry._async_process_on_unload(hass)
+
+
+async def test_unchanged_payload_is_not_parsed_or_written(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The same response body again is neither parsed nor written to the states."""
+    monkeypatch.setattr(registry, "SHARED_RESULT_MAX_AGE", 0)
+    monkeypatch.setattr(
+        PollScheduler, "async_register", lambda self, coordinator, window: lambda: None
+    )
+    # The mock server answers with the same cached body
+    async with MockTriasServer() as server, async_hass() as hass:
+        entry = station_entry(0, server.url)
+        entities = await async_setup_entry(hass, entry)
+        await async_add_to_platform(hass, entities)
+        coordinator = coordinator_of(hass, entry)
+
+        parse = coordinator._parse
+        parsed = []
+        monkeypatch.setattr(
+            coordinator, "_parse", lambda *args: parsed.append(args) or parse(*args)
+        )
+        writes = []
+        for departure_sensor in entities:
+            write = departure_sensor.async_write_ha_state
+            monkeypatch.setattr(
+                departure_sensor,
+                "async_write_ha_state",
+                lambda write=write: writes.append(write) or write(),
+            )
+
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert len(parsed) == 1
+        assert writes
+        writes.clear()
+
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert server.requests == 2
+        assert len(parsed) == 1
+        assert writes == []
+
+        await entry._async_process_on_unload(hass)
@@ -0,0 +1,61 @@
+"""Tests of the persisted departure snapshots."""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from custom_components.steirische_linien import snapshot_store
+from custom_components.steirische_linien.snapshot_store import (
+    STORAGE_KEY,
+    SnapshotStore,
+)
+
+from .common import async_hass
+
+
+async def test_polls_do_not_postpone_the_save(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Changes arriving faster than the save delay are still written in time."""
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_SAVE_DELAY", 0.2)
+    async with async_hass() as hass:
+        store = SnapshotStore(hass)
+        path = hass.config.path(".storage", STORAGE_KEY)
+        for poll in range(10):
+            await store.async_set("entry_0", {"poll": poll})
+            await asyncio.sleep(0.05)
+        await hass.async_block_till_done()
+
+        # Every poll came within the save delay of the one before
+        assert os.path.exists(path)
+        with open(path, encoding="utf-8") as file:
+            saved = json.load(file)["data"]["entries"]["entry_0"]["data"]["poll"]
+        assert 0 < saved < 9
+
+
+async def test_unchanged_data_is_not_saved(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Only changed data schedules a save, and only one until it is written."""
+    async with async_hass() as hass:
+        store = SnapshotStore(hass)
+        scheduled = []
+        monkeypatch.setattr(
+            store._store,
+            "async_delay_save",
+            lambda data_func, delay: scheduled.append(data_func),
+        )
+
+        await store.async_set("entry_0", {"poll": 0})
+        saved, _ = await store.async_get("entry_0")
+        await store.async_set("entry_0", {"poll": 0})
+        await store.async_set("entry_1", {"poll": 0})
+        assert len(scheduled) == 1
+        # The unchanged data is as fresh as the last poll
+        assert (await store.async_get("entry_0"))[0] >= saved
+
+        written = scheduled[0]()
+        assert set(written["entries"]) == {"entry_0", "entry_1"}
+        await store.async_set("entry_0", {"poll": 0})
+        assert len(scheduled) == 1
+        await store.async_set("entry_0", {"poll": 1})
+        assert len(scheduled) == 2
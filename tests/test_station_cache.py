@@ -0,0 +1,72 @@
+"""Tests of the station search cache against the mock TRIAS server."""
+from __future__ import annotations
+
+import tempfile
+
+import pytest
+
+from benchmarks.mock_server import MockTriasServer
+from custom_components.steirische_linien import station_cache
+from custom_components.steirische_linien.config_flow import search_stations
+from custom_components.steirische_linien.station_cache import async_get_station_cache
+
+from .common import async_hass
+
+
+async def test_search_is_cached() -> None:
+    """A repeated search is answered from the cache, whatever its spelling."""
+    async with MockTriasServer() as server, async_hass() as hass:
+        stations = await search_stations(hass, server.url, "Graz Jakominiplatz")
+        assert stations
+        assert server.requests == 1
+
+        assert await search_stations(hass, server.url, "  graz   JAKOMINIPLATZ ") == stations
+        assert server.requests == 1
+
+        cache = async_get_station_cache(hass)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.hit_rate == 0.5
+
+
+async def test_cache_is_persisted() -> None:
+    """The cache is saved with Store and loaded on first use after a restart."""
+    config_dir = tempfile.mkdtemp()
+    async with MockTriasServer() as server:
+        async with async_hass(config_dir) as hass:
+            stations = await search_stations(hass, server.url, "Graz Jakominiplatz")
+        # Stopping flushed the delayed save
+
+        async with async_hass(config_dir) as hass:
+            assert await search_stations(hass, server.url, "Graz Jakominiplatz") == stations
+        assert server.requests == 1
+
+
+async def test_expired_result_served_while_api_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An expired result is refreshed, or served as it is while the API fails."""
+    monkeypatch.setattr(station_cache, "STATION_CACHE_TTL", -1)
+    async with MockTriasServer() as server, async_hass() as hass:
+        stations = await search_stations(hass, server.url, "Graz Jakominiplatz")
+
+        await search_stations(hass, server.url, "Graz Jakominiplatz")
+        assert server.requests == 2
+
+        server.error_rate = 1.0
+        assert await search_stations(hass, server.url, "Graz Jakominiplatz") == stations
+        assert server.requests == 3
+
+
+async def test_least_recently_used_is_evicted(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The search used longest ago is dropped once the cache is full."""
+    monkeypatch.setattr(station_cache, "STATION_CACHE_SIZE", 2)
+    async with MockTriasServer() as server, async_hass() as hass:
+        await search_stations(hass, server.url, "Hauptplatz")
+        await search_stations(hass, server.url, "Jakominiplatz")
+        # Hauptplatz is now the most recently used
+        await search_stations(hass, server.url, "Hauptplatz")
+        await search_stations(hass, server.url, "Griesplatz")
+        assert server.requests == 3
+
+        await search_stations(hass, server.url, "Hauptplatz")
+        assert server.requests == 3
+        await search_stations(hass, server.url, "Jakominiplatz")
+        assert server.requests == 4
@@ -0,0 +1,151 @@
+"""Tests of the offline stop index."""
+from __future__ import annotations
+
+import os
+import tempfile
+
+from benchmarks.fixtures import stop_names
+from benchmarks.mock_server import MockTriasServer
+from custom_components.steirische_linien.config_flow import ConfigFlow
+from custom_components.steirische_linien.const import (
+    CONF_API_URL,
+    CONF_STATION_NAME,
+    DOMAIN,
+    STOP_INDEX_FILE,
+)
+from custom_components.steirische_linien.stop_index import (
+    StopIndex,
+    async_get_stop_index,
+)
+
+from .common import async_hass
+
+
+def _station(ref: str, name: str) -> dict:
+    """Return a stop record as the station search returns it."""
+    return {
+        'stop_point_ref': ref,
+        'stop_point_name': name,
+        'location_name': None,
+        'display_name': name,
+    }
+
+
+GRAZ = [
+    _station("at:46:4001", "Graz Hauptbahnhof"),
+    _station("at:46:4002", "Graz Jakominiplatz"),
+    _station("at:46:4003", "Graz Jakomini Schulgasse"),
+    _station("at:46:4004", "Graz Südtiroler Platz/Kunsthaus"),
+    _station("at:46:4005", "Gleisdorf Bahnhof"),
+]
+
+
+def _index(stations: list[dict]) -> StopIndex:
+    """Return an index of the stations."""
+    index = StopIndex()
+    index.add_all(stations)
+    return index
+
+
+def _names(stations: list[dict]) -> list[str]:
+    """Return the display names of stop records."""
+    return [station['display_name'] for station in stations]
+
+
+def test_prefix_search() -> None:
+    """Every query token must start a token of the name; shorter names first."""
+    index = _index(GRAZ)
+    assert _names(index.search_prefix("Graz Jak")) == [
+        "Graz Jakominiplatz",
+        "Graz Jakomini Schulgasse",
+    ]
+    assert _names(index.search_prefix("sudtiroler graz")) == [
+        "Graz Südtiroler Platz/Kunsthaus"
+    ]
+    assert index.search_prefix("Graz Hauptplatz") == []
+    assert index.search_prefix("  ") == []
+
+
+def test_similar_search_tolerates_typos() -> None:
+    """A misspelt name still finds the stop."""
+    index = _index(GRAZ)
+    assert index.search_prefix("Graz Jakominiplaz") == []
+    assert _names(index.search_similar("Graz Jakominiplaz"))[0] == "Graz Jakominiplatz"
+    assert _names(index.search("Gleisdorf Banhof")) == ["Gleisdorf Bahnhof"]
+
+
+def test_similar_search_needs_more_than_the_town() -> None:
+    """Sharing only a short token with the query is not similar enough."""
+    index = _index(GRAZ)
+    assert index.search_similar("Graz Murpark Einkaufszentrum") == []
+
+
+def test_similar_search_excludes_stations() -> None:
+    """Stations already listed, e.g. found by the API, are left out."""
+    index = _index(GRAZ)
+    found = [GRAZ[1]]
+    assert "Graz Jakominiplatz" not in _names(index.search_similar("Graz Jakominiplaz", exclude=found))
+    assert _names(index.search("Graz Jak")) == _names(index.search_prefix("Graz Jak"))
+
+
+def test_stations_added_later_are_found() -> None:
+    """Stations harvested after the index was searched are indexed too."""
+    index = _index(GRAZ)
+    assert index.search_prefix("Graz Hauptplatz") == []
+    index.add(_station("at:46:4006", "Graz Hauptplatz"))
+    index.add(_station("at:46:4006", "Graz Hauptplatz"))
+    assert len(index) == len(GRAZ) + 1
+    assert _names(index.search_prefix("Graz Hauptplatz")) == ["Graz Hauptplatz"]
+    assert _names(index.search_similar("Graz Hauptplaz"))[0] == "Graz Hauptplatz"
+
+
+def test_similar_search_in_a_large_index() -> None:
+    """Among 10,000 stops the exact and the misspelt name find the stop first."""
+    names = stop_names(10000)
+    index = _index([_station(f"at:46:{i}", name) for i, name in enumerate(names)])
+    name = names[5000]
+    assert _names(index.search_similar(name))[0] == name
+    assert _names(index.search_similar(name[:6] + name[7:]))[0] == name
+
+
+async def _search_in_flow(hass, api_url: str, name: str) -> list[dict]:
+    """Return the stations the config flow offers for a station name."""
+    flow = ConfigFlow()
+    flow.hass = hass
+    flow.handler = DOMAIN
+    flow.flow_id = "flow"
+    result = await flow.async_step_station({CONF_API_URL: api_url, CONF_STATION_NAME: name})
+    assert result["step_id"] == "select_station"
+    return flow._stations
+
+
+async def test_harvested_index_does_not_answer_alone() -> None:
+    """Without a stop list the API is searched, then the index's matches follow."""
+    async with MockTriasServer() as server, async_hass() as hass:
+        stop_index = await async_get_stop_index(hass)
+        assert not stop_index.seeded
+        stop_index.add(_station("at:46:9000", "Graz Hauptplatz"))
+
+        stations = await _search_in_flow(hass, server.url, "Graz")
+        assert server.requests == 1
+        assert "Graz Jakominiplatz" in _names(stations)
+        assert _names(stations)[-1] == "Graz Hauptplatz"
+        assert len({station['stop_point_ref'] for station in stations}) == len(stations)
+
+
+async def test_seeded_index_answers_prefix_searches() -> None:
+    """A stop list seeds the index, which then answers name prefixes offline."""
+    config_dir = tempfile.mkdtemp()
+    with open(os.path.join(config_dir, STOP_INDEX_FILE), "w", encoding="utf-8") as stops:
+        stops.write("stop_id,stop_name\n")
+        for station in GRAZ:
+            stops.write(f"{station['stop_point_ref']},{station['stop_point_name']}\n")
+
+    async with MockTriasServer() as server, async_hass(config_dir) as hass:
+        assert (await async_get_stop_index(hass)).seeded
+        stations = await _search_in_flow(hass, server.url, "Graz Jak")
+        assert _names(stations) == ["Graz Jakominiplatz", "Graz Jakomini Schulgasse"]
+        assert server.requests == 0
+
+        await _search_in_flow(hass, server.url, "Graz Jakominiplaz")
+        assert server.requests == 1
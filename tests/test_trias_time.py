@@ -0,0 +1,86 @@
+"""Property tests of the TRIAS time handling across daylight saving changes."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from hypothesis import given, strategies as st
+
+from custom_components.steirische_linien.models import Departure
+from custom_components.steirische_linien.trias_time import (
+    format_local_time,
+    format_trias_time,
+    parse_trias_time,
+)
+
+YEARS = st.integers(min_value=2000, max_value=2099)
+# Up to six hours either side of a change, to the second
+AROUND = st.integers(min_value=-6 * 3600, max_value=6 * 3600).map(
+    lambda seconds: timedelta(seconds=seconds)
+)
+INSTANTS = st.datetimes(
+    min_value=datetime(2000, 1, 1), max_value=datetime(2099, 12, 31), timezones=st.just(timezone.utc)
+).map(lambda value: value.replace(microsecond=0))
+
+
+def _last_sunday(year: int, month: int) -> datetime:
+    """Return 01:00 UTC on the last Sunday of a month, when EU clocks change."""
+    day = datetime(year, month + 1, 1, 1, tzinfo=timezone.utc) - timedelta(days=1)
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def _vienna_offset(value: datetime) -> timedelta:
+    """Return the UTC offset of Vienna by the EU rule, without zoneinfo."""
+    summer = _last_sunday(value.year, 3) <= value < _last_sunday(value.year, 10)
+    return timedelta(hours=2 if summer else 1)
+
+
+@st.composite
+def near_changes(draw) -> datetime:
+    """Draw an instant near a spring or autumn clock change."""
+    change = _last_sunday(draw(YEARS), draw(st.sampled_from((3, 10))))
+    return change + draw(AROUND)
+
+
+@given(INSTANTS)
+def test_format_parse_round_trip(value: datetime) -> None:
+    """A formatted timestamp parses back to the same instant in UTC."""
+    text = format_trias_time(value)
+    assert text.endswith("Z") and len(text) == 20
+    parsed = parse_trias_time(text)
+    assert parsed == value
+    assert parsed.utcoffset() == timedelta(0)
+
+
+@given(near_changes(), st.integers(min_value=-14, max_value=14))
+def test_offsets_name_the_same_instant(value: datetime, hours: int) -> None:
+    """A timestamp with a UTC offset is the instant of its Z form."""
+    offset = timezone(timedelta(hours=hours))
+    assert parse_trias_time(value.astimezone(offset).isoformat()) == value
+
+
+@given(near_changes())
+def test_local_time_follows_clock_changes(value: datetime) -> None:
+    """Local times are an hour further ahead of UTC in summer than in winter."""
+    local = value + _vienna_offset(value)
+    assert format_local_time(parse_trias_time(format_trias_time(value))) == (
+        f"{local.hour:02d}:{local.minute:02d}"
+    )
+
+
+@given(near_changes(), AROUND)
+def test_countdown_ignores_clock_changes(now: datetime, until: timedelta) -> None:
+    """The countdown counts real minutes, even across a clock change."""
+    departure = Departure(
+        "6", "St. Peter", parse_trias_time(format_trias_time(now + until)), None
+    )
+    assert departure.minutes_until(now) == max(int(until.total_seconds() / 60), 0)
+
+
+@given(st.text(max_size=30))
+def test_garbage_raises_value_error(value: str) -> None:
+    """Anything that is not a timestamp raises ValueError, nothing else."""
+    try:
+        parsed = parse_trias_time(value)
+    except ValueError:
+        return
+    assert parsed.tzinfo is not None